@@ -1,8 +1,39 @@
+import sys
+import time
+
+STARTED = time.perf_counter()
+
 from src.pod.app import PodcastTUIApp
+from src.pod.services.silencemap import start_resource_tracker
+
+def import_catalog(path):
+    """Import a podcast directory dump for offline Discover search."""
+    from src.pod.config.config import ensure_dirs
+    from src.pod.services.catalog import PodcastCatalog
+
+    ensure_dirs()
+    started = time.perf_counter()
+    count = PodcastCatalog().import_dump(path)
+    print(f"Catalog has {count} podcasts ({time.perf_counter() - started:.1f}s)")
 
 def main():
-    app = PodcastTUIApp()
+    if "--import-catalog" in sys.argv[1:]:
+        index = sys.argv.index("--import-catalog")
+        if index + 1 >= len(sys.argv):
+            print("Usage: main.py --import-catalog <dump.csv|.json|.sqlite>")
+            return
+        import_catalog(sys.argv[index + 1])
+        return
+
+    # Silence analysis processes need it started before Textual captures stderr
+    start_resource_tracker()
+
+    profile_startup = "--profile-startup" in sys.argv[1:]
+    app = PodcastTUIApp(profile_startup=profile_startup, started=STARTED)
     app.run()
+    if profile_startup:
+        # Printed after the app has given the terminal back
+        print(app.startup_report())
 
 if __name__ == "__main__":
     main()
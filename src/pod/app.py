@@ -1,5 +1,5 @@
 # --------------- Main Application ---------------
-
+import time
 
 from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, Vertical
@@ -7,17 +7,16 @@ from textual.widgets import (
     Button, Footer, Header, Static, Label,
      Input, ContentSwitcher, TabPane, Tabs
 )
+from src.pod.config.config import ensure_dirs
 from src.pod.services.databasemanager import PodcastDatabase
 from src.pod.services.audioplayer import AudioPlayer
-from src.pod.services.downloadmanager import DownloadManager
-from src.pod.services.feedupdater import FeedUpdater
+from src.pod.services.playqueue import PlayQueue
+from src.pod.services.taskrunner import IO, TaskRunner
 from src.pod.widgets.nowplayingbar import NowPlayingBar
-from src.pod.widgets.feedslist import FeedsList
-from src.pod.widgets.feedview import FeedView
-from src.pod.widgets.recentepisodeslist import RecentEpisodesList
-from src.pod.widgets.downloadepisodeslist import DownloadedEpisodesList
-from src.pod.widgets.addfeeddialog import AddFeedDialog
-from src.pod.widgets.discover import DiscoverView
+
+# Everything else (httpx, the download and analysis services and the library
+# widgets) is imported by _start_services on a worker thread, after the first
+# frame has been drawn.
 
 
 class PodcastTUIApp(App):
@@ -80,6 +79,30 @@ class PodcastTUIApp(App):
         color: $text-muted;
     }
 
+    #feed-header, #feed-heading {
+        height: auto;
+    }
+
+    #auto-download-settings {
+        height: auto;
+    }
+
+    .setting-label {
+        height: 3;
+        content-align: center middle;
+        margin: 0 1;
+    }
+
+    .setting-number {
+        width: 8;
+    }
+
+    #feed-artwork {
+        width: 16;
+        height: 8;
+        margin-right: 1;
+    }
+
     #progress-container {
         height: 1;
         width: 100%;
@@ -127,6 +150,26 @@ class PodcastTUIApp(App):
         width: 100%;
     }
 
+    #feed-episodes-list {
+        height: 1fr;
+    }
+
+    .episode-row {
+        margin: 0 0 1 0;
+        padding: 1;
+        border: solid $primary-darken-3;
+        height: 12;
+    }
+
+    .episode-row .episode-description {
+        height: 2;
+        overflow: hidden;
+    }
+
+    .episode-spacer {
+        height: 0;
+    }
+
     #add-feed-dialog {
         background: $surface;
         border: thick $primary;
@@ -143,6 +186,22 @@ class PodcastTUIApp(App):
         margin-bottom: 1;
     }
 
+    #transcript-search-dialog {
+        background: $surface;
+        border: thick $primary;
+        padding: 1 2;
+        width: 90;
+        height: 30;
+    }
+
+    #transcript-results {
+        height: 1fr;
+    }
+
+    .transcript-hit {
+        width: 100%;
+    }
+
     #dialog-buttons {
         margin-top: 1;
         height: 1;
@@ -156,29 +215,51 @@ class PodcastTUIApp(App):
         ("p", "toggle_play", "Play/Pause"),
         ("left", "seek_backward", "Rewind 10s"),
         ("right", "seek_forward", "Forward 10s"),
+        ("n", "play_next", "Next in Queue"),
         ("+", "speed_up", "Speed Up"),
+        ("m", "toggle_smart_speed", "Smart Speed"),
         ("-", "speed_down", "Speed Down"),
         ("r", "refresh_feeds", "Refresh Feeds"),
         ("s", "search", "Search"),
         ("f", "add_feed", "Add Feed"),
+        ("o", "cycle_feed_sort", "Sort Feeds"),
+        ("t", "search_transcripts", "Transcripts"),
         ("tab", "next_tab", "Next Tab"),
         ("shift+tab", "prev_tab", "Previous Tab"),
     ]
 
-    def __init__(self):
+    def __init__(self, profile_startup: bool = False, started: float | None = None):
         super().__init__()
 
-        # Initialize core components
-        self.database = PodcastDatabase()
-        self.player = AudioPlayer()
-        self.download_manager = DownloadManager(database=self.database)
-        self.feed_updater = FeedUpdater(self.database)
+        # Startup timing for --profile-startup
+        self.profile_startup = profile_startup
+        self.started = started if started is not None else time.perf_counter()
+        self.startup_marks = []
+        self._mark("app constructed")
+
+        # Only what the skeleton UI needs; the database is loaded and the
+        # other services are built by _start_services once it is on screen
+        self.database = PodcastDatabase(load=False)
+        self.tasks = TaskRunner(on_error=self._task_failed)
+        self.play_queue = PlayQueue(self.database)
+        self.player = AudioPlayer(queue=self.play_queue, database=self.database)
+        self.services_ready = False
 
         # Track current view
         self.current_feed_id = None
 
+    def _mark(self, label: str):
+        """Record a startup milestone, in seconds since launch."""
+        self.startup_marks.append((label, time.perf_counter() - self.started))
+
+    def startup_report(self) -> str:
+        """Milestones recorded during startup, for --profile-startup."""
+        lines = ["Startup profile (seconds since launch):"]
+        lines += [f"  {label:<20} {seconds:7.3f}" for label, seconds in self.startup_marks]
+        return "\n".join(lines)
+
     def compose(self) -> ComposeResult:
-        """Create app layout."""
+        """Create the skeleton layout; the library is mounted into it once loaded."""
         yield Header(show_clock=True)
 
         # Now playing bar
@@ -187,20 +268,10 @@ class PodcastTUIApp(App):
         # Main content with tabs
         with ContentSwitcher(id="main-content"):
             with TabPane("Library", id="tab-1"):
-                with Horizontal():
-                    # Left sidebar - feeds list
-                    yield FeedsList(self.database)
-
-                    # Middle - feed view
-                    yield FeedView(self.player, self.download_manager)
-
-                    # Right sidebar - recent and downloaded episodes
-                    with Vertical():
-                        yield RecentEpisodesList(self.database)
-                        yield DownloadedEpisodesList(self.database, self.player)
+                yield Label("Loading library...", classes="view-title", id="library-loading")
 
             with TabPane("Discover", id="tab-2"):
-                yield DiscoverView()
+                yield Label("Loading...", classes="view-title", id="discover-loading")
                 # Container(
                 #     Label("Discover Podcasts", classes="view-title"),
                 #     Input(placeholder="Search for podcasts", id="search-input"),
@@ -217,6 +288,137 @@ class PodcastTUIApp(App):
         """Set up app when mounted."""
         # # Connect tabs to content switcher
         # tabs = self.query_one("#main-tabs", Tabs)
+        self._mark("mounted")
+        self.call_after_refresh(self._mark, "first frame")
+
+        self.tasks.submit(IO, self._start_services, name="Startup")
+
+    def _start_services(self):
+        """Load the database and build the services off the UI thread."""
+        ensure_dirs()
+        self.database.load()
+        self._mark("database loaded")
+
+        from src.pod.services.artwork import ArtworkCache
+        from src.pod.services.autodownloader import AutoDownloader
+        from src.pod.services.bandwidth import BandwidthLimiter
+        from src.pod.services.catalog import PodcastCatalog
+        from src.pod.services.blobstore import BlobStore
+        from src.pod.services.downloadmanager import DownloadManager
+        from src.pod.services.episodeextras import EpisodeExtras
+        from src.pod.services.feedupdater import FeedUpdater
+        from src.pod.services.httpclient import HttpClient
+        from src.pod.services.mediaprober import MediaProber
+        from src.pod.services.podcastsearch import PodcastSearch
+        from src.pod.services.silencemap import SilenceAnalyzer
+        from src.pod.services.storagemanager import StorageManager
+        from src.pod.services.streamingproxy import StreamingProxy
+        # Imported here so their service imports are paid for on this thread
+        import src.pod.widgets.feedslist
+        import src.pod.widgets.feedview
+        import src.pod.widgets.recentepisodeslist
+        import src.pod.widgets.downloadepisodeslist
+        import src.pod.widgets.addfeeddialog
+        import src.pod.widgets.discover
+        import src.pod.widgets.transcriptsearch
+        self._mark("modules imported")
+
+        self.http = HttpClient()
+        self.bandwidth_limiter = BandwidthLimiter()
+        self.blob_store = BlobStore(database=self.database)
+        self.prober = MediaProber(self.database)
+        self.silence_analyzer = SilenceAnalyzer(self.database,
+                                                on_analysed=self._after_silence_analysis)
+        self.storage = StorageManager(self.database, player=self.player, store=self.blob_store)
+        self.download_manager = DownloadManager(database=self.database,
+                                                limiter=self.bandwidth_limiter,
+                                                http=self.http,
+                                                storage=self.storage,
+                                                store=self.blob_store,
+                                                prober=self.prober,
+                                                analyzer=self.silence_analyzer)
+        self.player.proxy = StreamingProxy(self.download_manager)
+        self.feed_updater = FeedUpdater(self.database, self.bandwidth_limiter, self.http, self.tasks)
+        self.podcast_search = PodcastSearch(self.http, catalog=PodcastCatalog())
+        self.artwork = ArtworkCache(self.http, self.tasks)
+        self.extras = EpisodeExtras(self.http, self.tasks)
+        self.play_queue.extras = self.extras
+        self.auto_downloader = AutoDownloader(self.database, self.download_manager, self.tasks,
+                                              player=self.player,
+                                              on_downloaded=self._after_auto_download)
+        self._mark("services built")
+
+        self.call_from_thread(self._mount_library)
+
+        # Check stored downloads and clear out orphans in the background
+        corrupt, orphans = self.blob_store.verify()
+        if corrupt:
+            self.call_from_thread(self.notify, f"Removed {corrupt} corrupt download(s)",
+                                  severity="warning")
+        # Fill in real durations for files that have not been probed
+        self.prober.probe_downloaded()
+        self.silence_analyzer.analyse_downloaded()
+        # Warm the artwork cache so feeds show theirs as soon as they are opened
+        self.artwork.prefetch(feed.image_url for feed in self.database.feeds)
+        # Chapters and transcripts of queued episodes, so they are ready to play and search
+        self.extras.prefetch(self.play_queue.episodes())
+
+    def _mount_library(self):
+        """Replace the skeleton with the real views."""
+        from src.pod.widgets.feedslist import FeedsList
+        from src.pod.widgets.feedview import FeedView
+        from src.pod.widgets.recentepisodeslist import RecentEpisodesList
+        from src.pod.widgets.downloadepisodeslist import DownloadedEpisodesList
+        from src.pod.widgets.discover import DiscoverView
+
+        self.query_one("#library-loading").remove()
+        self.query_one("#discover-loading").remove()
+        self.query_one("#tab-1", TabPane).mount(Horizontal(
+            # Left sidebar - feeds list
+            FeedsList(self.database),
+            # Middle - feed view
+            FeedView(self.database, self.player, self.download_manager, self.tasks, self.artwork,
+                     self.auto_downloader),
+            # Right sidebar - recent and downloaded episodes
+            Vertical(
+                RecentEpisodesList(self.database),
+                DownloadedEpisodesList(self.database, self.player),
+            ),
+        ))
+        self.query_one("#tab-2", TabPane).mount(DiscoverView(self.podcast_search, self.feed_updater, self.tasks))
+        self.query_one(NowPlayingBar).extras = self.extras
+        self.services_ready = True
+        self._mark("library ready")
+        self.call_after_refresh(self._library_drawn)
+
+    def _library_drawn(self):
+        self._mark("library drawn")
+        if self.profile_startup:
+            self.exit()
+
+    def _require_services(self) -> bool:
+        """False, with a notice, while the library is still loading."""
+        if not self.services_ready:
+            self.notify("Still loading the library...")
+        return self.services_ready
+
+    def _task_failed(self, task, error):
+        """Report a failed background task. Called on the task's thread."""
+        self.call_from_thread(self.notify, f"{task.name} failed: {error}", severity="error")
+
+    async def on_unmount(self):
+        """Close pooled connections on exit."""
+        self.tasks.shutdown()
+        if not self.services_ready:
+            return
+        stats = self.http.get_stats()
+        self.log(f"HTTP: {stats['requests']} requests, "
+                 f"{stats['connections_opened']} connections, "
+                 f"pool hit rate {stats['pool_hit_rate']:.0%}")
+        self.prober.shutdown()
+        self.silence_analyzer.shutdown()
+        self.database.close()
+        await self.http.aclose()
 
     def on_tabs_tab_activated(self, event: Tabs.TabActivated):
         switcher = self.query_one("#main-content", ContentSwitcher)
@@ -244,6 +446,28 @@ class PodcastTUIApp(App):
         """Seek forward 10 seconds."""
         self.player.seek(10)
 
+    def action_play_next(self):
+        """Skip to the next queued episode."""
+        if not self.player.play_next():
+            self.notify("Queue is empty")
+
+    def action_toggle_smart_speed(self):
+        """Turn skipping of silent spans on or off."""
+        self.player.set_smart_speed(not self.player.smart_speed)
+        self.notify(f"Smart speed {'on' if self.player.smart_speed else 'off'}")
+
+    def action_cycle_feed_sort(self):
+        """Sort the subscriptions sidebar by the next key."""
+        if not self._require_services():
+            return
+        from src.pod.widgets.feedslist import FeedsList
+        self.notify(f"Feeds sorted by {self.query_one(FeedsList).cycle_sort()}")
+
+    def _after_silence_analysis(self, episode):
+        """Pick up a new silence map for the episode that is playing."""
+        if self.player.current_episode is episode:
+            self.player.load_silence_map()
+
     def action_speed_up(self):
         """Increase playback speed."""
         new_speed = min(3.0, self.player.playback_speed + 0.1)
@@ -270,18 +494,20 @@ class PodcastTUIApp(App):
 
     def action_refresh_feeds(self):
         """Refresh all feeds."""
+        if not self._require_services():
+            return
+
         # Show loading indicator
         self.notify("Refreshing feeds...")
 
-        # Update feeds in background
+        # Update feeds in background; pressing r again joins the running refresh
         def do_update():
             results = self.feed_updater.update_all_feeds()
-            self.call_from_thread(self._after_feeds_update, results)
+            self.auto_downloader.queue_new_episodes()
+            return results
 
-        import threading
-        thread = threading.Thread(target=do_update)
-        thread.daemon = True
-        thread.start()
+        self.tasks.submit(IO, do_update, key="refresh-all", name="Feed refresh",
+                          on_done=lambda results: self.call_from_thread(self._after_feeds_update, results))
 
     def _after_feeds_update(self, results):
         """Handle UI updates after feeds are refreshed."""
@@ -291,6 +517,9 @@ class PodcastTUIApp(App):
         # Update UI
         self.notify(f"Updated {success_count}/{len(results)} feeds")
 
+        from src.pod.widgets.feedslist import FeedsList
+        from src.pod.widgets.recentepisodeslist import RecentEpisodesList
+
         # Refresh views
         feeds_list = self.query_one(FeedsList)
         feeds_list.load_feeds()
@@ -302,8 +531,30 @@ class PodcastTUIApp(App):
         if self.current_feed_id:
             self.show_feed(self.current_feed_id)
 
+    def _after_auto_download(self, episode, feed):
+        """Refresh the downloaded list when a prefetched episode is ready."""
+        from src.pod.widgets.downloadepisodeslist import DownloadedEpisodesList
+
+        def refresh():
+            downloaded_list = self.query_one(DownloadedEpisodesList)
+            downloaded_list.load_episodes()
+
+        self.call_from_thread(refresh)
+
+    def action_search_transcripts(self):
+        """Show the transcript search dialog."""
+        if not self._require_services():
+            return
+        from src.pod.widgets.transcriptsearch import TranscriptSearch
+
+        self.mount(TranscriptSearch(self.extras, self.database, self.player))
+
     def action_add_feed(self):
         """Show add feed dialog."""
+        if not self._require_services():
+            return
+        from src.pod.widgets.addfeeddialog import AddFeedDialog
+
         dialog = AddFeedDialog(self.feed_updater)
         self.mount(dialog)
 
@@ -319,6 +570,8 @@ class PodcastTUIApp(App):
 
     def show_feed(self, feed_id):
         """Show a feed in the feed view."""
+        from src.pod.widgets.feedview import FeedView
+
         feed = self.database.get_feed(feed_id)
         if feed:
             self.current_feed_id = feed_id
@@ -4,9 +4,110 @@ from pathlib import Path
 CONFIG_DIR = Path.home() / ".pod"
 DOWNLOADS_DIR = CONFIG_DIR / "downloads"
 DATABASE_FILE = CONFIG_DIR / "database.json"
+BLOBS_DIR = DOWNLOADS_DIR / "blobs"
+PROBE_CACHE_FILE = CONFIG_DIR / "probe_cache.json"
+VERIFY_CACHE_FILE = CONFIG_DIR / "verified.json"
+SEARCH_CACHE_FILE = CONFIG_DIR / "search_cache.json"
+CATALOG_FILE = CONFIG_DIR / "catalog.db"
+ARTWORK_DIR = CONFIG_DIR / "artwork"
+EXTRAS_DIR = CONFIG_DIR / "extras"
+TRANSCRIPT_INDEX_FILE = CONFIG_DIR / "transcripts.db"
 
-# Ensure directories exist
-if not CONFIG_DIR.exists():
-    CONFIG_DIR.mkdir()
-if not DOWNLOADS_DIR.exists():
-    DOWNLOADS_DIR.mkdir()
+# Database
+DATABASE_SAVE_DELAY = 1.0  # seconds the writer waits after the last change before saving
+
+# Downloads
+DOWNLOAD_SEGMENTS = 4  # parallel byte ranges per large episode
+SEGMENTED_DOWNLOAD_THRESHOLD = 20 * 1024 * 1024  # only split files larger than this (bytes)
+DOWNLOAD_QUOTA = 5 * 1024 * 1024 * 1024  # bytes kept in DOWNLOADS_DIR before evicting
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024  # bytes buffered per stream before each write
+DOWNLOAD_BUFFER_POOL_SIZE = 8  # idle buffers kept for reuse
+DOWNLOAD_WRITE_THROUGH = 64 * 1024  # chunks at least this large skip the buffer (bytes)
+DOWNLOAD_FSYNC = "end"  # "never", "end" or "interval"
+DOWNLOAD_FSYNC_INTERVAL = 64 * 1024 * 1024  # bytes between fsyncs with the "interval" policy
+DOWNLOAD_MIN_SIZE_SHARE = 0.5  # files smaller than this share of the feed's declared length are truncated
+PROGRESS_UPDATE_INTERVAL = 0.25  # seconds between batched progress events per download
+AUTO_DOWNLOAD_IDLE_CHECK_INTERVAL = 5.0  # seconds between checks while waiting for idle
+
+# Auto-download policy for new subscriptions; each feed's can be changed in its view
+AUTO_DOWNLOAD = False  # prefetch new episodes after a refresh
+AUTO_DOWNLOAD_KEEP_NEWEST = 1  # newest unplayed episodes to keep downloaded
+AUTO_DOWNLOAD_MAX_MINUTES = None  # skip longer episodes (None = any length)
+AUTO_DOWNLOAD_ONLY_WHEN_IDLE = True  # wait until nothing plays or downloads
+
+# Play-while-downloading
+STREAM_SEEK_FETCH_THRESHOLD = 1024 * 1024  # seeks further ahead than this start their own fetch (bytes)
+STREAM_READ_TIMEOUT = 30.0  # seconds to wait for bytes before giving up
+STREAM_RETRIES = 3  # refetches of a missing range that bring no new bytes before the stream fails
+
+# Playback
+PLAYER_UPDATE_INTERVAL = 0.5  # seconds between position updates sent to the UI
+PROGRESS_SAVE_INTERVAL = 15  # seconds of playback between database saves of the position
+SEEK_COALESCE_INTERVAL = 0.15  # seconds to gather repeated seeks into one VLC call
+
+# Smart speed
+SMART_SPEED = True  # skip silent spans found by the silence analysis
+SILENCE_SAMPLE_RATE = 8000  # Hz the audio is decoded at for analysis
+SILENCE_WINDOW_MS = 50  # RMS window length
+SILENCE_THRESHOLD_DB = -40.0  # windows quieter than this (dBFS) are silent
+SILENCE_MIN_DURATION = 0.6  # seconds of silence before a span is skipped
+SILENCE_MARGIN = 0.15  # seconds of silence kept at each end of a skipped span
+SILENCE_WORKERS = 1  # analysis processes
+
+# Media probing
+PROBE_WORKERS = 2  # files probed at once
+PROBE_BATCH_SIZE = 20  # probe results applied per database save
+PROBE_TIMEOUT = 5.0  # seconds libvlc may spend parsing one file
+
+# Background work
+IO_WORKERS = 8  # threads for network and disk jobs
+CPU_WORKERS = 2  # threads for parsing and other CPU-bound jobs
+
+# Discover search
+SEARCH_DEBOUNCE = 0.3  # seconds of no typing before a search starts
+SEARCH_MIN_CHARS = 2  # shorter queries are not searched as you type
+SEARCH_RESULT_LIMIT = 20  # results asked of the iTunes API
+SEARCH_CACHE_SIZE = 500  # queries kept in the search cache
+SEARCH_CACHE_TTL = 24 * 60 * 60  # seconds a cached result stays valid
+CATALOG_IMPORT_BATCH = 10000  # rows inserted per batch when importing a directory dump
+
+# Feed previews
+PREVIEW_ITEMS = 10  # episodes parsed for a preview
+PREVIEW_MAX_BYTES = 256 * 1024  # most of a feed read for a preview
+PREVIEW_CACHE_SIZE = 20  # previews kept for a subscribe to start from
+PREVIEW_CACHE_TTL = 10 * 60  # seconds a kept preview may stand in for a full fetch
+
+# Artwork
+ARTWORK_THUMBNAIL_SIZE = 16  # pixels per side; two pixels are drawn per terminal cell
+ARTWORK_CACHE_SIZE = 32 * 1024 * 1024  # bytes of thumbnails kept in ARTWORK_DIR
+ARTWORK_MEMORY_ITEMS = 256  # decoded thumbnails kept in memory
+ARTWORK_MAX_BYTES = 16 * 1024 * 1024  # larger source images are not fetched
+
+# Chapters and transcripts
+EXTRAS_MEMORY_ITEMS = 16  # parsed chapter and transcript files kept in memory
+EXTRAS_MAX_BYTES = 8 * 1024 * 1024  # larger files are not fetched
+TRANSCRIPT_SEARCH_LIMIT = 50  # moments returned by a transcript search
+
+# Subscriptions sidebar
+FEED_SORT = "added"  # "added", "title", "latest", "unplayed" or "backlog"
+FEED_STATS_REFRESH_INTERVAL = 1.0  # seconds between checks for changed feed stats
+
+# HTTP connection pool
+HTTP_MAX_CONNECTIONS = 32
+HTTP_MAX_KEEPALIVE = 16
+HTTP_KEEPALIVE_EXPIRY = 60.0  # seconds an idle connection is kept open
+DNS_CACHE_TTL = 300.0  # seconds
+
+# Bandwidth limits in bytes/s (0 = unlimited)
+BANDWIDTH_LIMIT = 0
+INTERACTIVE_BANDWIDTH_LIMIT = 0
+BACKGROUND_BANDWIDTH_LIMIT = 0
+BACKGROUND_CONTENDED_SHARE = 0.25  # share of BANDWIDTH_LIMIT background gets while interactive traffic runs
+
+
+def ensure_dirs():
+    """Create the config and download directories. Called at startup, not on import."""
+    CONFIG_DIR.mkdir(exist_ok=True)
+    DOWNLOADS_DIR.mkdir(exist_ok=True)
+    ARTWORK_DIR.mkdir(exist_ok=True)
+    EXTRAS_DIR.mkdir(exist_ok=True)
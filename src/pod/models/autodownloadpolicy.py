@@ -0,0 +1,39 @@
+from typing import Any, Dict, Optional
+
+from src.pod.config.config import (
+    AUTO_DOWNLOAD, AUTO_DOWNLOAD_KEEP_NEWEST, AUTO_DOWNLOAD_MAX_MINUTES,
+    AUTO_DOWNLOAD_ONLY_WHEN_IDLE
+)
+
+
+class AutoDownloadPolicy:
+    """Per-feed rules for downloading new episodes in the background."""
+
+    def __init__(self,
+                enabled: bool = AUTO_DOWNLOAD,
+                keep_newest: int = AUTO_DOWNLOAD_KEEP_NEWEST,
+                max_duration_minutes: Optional[int] = AUTO_DOWNLOAD_MAX_MINUTES,
+                only_when_idle: bool = AUTO_DOWNLOAD_ONLY_WHEN_IDLE):
+        self.enabled = enabled
+        self.keep_newest = keep_newest  # newest unplayed episodes to keep downloaded
+        self.max_duration_minutes = max_duration_minutes
+        self.only_when_idle = only_when_idle
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for storage."""
+        return {
+            "enabled": self.enabled,
+            "keep_newest": self.keep_newest,
+            "max_duration_minutes": self.max_duration_minutes,
+            "only_when_idle": self.only_when_idle
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AutoDownloadPolicy':
+        """Create AutoDownloadPolicy from dictionary."""
+        return cls(
+            enabled=data.get("enabled", AUTO_DOWNLOAD),
+            keep_newest=data.get("keep_newest", AUTO_DOWNLOAD_KEEP_NEWEST),
+            max_duration_minutes=data.get("max_duration_minutes", AUTO_DOWNLOAD_MAX_MINUTES),
+            only_when_idle=data.get("only_when_idle", AUTO_DOWNLOAD_ONLY_WHEN_IDLE)
+        )
@@ -2,6 +2,9 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+# Fields that feed into FeedStats
+_COUNTED_FIELDS = frozenset({"played", "downloaded", "duration", "pub_date"})
+
 class Episode:
     """Represents a podcast episode."""
 
@@ -13,19 +16,43 @@ class Episode:
                 duration: int,
                 feed_id: str,
                 guid: str,
-                image_url: Optional[str] = None):
+                image_url: Optional[str] = None,
+                audio_size: Optional[int] = None,
+                audio_type: Optional[str] = None,
+                chapters: Optional[Dict[str, str]] = None,
+                transcript: Optional[Dict[str, str]] = None):
         self.title = title
         self.audio_url = audio_url
         self.pub_date = pub_date
         self.description = description
-        self.duration = duration  # in seconds
+        self.duration = duration  # in seconds, from the feed until the file is probed
         self.feed_id = feed_id
         self.guid = guid
         self.image_url = image_url
+        self.audio_size = audio_size  # enclosure length in bytes, as declared by the feed
+        self.audio_type = audio_type  # enclosure MIME type, as declared by the feed
+        self.chapters = chapters  # podcast:chapters reference: url and type
+        self.transcript = transcript  # podcast:transcript reference: url, type and language
         self.downloaded = False
         self.download_path: Path | None = None
+        self.content_hash: str | None = None  # sha256 of the downloaded file
         self.played = False
         self.play_position = 0  # in seconds
+        self.last_accessed: datetime | None = None
+        self.bitrate: int | None = None  # kbps, probed from the downloaded file
+        self.codec: str | None = None  # probed from the downloaded file
+        self.stats = None  # FeedStats of the feed this episode belongs to
+
+    def __setattr__(self, name, value):
+        # Keep the owning feed's totals current however the field is changed
+        stats = self.__dict__.get("stats")
+        # Unchanged values leave the totals, and their version, alone
+        if stats is not None and name in _COUNTED_FIELDS and self.__dict__.get(name) != value:
+            stats.remove(self)
+            object.__setattr__(self, name, value)
+            stats.add(self)
+        else:
+            object.__setattr__(self, name, value)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for storage."""
@@ -38,10 +65,18 @@ class Episode:
             "feed_id": self.feed_id,
             "guid": self.guid,
             "image_url": self.image_url,
+            "audio_size": self.audio_size,
+            "audio_type": self.audio_type,
+            "chapters": self.chapters,
+            "transcript": self.transcript,
             "downloaded": self.downloaded,
             "download_path": str(self.download_path) if self.download_path else None,
+            "content_hash": self.content_hash,
             "played": self.played,
-            "play_position": self.play_position
+            "play_position": self.play_position,
+            "last_accessed": self.last_accessed.isoformat() if self.last_accessed else None,
+            "bitrate": self.bitrate,
+            "codec": self.codec
         }
 
     @classmethod
@@ -55,12 +90,20 @@ class Episode:
             duration=data["duration"],
             feed_id=data["feed_id"],
             guid=data["guid"],
-            image_url=data["image_url"]
+            image_url=data["image_url"],
+            audio_size=data.get("audio_size"),
+            audio_type=data.get("audio_type"),
+            chapters=data.get("chapters"),
+            transcript=data.get("transcript")
         )
         episode.downloaded = data["downloaded"]
         episode.download_path = Path(data["download_path"]) if data["download_path"] else None
+        episode.content_hash = data.get("content_hash")
         episode.played = data["played"]
         episode.play_position = data["play_position"]
+        episode.last_accessed = datetime.fromisoformat(data["last_accessed"]) if data.get("last_accessed") else None
+        episode.bitrate = data.get("bitrate")
+        episode.codec = data.get("codec")
         return episode
 
     def format_duration(self) -> str:
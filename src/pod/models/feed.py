@@ -1,7 +1,9 @@
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from src.pod.models.autodownloadpolicy import AutoDownloadPolicy
 from src.pod.models.episode import Episode
+from src.pod.models.feedstats import FeedStats
 
 class Feed:
     """Represents a podcast feed/subscription."""
@@ -17,7 +19,9 @@ class Feed:
         self.author = author
         self.description = description
         self.image_url = image_url
-        self.episodes: List[Episode] = []
+        self.episodes: Tuple[Episode, ...] = ()  # replaced, never changed in place
+        self.stats = FeedStats(self)
+        self.auto_download = AutoDownloadPolicy()
         self.last_updated = datetime.now()
         self.id = self._generate_id()
 
@@ -27,6 +31,13 @@ class Feed:
         import hashlib
         return hashlib.md5(self.url.encode()).hexdigest()
 
+    def add_episodes(self, episodes: List[Episode]):
+        """Append episodes, counting them into the feed's stats."""
+        for episode in episodes:
+            self.stats.add(episode)
+            episode.stats = self.stats
+        self.episodes = self.episodes + tuple(episodes)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for storage."""
         return {
@@ -37,6 +48,7 @@ class Feed:
             "description": self.description,
             "image_url": self.image_url,
             "last_updated": self.last_updated.isoformat(),
+            "auto_download": self.auto_download.to_dict(),
             "episodes": [episode.to_dict() for episode in self.episodes]
         }
 
@@ -52,5 +64,6 @@ class Feed:
         )
         feed.id = data["id"]
         feed.last_updated = datetime.fromisoformat(data["last_updated"])
-        feed.episodes = [Episode.from_dict(ep_data) for ep_data in data["episodes"]]
+        feed.auto_download = AutoDownloadPolicy.from_dict(data.get("auto_download", {}))
+        feed.add_episodes([Episode.from_dict(ep_data) for ep_data in data["episodes"]])
         return feed
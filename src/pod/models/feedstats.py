@@ -0,0 +1,61 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.pod.models.episode import Episode
+    from src.pod.models.feed import Feed
+
+
+def _pub_epoch(episode: 'Episode') -> float:
+    return episode.pub_date.timestamp() if episode.pub_date else 0.0
+
+
+class FeedStats:
+    """Running totals over a feed's episodes.
+
+    Episodes report their old and new contribution whenever a counted field
+    changes (see Episode.__setattr__), so reading a total never walks the
+    episode list. The newest publication date can only grow incrementally;
+    when the newest episode is removed or backdated it is recomputed on the
+    next read.
+    """
+
+    def __init__(self, feed: 'Feed'):
+        self.feed = feed
+        self.episodes = 0
+        self.unplayed = 0
+        self.downloaded = 0
+        self.unplayed_duration = 0  # seconds
+        self._latest_pub = 0.0  # epoch seconds of the newest episode
+        self._latest_stale = False
+        self.version = 0  # bumped on every change, for cheap "did anything change" checks
+
+    def add(self, episode: 'Episode'):
+        """Count an episode in."""
+        self.episodes += 1
+        if not episode.played:
+            self.unplayed += 1
+            self.unplayed_duration += episode.duration or 0
+        if episode.downloaded:
+            self.downloaded += 1
+        self._latest_pub = max(self._latest_pub, _pub_epoch(episode))
+        self.version += 1
+
+    def remove(self, episode: 'Episode'):
+        """Count an episode out, using its current field values."""
+        self.episodes -= 1
+        if not episode.played:
+            self.unplayed -= 1
+            self.unplayed_duration -= episode.duration or 0
+        if episode.downloaded:
+            self.downloaded -= 1
+        if _pub_epoch(episode) >= self._latest_pub:
+            self._latest_stale = True
+        self.version += 1
+
+    @property
+    def latest_pub(self) -> float:
+        """Epoch seconds of the newest episode, 0 if none has a date."""
+        if self._latest_stale:
+            self._latest_pub = max((_pub_epoch(e) for e in self.feed.episodes), default=0.0)
+            self._latest_stale = False
+        return self._latest_pub
@@ -0,0 +1,183 @@
+# --------------- Artwork Cache ---------------
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from src.pod.config.config import (
+    ARTWORK_CACHE_SIZE, ARTWORK_DIR, ARTWORK_MAX_BYTES, ARTWORK_MEMORY_ITEMS,
+    ARTWORK_THUMBNAIL_SIZE
+)
+from src.pod.services.httpclient import HttpClient
+from src.pod.services.taskrunner import CPU, IO, Cancelled, TaskRunner, current_token
+
+
+def artwork_key(url: str) -> str:
+    """File name stem for an image URL."""
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def make_thumbnail(data: bytes, size: int = ARTWORK_THUMBNAIL_SIZE) -> bytes:
+    """A PNG at most size pixels on each side from encoded image data."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        # JPEGs are decoded straight at a fraction of their full size
+        image.draft("RGB", (size, size))
+        thumbnail = image.convert("RGB")
+    thumbnail.thumbnail((size, size), Image.Resampling.LANCZOS)
+    out = io.BytesIO()
+    thumbnail.save(out, "PNG")
+    return out.getvalue()
+
+
+class ArtworkCache:
+    """Podcast and episode artwork as small thumbnails, cached in two tiers.
+
+    Decoded thumbnails are kept in memory for the most recently shown
+    images, and their PNGs on disk under the SHA-256 of the image URL, up to
+    max_bytes with the least recently used evicted first. Only a miss on both
+    goes to the network: images are fetched on the IO pool and shrunk on the
+    CPU pool, so many can load at once without holding up the UI.
+    """
+
+    def __init__(self, http: HttpClient, tasks: TaskRunner | None = None,
+                 cache_dir: Path = ARTWORK_DIR, max_bytes: int = ARTWORK_CACHE_SIZE,
+                 memory_items: int = ARTWORK_MEMORY_ITEMS, size: int = ARTWORK_THUMBNAIL_SIZE):
+        self.http = http
+        self.tasks = tasks
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.size = size
+        self.lock = threading.Lock()
+        self.memory: "OrderedDict[str, object]" = OrderedDict()  # key -> PIL image
+        self.files: Optional["OrderedDict[str, int]"] = None  # key -> bytes on disk, oldest first
+        self.disk_bytes = 0
+
+    def get(self, url: str):
+        """The thumbnail for url if it is in memory, else None. Safe to call from the UI."""
+        key = artwork_key(url)
+        with self.lock:
+            image = self.memory.get(key)
+            if image is not None:
+                self.memory.move_to_end(key)
+            return image
+
+    def request(self, url: str, on_ready: Callable[[object], None]):
+        """Load a thumbnail in the background and pass it (or None) to on_ready.
+
+        on_ready is called on a worker thread. Requests for an image already
+        loading join that load.
+        """
+        if not self.tasks:
+            on_ready(self.load(url))
+            return
+        self.tasks.submit(IO, self.load, url, key=f"artwork:{artwork_key(url)}",
+                          name="Artwork", on_done=on_ready)
+
+    def prefetch(self, urls: Iterable[str]):
+        """Start loading thumbnails for urls not already in memory."""
+        for url in urls:
+            if url and self.get(url) is None:
+                self.request(url, lambda image: None)
+
+    def load(self, url: str):
+        """The thumbnail for url from memory, disk or the network. None if it cannot be had."""
+        from PIL import Image
+
+        image = self.get(url)
+        if image is not None:
+            return image
+        key = artwork_key(url)
+        try:
+            data = self._read(key)
+            if data is None:
+                source = self._fetch(url)
+                if self.tasks:
+                    data = self.tasks.call(CPU, make_thumbnail, source, self.size)
+                else:
+                    data = make_thumbnail(source, self.size)
+                self._write(key, data)
+            with Image.open(io.BytesIO(data)) as decoded:
+                image = decoded.convert("RGB")
+        except Cancelled:
+            raise
+        except Exception as e:
+            print(f"Artwork error for {url}: {e}")
+            return None
+
+        with self.lock:
+            self.memory[key] = image
+            while len(self.memory) > self.memory_items:
+                self.memory.popitem(last=False)
+        return image
+
+    def _fetch(self, url: str) -> bytes:
+        token = current_token()
+        with self.http.client.stream("GET", url) as response:
+            response.raise_for_status()
+            chunks, received = [], 0
+            for chunk in response.iter_bytes():
+                token.check()
+                received += len(chunk)
+                if received > ARTWORK_MAX_BYTES:
+                    raise IOError(f"image larger than {ARTWORK_MAX_BYTES} bytes")
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.png"
+
+    def _index(self) -> "OrderedDict[str, int]":
+        """Cached files in least recently used order, read from disk once. Call with lock held."""
+        if self.files is None:
+            self.files = OrderedDict()
+            self.disk_bytes = 0
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            entries = []
+            for path in self.cache_dir.glob("*.png"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, path.stem, stat.st_size))
+            for _, key, size in sorted(entries):
+                self.files[key] = size
+                self.disk_bytes += size
+        return self.files
+
+    def _read(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            if key not in self._index():
+                return None
+            self.files.move_to_end(key)
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # the modification time orders eviction across runs
+            return data
+        except OSError:
+            with self.lock:
+                self.disk_bytes -= self.files.pop(key, 0)
+            return None
+
+    def _write(self, key: str, data: bytes):
+        path = self._path(key)
+        tmp = self.cache_dir / f"{key}.{threading.get_ident()}.tmp"
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        with self.lock:
+            files = self._index()
+            self.disk_bytes += len(data) - files.pop(key, 0)
+            files[key] = len(data)
+            while self.disk_bytes > self.max_bytes and len(files) > 1:
+                old_key, old_size = files.popitem(last=False)
+                self.disk_bytes -= old_size
+                try:
+                    self._path(old_key).unlink()
+                except OSError:
+                    pass
@@ -1,37 +1,491 @@
 # --------------- Audio Player ---------------
-import vlc
+import bisect
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
 
+from src.pod.config.config import (
+    PLAYER_UPDATE_INTERVAL, SEEK_COALESCE_INTERVAL, SMART_SPEED
+)
 from src.pod.models.episode import Episode
+from src.pod.services.playqueue import PlayQueue
+from src.pod.services.silencemap import load_silence_map
+
+
+@dataclass
+class PlayerState:
+    """Snapshot of the player, published to subscribers."""
+    episode: Optional[Episode]
+    position: int  # ms
+    length: int  # ms, 0 until VLC knows it
+    is_playing: bool
+    buffering: float = 100.0  # percent
+    ended: bool = False
+    error: bool = False
+    time_saved: int = 0  # ms of listening time smart speed has saved on this episode
 
 
 class AudioPlayer:
-    """Manages audio playback using VLC."""
+    """Manages audio playback using VLC.
 
-    def __init__(self):
-        self.instance = vlc.Instance()
-        self.player = self.instance.media_player_new()
+    libvlc is loaded and its instance created on first playback, so
+    constructing a player costs nothing at startup.
+
+    Player state comes from libvlc events rather than polling. Position
+    updates are throttled to PLAYER_UPDATE_INTERVAL; play, pause, end and
+    error are published straight away. Nothing is published while paused.
+
+    Seeks are done with set_time in milliseconds against the media's real
+    length, never the feed's duration. Repeated seeks within
+    SEEK_COALESCE_INTERVAL are summed and sent to VLC as one call, and the
+    resume position of a loaded episode is applied once VLC reports the
+    media seekable, or dropped if it starts playing and cannot seek.
+
+    With smart speed on, silent spans from the episode's silence map are
+    skipped as playback reaches them, through the same seek_target as the
+    user's seeks, which take precedence.
+
+    A second media player holds the head of the play queue opened, buffered
+    and paused at its resume point, so moving on to it is a swap of players
+    rather than a cold start. Loading, stopping and swapping hold switch_lock,
+    since the swap runs on its own thread when an episode ends while the UI
+    may be loading another.
+    """
+
+    def __init__(self, proxy=None, queue: PlayQueue | None = None, database=None):
+        self.proxy = proxy  # StreamingProxy for episodes not downloaded yet
+        self.queue = queue
+        self.database = database  # episode changes are made on its writer
+        self.instance = None  # created by _ensure_vlc on first use
+        self.player = None
         self.media = None
         self.current_episode = None
         self.is_playing = False
+        self.ended = False  # the current episode played to its end
+        self.switch_lock = threading.RLock()  # held while changing episode or player
         self.playback_speed = 1.0
+        self.history: List[Episode] = []  # previously played, for ⏮
+        self.stored = None  # (episode, seconds, future) of the last position handed to the writer
+
+        # Preloaded next episode
+        self.next_player = None
+        self.next_media = None
+        self.next_episode: Optional[Episode] = None
+        self.next_ready = False
+
+        self.listeners: List[Callable[[PlayerState], None]] = []
+        self.lock = threading.Lock()
+        self.position = 0  # ms, from MediaPlayerTimeChanged
+        self.length = 0  # ms, from MediaPlayerLengthChanged
+        self.buffering = 100.0
+        self.last_published = 0.0
+
+        # Seeking
+        self.seekable = False
+        self.pending_resume: Optional[int] = None  # ms, applied once seekable
+        self.seek_target: Optional[int] = None  # ms, coalesced seek not yet sent
+        self.seek_timer: Optional[threading.Timer] = None
+        self.seek_lock = threading.Lock()
+
+        # Smart speed
+        self.smart_speed = SMART_SPEED
+        self.silences: List[Tuple[int, int]] = []  # [start, end) ms, sorted
+        self.silence_starts: List[int] = []
+        self.last_skip_end: Optional[int] = None
+        self.time_saved = 0  # ms
+
+    def _ensure_vlc(self):
+        """Create the VLC instance and both media players the first time they are needed."""
+        if self.instance:
+            return
+        import vlc
+
+        self.instance = vlc.Instance()
+        self.player = self.instance.media_player_new()
+        self.next_player = self.instance.media_player_new()
+        self._attach_events(self.player)
+        self._attach_events(self.next_player)
+
+    def _attach_events(self, player):
+        """Subscribe to libvlc events. Handlers run on a VLC thread and must not call back into libvlc."""
+        import vlc
+
+        events = player.event_manager()
+        handlers = {
+            vlc.EventType.MediaPlayerTimeChanged: self._on_time_changed,
+            vlc.EventType.MediaPlayerLengthChanged: self._on_length_changed,
+            vlc.EventType.MediaPlayerBuffering: self._on_buffering,
+            vlc.EventType.MediaPlayerSeekableChanged: self._on_seekable_changed,
+            vlc.EventType.MediaPlayerPlaying: self._on_playing,
+            vlc.EventType.MediaPlayerPaused: self._on_paused,
+            vlc.EventType.MediaPlayerStopped: self._on_paused,
+            vlc.EventType.MediaPlayerEndReached: self._on_end_reached,
+            vlc.EventType.MediaPlayerEncounteredError: self._on_error,
+        }
+        for event_type, handler in handlers.items():
+            events.event_attach(event_type, self._dispatch, player, handler)
+
+    def _dispatch(self, event, player, handler):
+        """Route events from the active player; the preloading one is handled separately."""
+        import vlc
+
+        if player is self.player:
+            handler(event)
+        elif player is self.next_player and event.type == vlc.EventType.MediaPlayerPlaying:
+            if not self.next_ready:
+                threading.Thread(target=self._park_next, daemon=True).start()
+
+    def subscribe(self, listener: Callable[[PlayerState], None]):
+        """Register a callback for state changes. It is called from a VLC thread."""
+        with self.lock:
+            self.listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[PlayerState], None]):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def _publish(self, force: bool = False, ended: bool = False, error: bool = False):
+        """Send the current state to listeners, at most once per interval unless forced."""
+        now = time.monotonic()
+        if not force and now - self.last_published < PLAYER_UPDATE_INTERVAL:
+            return
+        self.last_published = now
+
+        state = PlayerState(
+            episode=self.current_episode,
+            position=self.position,
+            length=self.length,
+            is_playing=self.is_playing,
+            buffering=self.buffering,
+            ended=ended,
+            error=error,
+            time_saved=int(self.time_saved),
+        )
+        with self.lock:
+            listeners = list(self.listeners)
+        for listener in listeners:
+            try:
+                listener(state)
+            except Exception as e:
+                print(f"Player listener error: {e}")
+
+    def _on_time_changed(self, event):
+        # Keep showing the target while a coalesced seek is outstanding
+        if self.seek_target is not None:
+            return
+        self.position = event.u.new_time
+        self._check_silence(self.position)
+        self._publish()
+
+    def _check_silence(self, position: int):
+        """Jump over a silent span when playback enters one."""
+        if not self.smart_speed or not self.silences:
+            return
+        i = bisect.bisect_right(self.silence_starts, position) - 1
+        if i < 0:
+            return
+        start, end = self.silences[i]
+        # Already skipping it, or too close to its end to bother
+        if end == self.last_skip_end or end - position < 100:
+            return
+        with self.seek_lock:
+            # A seek of the user's own is on its way and decides the position
+            if self.seek_target is not None or self.pending_resume is not None:
+                return
+            self.last_skip_end = end
+            self.seek_target = end
+            self._schedule_seek(0)
+        # Count listening time, which depends on the playback speed
+        self.time_saved += (end - position) / self.playback_speed
+
+    def load_silence_map(self):
+        """Load the silence map of the current episode, if it has been analysed."""
+        episode = self.current_episode
+        self.silences = load_silence_map(episode.download_path) if episode and episode.download_path else []
+        self.silence_starts = [start for start, end in self.silences]
+        self.last_skip_end = None
+
+    def set_smart_speed(self, enabled: bool):
+        self.smart_speed = enabled
+        self.last_skip_end = None
+
+    def _on_length_changed(self, event):
+        self.length = event.u.new_length
+        self._publish(force=True)
+
+    def _on_buffering(self, event):
+        self.buffering = event.u.new_cache
+        self._publish(force=self.buffering >= 100.0)
+
+    def _on_seekable_changed(self, event):
+        self.seekable = bool(event.u.new_seekable)
+        self._schedule_resume()
+
+    def _on_playing(self, event):
+        self.is_playing = True
+        self.ended = False  # played again from the start
+        if self.pending_resume is not None:
+            threading.Thread(target=self._settle_resume, daemon=True).start()
+        self._publish(force=True)
+
+    def _schedule_resume(self):
+        """Apply a pending resume position off the VLC event thread."""
+        if self.seekable and self.pending_resume is not None:
+            threading.Thread(target=self._apply_resume, daemon=True).start()
+
+    def _settle_resume(self):
+        """Once playing, resume if VLC can seek, else give up on it and play from the start.
+
+        Some media never become seekable, e.g. a stream from a server without
+        range support, and waiting for them would hold the resume forever.
+        """
+        if self.seekable or self.player.is_seekable():
+            self.seekable = True
+            self._apply_resume()
+        else:
+            with self.seek_lock:
+                self.pending_resume = None
+
+    def _apply_resume(self):
+        with self.seek_lock:
+            target = self.pending_resume
+            self.pending_resume = None
+        if target is not None:
+            self.player.set_time(target)
+
+    def _on_paused(self, event):
+        self.is_playing = False
+        self._publish(force=True)
+
+    def _on_end_reached(self, event):
+        self.is_playing = False
+        self.ended = True
+        self.position = self.length
+        episode = self.current_episode
+        if episode:
+            self._set(episode, played=True, play_position=0)
+        self._publish(force=True, ended=True)
+
+        # Switching players calls into libvlc, so it cannot happen on this thread
+        if self.queue and self.queue.peek():
+            threading.Thread(target=self.play_next, daemon=True).start()
+
+    def _on_error(self, event):
+        self.is_playing = False
+        self._publish(force=True, error=True)
+
+    def _location(self, episode: Episode) -> Optional[str]:
+        """File path or loopback URL VLC should open for an episode."""
+        if episode.downloaded and episode.download_path:
+            return str(episode.download_path)
+        if self.proxy and episode.audio_url:
+            # Play while downloading through the loopback proxy
+            try:
+                return self.proxy.open(episode)
+            except IOError as e:
+                print(f"Stream error: {e}")
+        return None
+
+    def _release(self, episode: Optional[Episode]):
+        """Let the proxy know a player no longer holds an episode's stream."""
+        if self.proxy and episode:
+            self.proxy.release(episode)
+
+    def _set(self, episode: Episode, **fields):
+        """Change an episode on the database writer, without waiting or saving.
+
+        A play position is also remembered until the writer has applied it,
+        so a load() straight after stop() resumes from it (see _resume_point).
+        """
+        def apply():
+            for name, value in fields.items():
+                setattr(episode, name, value)
+
+        if not self.database:
+            apply()
+            return
+        future = self.database.update(apply, save=False)
+        if "play_position" in fields:
+            self.stored = (episode, fields["play_position"], future)
+
+    def _resume_point(self, episode: Episode) -> int:
+        """Seconds into an episode to resume from."""
+        stored = self.stored
+        if stored and stored[0] is episode and not stored[2].done():
+            return stored[1]
+        return episode.play_position
 
     def load(self, episode: Episode):
         """Load an episode for playback."""
-        if not episode.downloaded or not episode.download_path:
+        with self.switch_lock:
+            return self._load(episode)
+
+    def _load(self, episode: Episode):
+        location = self._location(episode)
+        if not location:
             return False
+        self._ensure_vlc()
 
+        # Playing a queued episode directly takes it out of the queue
+        if self.queue:
+            self.queue.remove(episode)
+        if episode is self.next_episode:
+            self._clear_next()
+
+        if self.media:
+            self._release(self.current_episode)
+        if self.current_episode and self.current_episode is not episode:
+            self.history.append(self.current_episode)
         self.current_episode = episode
-        self.media = self.instance.media_new(str(episode.download_path))
+        self.ended = False
+        self._set(episode, last_accessed=datetime.now())
+        resume = self._resume_point(episode)
+        self.position = resume * 1000
+        self.length = (episode.duration or 0) * 1000
+        self.time_saved = 0
+        self.load_silence_map()
+        self.cancel_seek()
+        self.seekable = False
+        self.media = self.instance.media_new(location)
         self.player.set_media(self.media)
 
-        # Set position if there was previous playback
-        if episode.play_position > 0:
-            # Convert seconds to milliseconds position
-            pos_percent = episode.play_position / episode.duration if episode.duration else 0
-            self.player.set_position(pos_percent)
+        # Resume where we left off once VLC can seek in the media
+        with self.seek_lock:
+            self.pending_resume = resume * 1000 if resume > 0 else None
 
+        self._preload_next()
         return True
 
+    def preload_next(self):
+        """Open and buffer the head of the queue in the second player.
+
+        Streaming it through the proxy also gets it fully downloaded before
+        it is needed.
+        """
+        with self.switch_lock:
+            self._preload_next()
+
+    def _preload_next(self):
+        if not self.queue:
+            return
+        episode = self.queue.peek()
+        if episode is self.next_episode:
+            return
+
+        self._clear_next()
+        if not episode:
+            return
+        location = self._location(episode)
+        if not location:
+            return
+        self._ensure_vlc()
+
+        self.next_episode = episode
+        self.next_media = self.instance.media_new(location)
+        self.next_player.set_media(self.next_media)
+        # Start it muted; _park_next pauses it once VLC has it playing
+        self.next_player.audio_set_mute(True)
+        self.next_player.play()
+
+    def _park_next(self):
+        """Pause the preloaded player at the episode's resume point."""
+        with self.switch_lock:
+            episode = self.next_episode
+            if not episode or self.next_ready:
+                return
+            self.next_player.set_pause(1)
+            self.next_player.set_time(self._resume_point(episode) * 1000)
+            self.next_player.audio_set_mute(False)
+            self.next_ready = True
+
+    def _clear_next(self):
+        """Drop whatever the second player has preloaded."""
+        if self.next_media:
+            self.next_player.stop()
+            self._release(self.next_episode)
+        self.next_media = None
+        self.next_episode = None
+        self.next_ready = False
+
+    def play_next(self):
+        """Move on to the next queued episode, swapping in the preloaded player when possible."""
+        with self.switch_lock:
+            return self._play_next()
+
+    def _play_next(self):
+        if not self.queue:
+            return False
+        episode = self.queue.pop()
+        if not episode:
+            return False
+
+        if episode is not self.next_episode or not self.next_media:
+            self.stop()
+            if not self.load(episode):
+                return False
+            return self.play()
+
+        # Swap players first so events from the old one are ignored
+        old_player = self.player
+        if self.current_episode:
+            # An episode played to its end was already set to start over
+            if not self.ended:
+                self._set(self.current_episode, play_position=max(0, old_player.get_time()) // 1000)
+            self.history.append(self.current_episode)
+            self._release(self.current_episode)
+        self.player, self.next_player = self.next_player, old_player
+        self.cancel_seek()
+        self.seekable = self.player.is_seekable()
+        with self.seek_lock:
+            self.pending_resume = None  # _park_next already positioned it
+        self.media = self.next_media
+        self.current_episode = episode
+        self.ended = False
+        self._set(episode, last_accessed=datetime.now())
+        self.position = self._resume_point(episode) * 1000
+        self.length = max(0, self.player.get_length()) or (episode.duration or 0) * 1000
+        self.time_saved = 0
+        self.load_silence_map()
+        self.next_media = None
+        self.next_episode = None
+        self.next_ready = False
+
+        self.player.audio_set_mute(False)
+        self.player.set_rate(self.playback_speed)
+        self.player.play()
+        self.is_playing = True
+        old_player.stop()
+
+        self._preload_next()
+        return True
+
+    def play_previous(self):
+        """Restart the current episode, or go back to the previous one near its start."""
+        with self.switch_lock:
+            return self._play_previous()
+
+    def _play_previous(self):
+        if self.current_episode and (self.player.get_time() > 5000 or not self.history):
+            self.cancel_seek()
+            self.player.set_time(0)
+            return True
+        if not self.history:
+            return False
+
+        episode = self.history.pop()
+        current = self.current_episode
+        self.stop()
+        if current and self.queue:
+            self.queue.add(current, front=True)
+        self._release(current)
+        self.current_episode = None  # keep it out of the history
+        if not self.load(episode):
+            return False
+        return self.play()
+
     def play(self):
         """Start or resume playback."""
         if not self.media:
@@ -58,32 +512,102 @@ class AudioPlayer:
 
     def stop(self):
         """Stop playback and save position."""
+        with self.switch_lock:
+            self._stop()
+
+    def _stop(self):
         if not self.current_episode:
             return
 
         if self.is_playing:
             self.pause()
 
-        # Save current position
-        position_ms = self.player.get_time()
-        if position_ms >= 0:
-            self.current_episode.play_position = position_ms // 1000  # Convert ms to seconds
+        # Save current position, or the target of a seek VLC has not made yet
+        with self.seek_lock:
+            target = self.seek_target if self.seek_target is not None else self.pending_resume
+            self.pending_resume = None
+        self.cancel_seek()
+        position_ms = target if target is not None else self.player.get_time()
+        # An episode played to its end was already set to start over
+        if position_ms >= 0 and not self.ended:
+            self._set(self.current_episode, play_position=position_ms // 1000)  # Convert ms to seconds
 
         self.player.stop()
         self.is_playing = False
 
-    def seek(self, offset: int):
-        """Seek forward/backward by offset seconds."""
+    def seek(self, offset: float):
+        """Seek forward/backward by offset seconds.
+
+        Calls in quick succession (key repeat) move one target and are sent
+        to VLC as a single set_time after SEEK_COALESCE_INTERVAL.
+        """
+        if not self.media:
+            return
+
+        with self.seek_lock:
+            # Not seekable yet: move the resume point instead
+            if self.pending_resume is not None:
+                self.pending_resume = self._clamp(self.pending_resume + int(offset * 1000))
+                self.position = self.pending_resume
+                self._publish(force=True)
+                return
+
+            if self.seek_target is None:
+                current = self.player.get_time()
+                base = current if current >= 0 else self.position
+            else:
+                base = self.seek_target
+            self.seek_target = self._clamp(base + int(offset * 1000))
+            self.position = self.seek_target
+            # Silences the user seeks back into are skipped again
+            self.last_skip_end = None
+            self._schedule_seek(SEEK_COALESCE_INTERVAL)
+        self._publish(force=True)
+
+    def seek_to(self, position_ms: int):
+        """Jump to an absolute position in milliseconds."""
         if not self.media:
             return
+        self.cancel_seek()
+        self.position = self._clamp(position_ms)
+        with self.seek_lock:
+            self.last_skip_end = None
+            if self.pending_resume is not None:
+                self.pending_resume = self.position
+                return
+        self.player.set_time(self.position)
+
+    def _clamp(self, position_ms: int) -> int:
+        """Keep a target inside the media, using VLC's length once it is known."""
+        length = self.player.get_length()
+        if length <= 0:
+            length = self.length
+        position_ms = max(0, position_ms)
+        # Stop just short of the end so a long seek does not skip the episode
+        return min(position_ms, length - 1000) if length > 1000 else position_ms
+
+    def _schedule_seek(self, delay: float):
+        """Send seek_target to VLC after delay, unless already scheduled. Hold seek_lock."""
+        if not self.seek_timer:
+            self.seek_timer = threading.Timer(delay, self._apply_seek)
+            self.seek_timer.daemon = True
+            self.seek_timer.start()
 
-        current_pos = self.player.get_time() // 1000  # In seconds
-        new_pos = max(0, current_pos + offset)
+    def _apply_seek(self):
+        with self.seek_lock:
+            target = self.seek_target
+            self.seek_target = None
+            self.seek_timer = None
+        if target is not None:
+            self.player.set_time(target)
 
-        # Convert to VLC position (0.0 to 1.0)
-        if self.current_episode and self.current_episode.duration:
-            pos_percent = new_pos / self.current_episode.duration
-            self.player.set_position(min(pos_percent, 1.0))
+    def cancel_seek(self):
+        """Drop a coalesced seek that has not been sent yet."""
+        with self.seek_lock:
+            if self.seek_timer:
+                self.seek_timer.cancel()
+            self.seek_timer = None
+            self.seek_target = None
 
     def set_playback_speed(self, speed: float):
         """Set playback speed (0.5 to 3.0)."""
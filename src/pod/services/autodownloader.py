@@ -0,0 +1,117 @@
+# --------------- Auto Downloader ---------------
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+from src.pod.config.config import AUTO_DOWNLOAD_IDLE_CHECK_INTERVAL
+from src.pod.models.episode import Episode
+from src.pod.models.feed import Feed
+from src.pod.services.bandwidth import BACKGROUND
+from src.pod.services.databasemanager import PodcastDatabase
+from src.pod.services.downloadmanager import DownloadManager, download_key
+from src.pod.services.taskrunner import IO, Cancelled, TaskRunner, current_token
+
+
+class AutoDownloader:
+    """Evaluates per-feed auto-download policies and prefetches matching episodes.
+
+    Queued episodes are downloaded one at a time by a task on the IO pool.
+    Each download is submitted under the same key FeedView uses
+    (download_key), so pressing download on an episode being prefetched
+    joins that download rather than starting a second one.
+    """
+
+    def __init__(self,
+                 database: PodcastDatabase,
+                 download_manager: DownloadManager,
+                 tasks: TaskRunner,
+                 player=None,
+                 on_downloaded: Optional[Callable[[Episode, Feed], None]] = None):
+        self.database = database
+        self.download_manager = download_manager
+        self.tasks = tasks
+        self.player = player
+        self.on_downloaded = on_downloaded
+        self.queue: Deque[Tuple[Episode, Feed]] = deque()
+        self.queued = set()  # guids waiting or downloading
+        self.draining = False  # a task is working through the queue
+        self.lock = threading.Lock()
+
+    def select_episodes(self, feed: Feed) -> List[Episode]:
+        """Return the episodes the feed's policy wants downloaded."""
+        policy = feed.auto_download
+        if not policy.enabled:
+            return []
+
+        unplayed = [ep for ep in feed.episodes if not ep.played and ep.audio_url]
+        unplayed.sort(key=lambda e: e.pub_date.timestamp() if e.pub_date else 0, reverse=True)
+
+        if policy.max_duration_minutes is not None:
+            limit = policy.max_duration_minutes * 60
+            unplayed = [ep for ep in unplayed if ep.duration and ep.duration <= limit]
+
+        return [ep for ep in unplayed[:policy.keep_newest] if not ep.downloaded]
+
+    def queue_new_episodes(self) -> int:
+        """Evaluate every feed's policy and queue matching episodes. Call after a refresh."""
+        return sum(self.queue_feed(feed) for feed in self.database.feeds)
+
+    def queue_feed(self, feed: Feed) -> int:
+        """Queue the episodes one feed's policy wants. Call after changing the policy."""
+        count = 0
+        with self.lock:
+            for episode in self.select_episodes(feed):
+                if episode.guid in self.queued:
+                    continue
+                self.queued.add(episode.guid)
+                self.queue.append((episode, feed))
+                count += 1
+            start = count and not self.draining
+            if start:
+                self.draining = True
+        if start:
+            self.tasks.submit(IO, self._drain, name="Auto-download")
+        return count
+
+    def is_idle(self) -> bool:
+        """True when nothing is playing and no interactive transfer is running."""
+        if self.player and self.player.is_playing:
+            return False
+        return self.download_manager.limiter.is_idle()
+
+    def _drain(self):
+        """Download queued episodes one at a time at background priority."""
+        while True:
+            with self.lock:
+                if not self.queue:
+                    self.draining = False
+                    return
+                episode, feed = self.queue.popleft()
+            try:
+                self._download(episode, feed)
+            except Cancelled:
+                # Shutting down; what is left waits for the next queue_feed
+                with self.lock:
+                    self.draining = False
+                raise
+            except Exception as e:
+                print(f"Auto-download error: {e}")
+            finally:
+                with self.lock:
+                    self.queued.discard(episode.guid)
+
+    def _download(self, episode: Episode, feed: Feed):
+        token = current_token()
+        if feed.auto_download.only_when_idle:
+            while not self.is_idle():
+                token.check()
+                time.sleep(AUTO_DOWNLOAD_IDLE_CHECK_INTERVAL)
+
+        # The user may have downloaded it while it waited
+        if episode.downloaded:
+            return
+        task = self.tasks.submit(IO, self.download_manager.download_episode, episode, feed, BACKGROUND,
+                                 key=download_key(episode), name=f"Download of {episode.title}")
+        if task.result() and self.on_downloaded:
+            self.on_downloaded(episode, feed)
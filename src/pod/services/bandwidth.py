@@ -0,0 +1,108 @@
+# --------------- Bandwidth Limiter ---------------
+import threading
+import time
+from contextlib import contextmanager
+
+from src.pod.config.config import (
+    BANDWIDTH_LIMIT, INTERACTIVE_BANDWIDTH_LIMIT, BACKGROUND_BANDWIDTH_LIMIT,
+    BACKGROUND_CONTENDED_SHARE
+)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+
+class TokenBucket:
+    """Token bucket measured in bytes. A rate of 0 means unlimited."""
+
+    def __init__(self, rate: float = 0, capacity: float | None = None):
+        self._lock = threading.Lock()
+        self.tokens = 0.0
+        self.set_rate(rate, capacity)
+
+    def set_rate(self, rate: float, capacity: float | None = None):
+        """Change the refill rate (bytes/s) and burst capacity."""
+        with self._lock:
+            self.rate = max(0.0, rate)
+            self.capacity = capacity if capacity else max(self.rate, 64 * 1024)
+            self.tokens = min(self.tokens, self.capacity) if self.tokens else self.capacity
+            self.last_refill = time.monotonic()
+
+    def reserve(self, amount: int) -> float:
+        """Take amount tokens and return how long the caller must wait for them."""
+        with self._lock:
+            if not self.rate:
+                return 0.0
+
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+
+            # Allow the bucket to go into debt so chunks larger than the
+            # capacity still pass, just with a proportionally longer wait
+            self.tokens -= amount
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+
+class BandwidthLimiter:
+    """Shared limiter that every download and feed fetch goes through.
+
+    Each chunk is charged against its priority class's bucket and the global
+    bucket. While interactive transfers are running, background traffic is
+    additionally held to a share of the global budget so it yields.
+    """
+
+    def __init__(self,
+                 global_rate: float = BANDWIDTH_LIMIT,
+                 interactive_rate: float = INTERACTIVE_BANDWIDTH_LIMIT,
+                 background_rate: float = BACKGROUND_BANDWIDTH_LIMIT,
+                 background_share: float = BACKGROUND_CONTENDED_SHARE):
+        self._lock = threading.Lock()
+        self.global_bucket = TokenBucket(global_rate)
+        self.buckets = {
+            INTERACTIVE: TokenBucket(interactive_rate),
+            BACKGROUND: TokenBucket(background_rate),
+        }
+        self.background_share = background_share
+        self.contended_bucket = TokenBucket(global_rate * background_share)
+        self.active = {INTERACTIVE: 0, BACKGROUND: 0}
+
+    def set_limits(self,
+                   global_rate: float | None = None,
+                   interactive_rate: float | None = None,
+                   background_rate: float | None = None):
+        """Adjust limits (bytes/s, 0 for unlimited) while transfers are running."""
+        if global_rate is not None:
+            self.global_bucket.set_rate(global_rate)
+            self.contended_bucket.set_rate(global_rate * self.background_share)
+        if interactive_rate is not None:
+            self.buckets[INTERACTIVE].set_rate(interactive_rate)
+        if background_rate is not None:
+            self.buckets[BACKGROUND].set_rate(background_rate)
+
+    @contextmanager
+    def transfer(self, priority: str = BACKGROUND):
+        """Mark a transfer as active for the duration of the block."""
+        with self._lock:
+            self.active[priority] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.active[priority] -= 1
+
+    def is_idle(self) -> bool:
+        """True when no interactive transfer is running."""
+        with self._lock:
+            return self.active[INTERACTIVE] == 0
+
+    def throttle(self, nbytes: int, priority: str = BACKGROUND):
+        """Block until nbytes may be transferred at the given priority."""
+        wait = max(
+            self.buckets[priority].reserve(nbytes),
+            self.global_bucket.reserve(nbytes),
+        )
+        if priority == BACKGROUND and self.active[INTERACTIVE]:
+            wait = max(wait, self.contended_bucket.reserve(nbytes))
+        if wait > 0:
+            time.sleep(wait)
@@ -0,0 +1,276 @@
+# --------------- Blob Store ---------------
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from src.pod.config.config import BLOBS_DIR, DOWNLOAD_MIN_SIZE_SHARE, VERIFY_CACHE_FILE
+from src.pod.models.episode import Episode
+from src.pod.services.silencemap import map_path
+
+# File extension for each audio type we recognise
+EXTENSIONS = {
+    "audio/mpeg": ".mp3",
+    "audio/mp4": ".m4a",
+    "audio/x-m4a": ".m4a",
+    "audio/aac": ".aac",
+    "audio/ogg": ".ogg",
+    "audio/opus": ".opus",
+    "audio/wav": ".wav",
+    "audio/x-wav": ".wav",
+    "video/mp4": ".mp4",
+}
+
+
+def sniff_type(header: bytes) -> Optional[str]:
+    """Guess a media type from the first bytes of a file.
+
+    Besides audio, recognises what servers send in place of it (error pages,
+    archives) and the zeros of preallocated space nothing was written to.
+    """
+    if not header.strip(b"\0"):
+        return "application/x-empty"
+    if header.lstrip().startswith(b"<"):
+        return "text/html"
+    if header.lstrip()[:1] in (b"{", b"["):
+        return "application/json"
+    if header.startswith(b"%PDF"):
+        return "application/pdf"
+    if header.startswith(b"PK\x03\x04"):
+        return "application/zip"
+    if header.startswith(b"\x1f\x8b"):
+        return "application/gzip"
+    if header.startswith(b"ID3") or header[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"):
+        return "audio/mpeg"
+    if header[:2] in (b"\xff\xf1", b"\xff\xf9"):
+        return "audio/aac"
+    if header[4:8] == b"ftyp":
+        return "video/mp4" if header[8:11] in (b"mp4", b"iso", b"avc") else "audio/mp4"
+    if header.startswith(b"OggS"):
+        return "audio/ogg"
+    if header.startswith(b"RIFF") and header[8:12] == b"WAVE":
+        return "audio/wav"
+    return None
+
+
+class IntegrityError(Exception):
+    """Raised when a downloaded file is not the audio the feed declared."""
+
+
+class BlobStore:
+    """Content-addressed store for downloaded audio.
+
+    Files live at blobs/<hash[:2]>/<hash><ext>, so the same audio published in
+    several feeds is stored once. Episodes reference blobs through
+    Episode.content_hash and a blob is deleted when its last reference goes.
+    """
+
+    def __init__(self, root: Path = BLOBS_DIR, database=None,
+                 verify_file: Path = VERIFY_CACHE_FILE):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.database = database
+        self.verify_file = Path(verify_file)
+        self.lock = threading.Lock()
+        self.refs: Dict[str, Set[Tuple[str, str]]] = {}  # hash -> {(feed_id, guid)}
+        self.verified: Dict[str, Tuple[int, int]] = {}  # blob path -> (size, mtime_ns) when last hashed
+        self._load_verified()
+
+        if database:
+            for episode in database.get_downloaded_episodes():
+                if episode.content_hash:
+                    self.refs.setdefault(episode.content_hash, set()).add(self._key(episode))
+
+    def _load_verified(self):
+        if not self.verify_file.exists():
+            return
+        try:
+            with open(self.verify_file) as f:
+                self.verified = {path: tuple(stat) for path, stat in json.load(f).items()}
+        except (OSError, json.JSONDecodeError, TypeError) as e:
+            print(f"Error loading verified downloads: {e}")
+
+    def _save_verified(self):
+        with self.lock:
+            data = dict(self.verified)
+        tmp = self.verify_file.with_name(f"{self.verify_file.name}.{threading.get_ident()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        tmp.replace(self.verify_file)
+
+    def _stat(self, path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _write(self, fn):
+        """Change episodes on the database writer, if there is a database.
+
+        Waits for the change, so callers that read the episode next see it;
+        keep it off the UI thread.
+        """
+        if self.database:
+            self.database.call(fn, save=False)
+        else:
+            fn()
+
+    def _key(self, episode: Episode) -> Tuple[str, str]:
+        return (episode.feed_id, episode.guid)
+
+    def _path(self, content_hash: str, extension: str) -> Path:
+        return self.root / content_hash[:2] / f"{content_hash}{extension}"
+
+    def hash_file(self, path: Path) -> str:
+        """sha256 of a file, read in 1 MiB blocks."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while block := f.read(1024 * 1024):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def check(self, path: Path, episode: Episode) -> str:
+        """Validate a download against the enclosure. Returns the media type to store it as."""
+        size = path.stat().st_size
+        with open(path, "rb") as f:
+            # Enough to tell a hole of unwritten space from padding before audio
+            header = f.read(4096)
+
+        if size == 0:
+            raise IntegrityError("Downloaded file is empty")
+
+        sniffed = sniff_type(header)
+        if sniffed == "application/x-empty":
+            raise IntegrityError("Downloaded file starts with unwritten space")
+        if sniffed and sniffed not in EXTENSIONS:
+            raise IntegrityError(f"Server returned {sniffed} instead of audio")
+
+        # Feeds often get the length slightly wrong, so only a file well short
+        # of it is taken to be cut off
+        if episode.audio_size and size < episode.audio_size * DOWNLOAD_MIN_SIZE_SHARE:
+            raise IntegrityError(f"Download looks truncated: feed declared "
+                                 f"{episode.audio_size} bytes, got {size}")
+        if episode.audio_size and episode.audio_size != size:
+            print(f"Size mismatch for {episode.title}: "
+                  f"feed declared {episode.audio_size}, got {size}")
+
+        # Audio in another container than declared still plays, so only flag it
+        if sniffed and episode.audio_type and sniffed != episode.audio_type:
+            print(f"Type mismatch for {episode.title}: "
+                  f"feed declared {episode.audio_type}, looks like {sniffed}")
+        return sniffed or episode.audio_type or "audio/mpeg"
+
+    def ingest(self, path: Path, episode: Episode) -> Path:
+        """Move a finished download into the store and point the episode at it."""
+        media_type = self.check(path, episode)
+        content_hash = self.hash_file(path)
+        blob = self._path(content_hash, EXTENSIONS.get(media_type, ".mp3"))
+
+        with self.lock:
+            if blob.exists():
+                # Same audio already stored for another episode
+                path.unlink()
+            else:
+                blob.parent.mkdir(exist_ok=True)
+                os.replace(path, blob)
+            self.refs.setdefault(content_hash, set()).add(self._key(episode))
+            # Just hashed, so verify() need not read it again
+            stat = self._stat(blob)
+            if stat:
+                self.verified[str(blob)] = stat
+        self._save_verified()
+
+        def point():
+            episode.content_hash = content_hash
+            episode.download_path = blob
+
+        self._write(point)
+        return blob
+
+    def release(self, episode: Episode):
+        """Drop an episode's reference and delete the file if nothing else uses it."""
+        path = Path(episode.download_path) if episode.download_path else None
+        content_hash = episode.content_hash
+
+        with self.lock:
+            if content_hash:
+                refs = self.refs.get(content_hash, set())
+                refs.discard(self._key(episode))
+                if refs:
+                    path = None  # still shared
+                else:
+                    self.refs.pop(content_hash, None)
+
+            if path and path.exists():
+                path.unlink()
+                map_path(path).unlink(missing_ok=True)
+            if path:
+                self.verified.pop(str(path), None)
+
+        def clear():
+            episode.downloaded = False
+            episode.download_path = None
+            episode.content_hash = None
+
+        self._write(clear)
+
+    def unique_size(self) -> int:
+        """Bytes used by stored blobs, counting shared files once."""
+        total = 0
+        for path in self.root.glob("*/*"):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def verify(self) -> Tuple[int, int]:
+        """Re-hash changed blobs and delete unreferenced ones.
+
+        A blob whose size and modification time are what they were when it was
+        last hashed is taken as intact without reading it. Episodes whose file
+        is missing or corrupt are marked as not downloaded. Returns (corrupt,
+        orphans) and saves the database once.
+        """
+        referenced = set()
+        corrupt = []
+
+        if self.database:
+            for episode in self.database.get_downloaded_episodes():
+                if not episode.content_hash or not episode.download_path:
+                    continue
+                path = Path(episode.download_path)
+                referenced.add(path)
+                stat = self._stat(path)
+                with self.lock:
+                    known = self.verified.get(str(path))
+                if stat and (stat == known or self.hash_file(path) == episode.content_hash):
+                    with self.lock:
+                        self.verified[str(path)] = stat
+                else:
+                    corrupt.append(episode)
+
+        for episode in corrupt:
+            print(f"Corrupt download removed: {episode.title}")
+            self.release(episode)
+
+        orphans = 0
+        with self.lock:
+            live = {h for h, refs in self.refs.items() if refs}
+            for path in self.root.glob("*/*"):
+                if path in referenced or path.name.split(".")[0] in live:
+                    continue
+                path.unlink()
+                orphans += 1
+            # Forget files that are gone
+            for path in [p for p in self.verified if Path(p) not in referenced
+                         and not Path(p).exists()]:
+                del self.verified[path]
+        self._save_verified()
+
+        if corrupt and self.database:
+            self.database.save()
+        return len(corrupt), orphans
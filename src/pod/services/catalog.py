@@ -0,0 +1,213 @@
+# --------------- Podcast Catalog ---------------
+import csv
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from src.pod.config.config import CATALOG_FILE, CATALOG_IMPORT_BATCH, SEARCH_RESULT_LIMIT
+
+# Column names used by common directory dumps (iTunes search results, the
+# Podcast Index database and plain CSV exports) for each catalog field
+FIELD_ALIASES = {
+    "title": ("title", "collectionName", "name", "podcast_name"),
+    "author": ("author", "artistName", "itunesAuthor", "ownerName", "publisher"),
+    "url": ("url", "feedUrl", "feed_url", "rss", "rss_url", "originalUrl"),
+    "image_url": ("image_url", "imageUrl", "artworkUrl600", "artworkUrl100", "artwork", "image"),
+    "genre": ("genre", "primaryGenreName", "category1", "category"),
+    "itunes_id": ("itunes_id", "itunesId", "collectionId"),
+    "popularity": ("popularity", "popularityScore", "rank", "trackCount", "episodeCount"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS podcasts (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    author TEXT,
+    url TEXT NOT NULL UNIQUE,
+    image_url TEXT,
+    genre TEXT,
+    itunes_id INTEGER,
+    popularity REAL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS podcasts_fts USING fts5(
+    title, author,
+    content='podcasts', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='1 2 3'
+);
+"""
+
+
+def _pick(row: Dict, field: str):
+    for name in FIELD_ALIASES[field]:
+        value = row.get(name)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def normalize_row(row: Dict) -> Optional[tuple]:
+    """A catalog row from a dump record, or None if it has no title or feed URL."""
+    title, url = _pick(row, "title"), _pick(row, "url")
+    if not title or not url:
+        return None
+    try:
+        popularity = float(_pick(row, "popularity") or 0)
+    except (TypeError, ValueError):
+        popularity = 0.0
+    try:
+        itunes_id = int(_pick(row, "itunes_id") or 0) or None
+    except (TypeError, ValueError):
+        itunes_id = None
+    return (str(title), _pick(row, "author"), str(url), _pick(row, "image_url"),
+            _pick(row, "genre"), itunes_id, popularity)
+
+
+def read_dump(path: Path) -> Iterator[Dict]:
+    """Records from a CSV, JSON (array, {"results": [...]} or JSON lines) or SQLite dump."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        head = f.read(16)
+
+    if head.startswith(b"SQLite format 3"):
+        yield from _read_sqlite(path)
+    elif head.lstrip()[:1] in (b"[", b"{"):
+        yield from _read_json(path)
+    else:
+        with open(path, newline="", encoding="utf-8", errors="replace") as f:
+            yield from csv.DictReader(f)
+
+
+def _read_json(path: Path) -> Iterator[Dict]:
+    with open(path, encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError:
+            # JSON lines
+            f.seek(0)
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+    if isinstance(data, dict):
+        data = data.get("results") or data.get("podcasts") or data.get("feeds") or []
+    yield from data
+
+
+def _read_sqlite(path: Path) -> Iterator[Dict]:
+    """Rows of the first table with both a title and a feed URL column."""
+    source = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    source.row_factory = sqlite3.Row
+    try:
+        tables = [name for (name,) in source.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name = 'podcasts' DESC")]
+        for table in tables:
+            columns = {row[1] for row in source.execute(f'PRAGMA table_info("{table}")')}
+            if columns & set(FIELD_ALIASES["title"]) and columns & set(FIELD_ALIASES["url"]):
+                for row in source.execute(f'SELECT * FROM "{table}"'):
+                    yield dict(row)
+                return
+    finally:
+        source.close()
+
+
+def fts_query(query: str) -> Optional[str]:
+    """FTS5 query matching every word of query as a prefix."""
+    words = "".join(c if c.isalnum() else " " for c in query.casefold()).split()
+    if not words:
+        return None
+    return " AND ".join(f'"{word}"*' for word in words)
+
+
+class PodcastCatalog:
+    """Local podcast directory in SQLite with a full-text prefix index.
+
+    A directory dump is imported once with import_dump(). Rows are stored in
+    order of popularity, so a search can take the first matches the index
+    yields instead of scoring every match, which keeps prefix searches over
+    millions of podcasts in the low milliseconds. Results use the field
+    names of iTunes search results, so they can be shown interchangeably.
+    """
+
+    def __init__(self, path: Path = CATALOG_FILE):
+        self.path = Path(path)
+        self.local = threading.local()  # one read connection per thread
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.executescript(SCHEMA)
+            self.local.connection = connection
+        return connection
+
+    def available(self) -> bool:
+        """True if a catalog has been imported."""
+        if not self.path.exists():
+            return False
+        return self._connect().execute("SELECT 1 FROM podcasts LIMIT 1").fetchone() is not None
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT count(*) FROM podcasts").fetchone()[0]
+
+    def import_dump(self, dump: Path, batch: int = CATALOG_IMPORT_BATCH) -> int:
+        """Add or replace podcasts from a dump file. Returns how many are in the catalog."""
+        return self.import_rows(read_dump(dump), batch)
+
+    def import_rows(self, records: Iterable[Dict], batch: int = CATALOG_IMPORT_BATCH) -> int:
+        connection = self._connect()
+        with connection:
+            connection.execute("""CREATE TEMP TABLE staging (
+                title, author, url, image_url, genre, itunes_id, popularity)""")
+            rows = []
+            for record in records:
+                row = normalize_row(record)
+                if row:
+                    rows.append(row)
+                if len(rows) >= batch:
+                    connection.executemany("INSERT INTO staging VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                    rows = []
+            if rows:
+                connection.executemany("INSERT INTO staging VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+            # Rebuild in popularity order, keeping existing podcasts not in this dump
+            connection.execute("""INSERT INTO staging
+                SELECT title, author, url, image_url, genre, itunes_id, popularity FROM podcasts
+                WHERE url NOT IN (SELECT url FROM staging)""")
+            connection.execute("DELETE FROM podcasts")
+            # A feed listed twice keeps its first, most popular, entry
+            connection.execute("""INSERT OR IGNORE INTO podcasts
+                (title, author, url, image_url, genre, itunes_id, popularity)
+                SELECT title, author, url, image_url, genre, itunes_id, popularity FROM staging
+                ORDER BY popularity DESC, rowid""")
+            connection.execute("INSERT INTO podcasts_fts(podcasts_fts) VALUES ('rebuild')")
+            connection.execute("DROP TABLE staging")
+        with connection:
+            connection.execute("INSERT INTO podcasts_fts(podcasts_fts) VALUES ('optimize')")
+        connection.execute("VACUUM")
+        return self.count()
+
+    def search(self, query: str, limit: int = SEARCH_RESULT_LIMIT) -> List[dict]:
+        """The most popular podcasts whose title or author has every word of query as a prefix."""
+        match = fts_query(query)
+        if not match or not self.path.exists():
+            return []
+        rows = self._connect().execute("""
+            SELECT p.title, p.author, p.url, p.image_url, p.genre, p.itunes_id
+            FROM podcasts_fts JOIN podcasts p ON p.id = podcasts_fts.rowid
+            WHERE podcasts_fts MATCH ?
+            ORDER BY podcasts_fts.rowid
+            LIMIT ?""", (match, limit)).fetchall()
+        results = []
+        for title, author, url, image_url, genre, itunes_id in rows:
+            result = {"collectionName": title, "artistName": author or "", "feedUrl": url}
+            if image_url:
+                result["artworkUrl600"] = image_url
+            if genre:
+                result["primaryGenreName"] = genre
+            if itunes_id:
+                result["collectionId"] = itunes_id
+            results.append(result)
+        return results
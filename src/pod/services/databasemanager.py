@@ -1,58 +1,210 @@
 # --------------- Database Management ---------------
 import json
+import threading
 
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from datetime import datetime
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple
 
-from src.pod.config.config import DATABASE_FILE
+from src.pod.config.config import DATABASE_FILE, DATABASE_SAVE_DELAY
+from src.pod.models.autodownloadpolicy import AutoDownloadPolicy
 from src.pod.models.episode import Episode
 from src.pod.models.feed import Feed
 
 
+@dataclass(frozen=True)
+class Snapshot:
+    """The library's feed list and queue at one point in time.
+
+    The tuples are never changed once published. The Feed and Episode objects
+    in them are shared with later snapshots, and the writer changes their
+    fields in place.
+    """
+    feeds: Tuple[Feed, ...] = ()
+    queue: Tuple[Tuple[str, str], ...] = ()  # play queue as (feed_id, guid) pairs
+    version: int = 0
+
+
 class PodcastDatabase:
-    """Manages podcast feed and episode data."""
+    """Manages podcast feed and episode data.
 
-    def __init__(self, db_file=DATABASE_FILE):
+    All changes run on one writer thread, in the order they were submitted,
+    through update() or call(). Readers never lock: feeds and queue come from
+    the current Snapshot, and the feed list, each feed's episode tuple and the
+    queue are replaced rather than changed in place, so a reader holding them
+    never sees a half-applied change to what they contain. Fields of feeds and
+    episodes are set in place, one assignment at a time. Saving to disk is
+    coalesced: the file is written once no change has arrived for save_delay
+    seconds, and on close.
+    """
+
+    def __init__(self, db_file=DATABASE_FILE, load: bool = True,
+                 save_delay: float = DATABASE_SAVE_DELAY):
         self.db_file = db_file
-        self.feeds: List[Feed] = []
-        self.load()
+        self.save_delay = save_delay
+        self._save_timer: Optional[threading.Timer] = None
+        self._snapshot = Snapshot()
+        self._lock = threading.Lock()
+        self._pending = 0  # changes submitted and not yet applied
+        self._dirty = False
+        self._writer_ident = None
+        self.closed = False
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db",
+                                         initializer=self._init_writer)
+        if load:
+            self.load()
+
+    def _init_writer(self):
+        self._writer_ident = threading.get_ident()
+
+    def _on_writer(self) -> bool:
+        return threading.get_ident() == self._writer_ident
+
+    @property
+    def feeds(self) -> Tuple[Feed, ...]:
+        return self._snapshot.feeds
+
+    @property
+    def queue(self) -> Tuple[Tuple[str, str], ...]:
+        return self._snapshot.queue
+
+    def snapshot(self) -> Snapshot:
+        """The current state, safe to read from any thread."""
+        return self._snapshot
+
+    def _publish(self, **changes):
+        """Replace the snapshot. Writer thread only."""
+        self._snapshot = replace(self._snapshot, version=self._snapshot.version + 1, **changes)
+
+    def update(self, fn: Callable, *args, save: bool = True) -> Future:
+        """Apply a change on the writer thread without waiting for it.
+
+        fn may change episodes and feeds freely; it runs after every change
+        submitted before it. With save the database is written to disk once
+        changes stop for a moment. Called on the writer thread, fn runs
+        immediately. After close() changes are only made in memory.
+        """
+        if self._on_writer() or self.closed:
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            if save and not self.closed:
+                self._dirty = True
+            return future
+        with self._lock:
+            self._pending += 1
+        return self.writer.submit(self._apply, fn, args, save)
+
+    def call(self, fn: Callable, *args, save: bool = True):
+        """Apply a change on the writer thread and wait for its result."""
+        return self.update(fn, *args, save=save).result()
+
+    def _apply(self, fn: Callable, args, save: bool):
+        try:
+            return fn(*args)
+        except Exception as e:
+            print(f"Database update error: {e}")
+            raise
+        finally:
+            if save:
+                self._dirty = True
+            with self._lock:
+                self._pending -= 1
+                idle = not self._pending
+            if idle and self._dirty:
+                self._schedule_save()
+
+    def _schedule_save(self):
+        """(Re)start the countdown to saving. Writer thread only."""
+        if self._save_timer:
+            self._save_timer.cancel()
+        self._save_timer = threading.Timer(self.save_delay, self._request_save)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def _request_save(self):
+        try:
+            self.writer.submit(self._flush)
+        except RuntimeError:
+            pass  # closed; close() saved already
+
+    def _flush(self):
+        """Write the file if anything changed since the last write. Writer thread only."""
+        if self._dirty:
+            self._dirty = False
+            self._write()
 
     def load(self):
         """Load data from file."""
+        feeds, queue = [], []
         if self.db_file.exists():
             try:
                 with open(self.db_file, 'r') as f:
                     data = json.load(f)
-                self.feeds = [Feed.from_dict(feed_data) for feed_data in data["feeds"]]
+                feeds = [Feed.from_dict(feed_data) for feed_data in data["feeds"]]
+                queue = data.get("queue", [])
             except (json.JSONDecodeError, KeyError) as e:
                 print(f"Error loading database: {e}")
-                self.feeds = []
-        else:
-            self.feeds = []
+                feeds, queue = [], []
+        self._publish(feeds=tuple(feeds), queue=tuple(tuple(item) for item in queue))
 
     def save(self):
-        """Save data to file."""
+        """Have the writer save the database once pending changes are applied."""
+        self.update(lambda: None)
+
+    def _write(self):
+        """Write the database to file. Writer thread only."""
+        snapshot = self._snapshot
         data = {
-            "feeds": [feed.to_dict() for feed in self.feeds]
+            "feeds": [feed.to_dict() for feed in snapshot.feeds],
+            "queue": [list(item) for item in snapshot.queue]
         }
-        with open(self.db_file, 'w') as f:
+        tmp = self.db_file.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
             json.dump(data, f, indent=2)
+        tmp.replace(self.db_file)
+
+    def close(self):
+        """Apply outstanding changes, save if needed and stop the writer."""
+        if self._save_timer:
+            self._save_timer.cancel()
+        self.writer.submit(self._flush).result()
+        self.closed = True
+        self.writer.shutdown(wait=True)
 
     def add_feed(self, feed: Feed):
         """Add a new feed."""
+        return self.call(self._add_feed, feed)
+
+    def _add_feed(self, feed: Feed):
         # Check if feed already exists
         for existing_feed in self.feeds:
             if existing_feed.url == feed.url:
                 return existing_feed
 
-        self.feeds.append(feed)
-        self.save()
+        self._publish(feeds=self.feeds + (feed,))
         return feed
 
     def remove_feed(self, feed_id: str):
         """Remove a feed by ID."""
-        self.feeds = [feed for feed in self.feeds if feed.id != feed_id]
-        self.save()
+        self.call(lambda: self._publish(
+            feeds=tuple(feed for feed in self.feeds if feed.id != feed_id)))
+
+    def set_queue(self, items: List[Tuple[str, str]]):
+        """Replace the play queue."""
+        self.call(lambda: self._publish(queue=tuple(tuple(item) for item in items)))
+
+    def set_auto_download(self, feed_id: str, policy: AutoDownloadPolicy) -> Future:
+        """Replace a feed's auto-download policy."""
+        def apply():
+            feed = self.get_feed(feed_id)
+            if feed:
+                feed.auto_download = policy
+
+        return self.update(apply)
 
     def get_feed(self, feed_id: str) -> Optional[Feed]:
         """Get feed by ID."""
@@ -61,6 +213,28 @@ class PodcastDatabase:
                 return feed
         return None
 
+    def get_episode(self, feed_id: str, guid: str) -> Optional[Episode]:
+        """Get an episode by feed ID and GUID."""
+        feed = self.get_feed(feed_id)
+        if not feed:
+            return None
+        for episode in feed.episodes:
+            if episode.guid == guid:
+                return episode
+        return None
+
+    def count_episodes(self, feed_id: str) -> int:
+        """Number of episodes in a feed."""
+        feed = self.get_feed(feed_id)
+        return len(feed.episodes) if feed else 0
+
+    def get_episodes(self, feed_id: str, offset: int = 0, limit: int = 50) -> List[Episode]:
+        """One page of a feed's episodes, in feed order."""
+        feed = self.get_feed(feed_id)
+        if not feed:
+            return []
+        return list(feed.episodes[offset:offset + limit])
+
     def get_recent_episodes(self, limit=20) -> List[Episode]:
         """Get most recently published episodes across all feeds."""
         all_episodes = []
@@ -81,15 +255,22 @@ class PodcastDatabase:
         downloaded.sort(key=lambda e: e.pub_date if e.pub_date else datetime.min, reverse=True)
         return downloaded
 
-    def update_episode_progress(self, feed_id: str, guid: str, position: int):
+    def update_episode_progress(self, feed_id: str, guid: str, position: int, save: bool = True):
         """Update playback position for an episode."""
-        feed = self.get_feed(feed_id)
-        if not feed:
-            return
-
-        for episode in feed.episodes:
-            if episode.guid == guid:
+        def apply():
+            episode = self.get_episode(feed_id, guid)
+            if episode:
                 episode.play_position = position
                 episode.played = True
-                self.save()
-                break
+
+        self.update(apply, save=save)
+
+    def mark_episode_finished(self, feed_id: str, guid: str):
+        """Mark an episode as played through and reset its position."""
+        def apply():
+            episode = self.get_episode(feed_id, guid)
+            if episode:
+                episode.play_position = 0
+                episode.played = True
+
+        self.update(apply)
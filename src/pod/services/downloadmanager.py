@@ -1,65 +1,106 @@
 # --------------- Download Manager ---------------
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
-import requests
+import httpx
 
-from src.pod.config.config import DOWNLOADS_DIR
+from src.pod.config.config import (
+    DOWNLOADS_DIR, DOWNLOAD_SEGMENTS, SEGMENTED_DOWNLOAD_THRESHOLD
+)
 from src.pod.models.episode import Episode
 from src.pod.models.feed import Feed
+from src.pod.services.bandwidth import BandwidthLimiter, INTERACTIVE
+from src.pod.services.blobstore import BlobStore
+from src.pod.services.downloadwriter import DownloadWriter, open_download_file
+from src.pod.services.httpclient import HttpClient
+from src.pod.services.mediaprober import MediaProber
+from src.pod.services.progressbus import DownloadProgress, ProgressBus
+from src.pod.services.silencemap import SilenceAnalyzer
+from src.pod.services.storagemanager import StorageManager
+
+
+def download_key(episode: Episode) -> str:
+    """TaskRunner key of an episode's download, shared by everything that starts one."""
+    return f"download:{episode.feed_id}:{episode.guid}"
 
 
 class DownloadManager:
     """Manages episode downloading."""
 
-    def __init__(self, download_dir=DOWNLOADS_DIR, database=None):
+    def __init__(self, download_dir=DOWNLOADS_DIR, database=None,
+                 segments=DOWNLOAD_SEGMENTS,
+                 segment_threshold=SEGMENTED_DOWNLOAD_THRESHOLD,
+                 limiter: BandwidthLimiter | None = None,
+                 http: HttpClient | None = None,
+                 storage: StorageManager | None = None,
+                 store: BlobStore | None = None,
+                 progress: ProgressBus | None = None,
+                 prober: MediaProber | None = None,
+                 analyzer: SilenceAnalyzer | None = None):
         self.download_dir = download_dir
         self.database = database
-        self.current_downloads = {}  # track in-progress downloads
+        self.limiter = limiter or BandwidthLimiter()
+        self.http = http or HttpClient()
+        self.storage = storage
+        self.store = store or BlobStore(self.download_dir / "blobs", database)
+        self.segments = segments
+        self.segment_threshold = segment_threshold
+        self.progress = progress or ProgressBus()  # in-progress downloads and their progress
+        self.prober = prober  # fills in real duration/bitrate/codec after download
+        self.analyzer = analyzer  # builds silence maps for smart speed
+
+    def download_episode(self, episode: Episode, feed: Feed | None, priority=INTERACTIVE):
+        """Download an episode.
 
-    def download_episode(self, episode: Episode, feed: Feed | None):
-        """Download an episode."""
+        Also True when a download or stream of the episode is already
+        running, since that one will finish the job.
+        """
         if feed:
+            if not self.progress.try_start(episode.guid, episode.audio_size or 0):
+                return True
+
             # Create feed directory
             feed_dir = self.download_dir / feed.id
             feed_dir.mkdir(exist_ok=True)
 
-            # Determine file path
-            filename = f"{episode.guid}.mp3"  # Using guid ensures uniqueness
+            # Download next to the feed, then move into the blob store
+            filename = f"{episode.guid}.part"  # Using guid ensures uniqueness
             filepath = feed_dir / filename
 
+            # Make room within the quota before any bytes arrive
+            if self.storage and not self.storage.reserve(episode):
+                print(f"Download error: not enough space within quota for {episode.title}")
+                self.progress.finish(episode.guid, False)
+                return False
+
             try:
-                # Stream download with progress tracking
-                r = requests.get(episode.audio_url, stream=True)
-                r.raise_for_status()
+                # Large files on servers that support ranges are split up
+                total_length = self._probe_ranges(episode.audio_url)
+                with self.limiter.transfer(priority):
+                    if total_length and self.segments > 1 and total_length >= self.segment_threshold:
+                        self._download_segmented(episode, filepath, total_length, priority)
+                    else:
+                        self._download_single(episode, filepath, priority)
 
-                content_length = int(r.headers.get('content-length', 0))
+                # Verify and deduplicate; sets download_path
+                self.store.ingest(filepath, episode)
 
-                with open(filepath, 'wb') as f:
-                    if content_length == 0:
-                        # No content length header
-                        f.write(r.content)
-                    else:
-                        # Stream with progress
-                        dl = 0
-                        for chunk in r.iter_content(chunk_size=8192):
-                            if chunk:
-                                dl += len(chunk)
-                                f.write(chunk)
-                                # Update progress
-                                progress = (dl / content_length) * 100
-                                self.current_downloads[episode.guid] = progress
-
-                # Update episode
-                episode.downloaded = True
-                episode.download_path = filepath
+                # Update episode and save
+                self.mark_downloaded(episode)
 
-                # Save database
-                if self.database:
-                    self.database.save()
+                self.progress.finish(episode.guid, True)
+                if self.prober:
+                    self.prober.submit(episode)
+                if self.analyzer:
+                    self.analyzer.submit(episode)
 
-                # Remove from current downloads
-                if episode.guid in self.current_downloads:
-                    del self.current_downloads[episode.guid]
+                # Files without a declared length are only checked afterwards
+                if self.storage:
+                    self.storage.release(episode)
+                    self.storage.enforce(keep=episode)
 
                 return True
 
@@ -69,24 +110,124 @@ class DownloadManager:
                 # Clean up failed download
                 if filepath.exists():
                     filepath.unlink()
+                self.progress.finish(episode.guid, False)
+                if self.storage:
+                    self.storage.release(episode)
                 return False
         return False
 
-    def get_download_progress(self, episode_guid: str) -> float:
-        """Get download progress percentage for an episode."""
-        return self.current_downloads.get(episode_guid, 0.0)
+    def _probe_ranges(self, url: str) -> int:
+        """Return the content length if the server accepts byte ranges, else 0."""
+        try:
+            r = self.http.client.head(url)
+            r.raise_for_status()
+        except httpx.HTTPError:
+            return 0
+
+        if r.headers.get('accept-ranges', '').lower() != 'bytes':
+            return 0
+        return int(r.headers.get('content-length', 0))
+
+    def _download_single(self, episode: Episode, filepath: Path, priority: str):
+        """Download an episode over a single stream."""
+        # Stream download with progress tracking; memory use is one buffer
+        # whether or not the server sends a length
+        with self.http.client.stream("GET", episode.audio_url) as r:
+            r.raise_for_status()
+
+            content_length = int(r.headers.get('content-length', 0))
+            if content_length:
+                self.progress.set_total(episode.guid, content_length)
+
+            fd = open_download_file(filepath, content_length)
+            try:
+                with DownloadWriter(fd) as writer:
+                    for chunk in r.iter_bytes():
+                        if chunk:
+                            self.limiter.throttle(len(chunk), priority)
+                            writer.write(chunk)
+                            self.progress.update(episode.guid, writer.position)
+
+                # Preallocated space must have been filled exactly
+                if content_length and writer.position != content_length:
+                    raise IOError(
+                        f"Size mismatch: expected {content_length}, got {writer.position}"
+                    )
+            finally:
+                os.close(fd)
+
+    def _download_segmented(self, episode: Episode, filepath: Path, total_length: int,
+                            priority: str):
+        """Download an episode as concurrent byte ranges into a preallocated file."""
+        segment_size = -(-total_length // self.segments)  # ceiling division
+        ranges = [
+            (start, min(start + segment_size, total_length) - 1)
+            for start in range(0, total_length, segment_size)
+        ]
+
+        lock = threading.Lock()
+        received = [0]
+        self.progress.set_total(episode.guid, total_length)
+
+        def fetch_range(fd, start, end):
+            headers = {"Range": f"bytes={start}-{end}"}
+            with self.http.client.stream("GET", episode.audio_url, headers=headers) as r:
+                r.raise_for_status()
+                if r.status_code != 206:
+                    raise IOError(f"Server ignored range request ({r.status_code})")
+
+                with DownloadWriter(fd, offset=start) as writer:
+                    for chunk in r.iter_bytes():
+                        if not chunk:
+                            continue
+                        if writer.position + len(chunk) > end + 1:
+                            raise IOError(f"Range {start}-{end} returned too much data")
+                        self.limiter.throttle(len(chunk), priority)
+                        writer.write(chunk)
+                        with lock:
+                            received[0] += len(chunk)
+                            self.progress.update(episode.guid, received[0])
+
+            if writer.position != end + 1:
+                raise IOError(f"Range {start}-{end} incomplete ({writer.position - start} bytes)")
+
+        # Preallocate so every segment can write at its own offset
+        fd = open_download_file(filepath, total_length)
+        try:
+            with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+                futures = [pool.submit(fetch_range, fd, start, end) for start, end in ranges]
+                for future in futures:
+                    future.result()
+
+            # Verify the assembled file
+            if os.fstat(fd).st_size != total_length or received[0] != total_length:
+                raise IOError(
+                    f"Size mismatch: expected {total_length}, got {received[0]}"
+                )
+        finally:
+            os.close(fd)
+
+    def mark_downloaded(self, episode: Episode):
+        """Record a finished download on the database writer and save."""
+        def apply():
+            episode.downloaded = True
+            episode.last_accessed = datetime.now()
+
+        if self.database:
+            self.database.call(apply)
+        else:
+            apply()
+
+    def get_download_progress(self, episode_guid: str) -> DownloadProgress | None:
+        """Get the latest progress snapshot for an episode, if it is downloading."""
+        return self.progress.get(episode_guid)
 
     def delete_downloaded_episode(self, episode: Episode):
         """Delete a downloaded episode."""
         if episode.downloaded and episode.download_path:
             try:
-                # Delete file
-                if Path(episode.download_path).exists():
-                    Path(episode.download_path).unlink()
-
-                # Update episode
-                episode.downloaded = False
-                episode.download_path = None
+                # Delete file unless another episode shares it
+                self.store.release(episode)
 
                 # Save database
                 if self.database:
@@ -97,3 +238,70 @@ class DownloadManager:
                 print(f"Delete error: {e}")
                 return False
         return False
+
+
+# Benchmark: single stream vs segmented download against a throttled local server
+if __name__ == "__main__":
+    import tempfile
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    PAYLOAD = os.urandom(32 * 1024 * 1024)
+    PER_CONNECTION_RATE = 8 * 1024 * 1024  # bytes/s, mimics CDN per-connection throttling
+
+    class RangeHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_headers(self, start, end, partial):
+            self.send_response(206 if partial else 200)
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Length", str(end - start + 1))
+            if partial:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+            self.end_headers()
+
+        def _range(self):
+            header = self.headers.get("Range")
+            if not header:
+                return 0, len(PAYLOAD) - 1, False
+            start, end = header.removeprefix("bytes=").split("-")
+            return int(start), int(end or len(PAYLOAD) - 1), True
+
+        def do_HEAD(self):
+            self._send_headers(0, len(PAYLOAD) - 1, False)
+
+        def do_GET(self):
+            start, end, partial = self._range()
+            self._send_headers(start, end, partial)
+            chunk = 256 * 1024
+            for offset in range(start, end + 1, chunk):
+                self.wfile.write(PAYLOAD[offset:min(offset + chunk, end + 1)])
+                time.sleep(chunk / PER_CONNECTION_RATE)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/episode.mp3"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the store and its verification record out of the real ~/.pod
+        store = BlobStore(root=Path(tmp) / "blobs", verify_file=Path(tmp) / "verified.json")
+        for segments in (1, 2, 4, 8):
+            manager = DownloadManager(download_dir=Path(tmp), segments=segments,
+                                      segment_threshold=0, store=store)
+            feed = Feed(title="Bench", url=url, author="", description="")
+            episode = Episode(title="Bench", audio_url=url, pub_date=None,
+                              description="", duration=0, feed_id=feed.id,
+                              guid=f"bench-{segments}")
+
+            started = time.perf_counter()
+            ok = manager.download_episode(episode, feed)
+            elapsed = time.perf_counter() - started
+
+            assert ok and episode.download_path
+            assert episode.download_path.read_bytes() == PAYLOAD
+            manager.delete_downloaded_episode(episode)
+            print(f"{segments} segment(s): {elapsed:.2f}s "
+                  f"({len(PAYLOAD) / elapsed / 1024 / 1024:.1f} MiB/s)")
+
+    server.shutdown()
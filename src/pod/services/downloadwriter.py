@@ -0,0 +1,187 @@
+# --------------- Download Writer ---------------
+import os
+import threading
+
+from src.pod.config.config import (
+    DOWNLOAD_BUFFER_SIZE, DOWNLOAD_BUFFER_POOL_SIZE, DOWNLOAD_FSYNC,
+    DOWNLOAD_FSYNC_INTERVAL, DOWNLOAD_WRITE_THROUGH
+)
+
+# fsync policies
+FSYNC_NEVER = "never"  # leave it to the OS
+FSYNC_END = "end"  # once the download is complete
+FSYNC_INTERVAL = "interval"  # every DOWNLOAD_FSYNC_INTERVAL bytes and at the end
+
+
+class BufferPool:
+    """Reuses large write buffers so downloads do not allocate per chunk."""
+
+    def __init__(self, buffer_size: int = DOWNLOAD_BUFFER_SIZE,
+                 max_buffers: int = DOWNLOAD_BUFFER_POOL_SIZE):
+        self.buffer_size = buffer_size
+        self.max_buffers = max_buffers
+        self.lock = threading.Lock()
+        self.free = []
+
+    def acquire(self) -> bytearray:
+        with self.lock:
+            if self.free:
+                return self.free.pop()
+        return bytearray(self.buffer_size)
+
+    def release(self, buffer: bytearray):
+        with self.lock:
+            if len(self.free) < self.max_buffers:
+                self.free.append(buffer)
+
+
+buffer_pool = BufferPool()
+
+
+def open_download_file(path, total_length: int = 0) -> int:
+    """Open a file for positional writes, preallocating it when the length is known."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+    if total_length:
+        try:
+            os.posix_fallocate(fd, 0, total_length)
+        except (AttributeError, OSError):
+            # Not available on every platform/filesystem
+            os.ftruncate(fd, total_length)
+    return fd
+
+
+class DownloadWriter:
+    """Writes a stream of chunks at a file offset through one pooled buffer.
+
+    Small chunks are copied into a preallocated buffer through a memoryview
+    and written with a single os.pwrite when it fills; chunks of at least
+    DOWNLOAD_WRITE_THROUGH bytes are written as they are, since copying them
+    costs more than the call it saves. Memory use is one buffer per stream no
+    matter how large the file is or whether the server sent a length. Several
+    writers can share an fd for segmented downloads.
+    """
+
+    def __init__(self, fd: int, offset: int = 0, pool: BufferPool = buffer_pool,
+                 fsync_policy: str = DOWNLOAD_FSYNC):
+        self.fd = fd
+        self.offset = offset  # file position of the start of the buffer
+        self.pool = pool
+        self.fsync_policy = fsync_policy
+        self.buffer = pool.acquire()
+        self.view = memoryview(self.buffer)
+        self.fill = 0
+        self.unsynced = 0
+
+    @property
+    def position(self) -> int:
+        """File position after everything written so far."""
+        return self.offset + self.fill
+
+    def write(self, chunk: bytes):
+        data = memoryview(chunk)
+        if len(data) >= DOWNLOAD_WRITE_THROUGH:
+            self.flush()
+            self._pwrite(data)
+            return
+        while data:
+            n = min(len(data), len(self.buffer) - self.fill)
+            self.view[self.fill:self.fill + n] = data[:n]
+            self.fill += n
+            data = data[n:]
+            if self.fill == len(self.buffer):
+                self.flush()
+
+    def flush(self):
+        """Write out the buffered bytes."""
+        fill, self.fill = self.fill, 0
+        self._pwrite(self.view[:fill])
+
+    def _pwrite(self, data: memoryview):
+        """Write data at the buffer's file position, which it then moves past."""
+        written = 0
+        while written < len(data):
+            written += os.pwrite(self.fd, data[written:], self.offset + written)
+        self.offset += written
+        self.unsynced += written
+
+        if self.fsync_policy == FSYNC_INTERVAL and self.unsynced >= DOWNLOAD_FSYNC_INTERVAL:
+            os.fsync(self.fd)
+            self.unsynced = 0
+
+    def close(self):
+        """Flush, sync according to the policy and return the buffer to the pool."""
+        try:
+            self.flush()
+            if self.fsync_policy in (FSYNC_END, FSYNC_INTERVAL) and self.unsynced:
+                os.fsync(self.fd)
+        finally:
+            self.view.release()
+            self.pool.release(self.buffer)
+            self.buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Benchmark: 8 KB chunk writes vs pooled DownloadWriter against a local server
+if __name__ == "__main__":
+    import tempfile
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from pathlib import Path
+
+    import httpx
+
+    PAYLOAD = os.urandom(256 * 1024 * 1024)
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(PAYLOAD)))
+            self.end_headers()
+            view = memoryview(PAYLOAD)
+            for offset in range(0, len(PAYLOAD), 1024 * 1024):
+                self.wfile.write(view[offset:offset + 1024 * 1024])
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/episode.mp3"
+
+    def chunked(client, path):
+        with client.stream("GET", url) as r, open(path, "wb") as f:
+            for chunk in r.iter_bytes(chunk_size=8192):
+                f.write(chunk)
+
+    def pooled(client, path):
+        # As DownloadManager reads: chunks as they come off the socket
+        with client.stream("GET", url) as r:
+            fd = open_download_file(path, int(r.headers["content-length"]))
+            try:
+                with DownloadWriter(fd, fsync_policy=FSYNC_NEVER) as writer:
+                    for chunk in r.iter_bytes():
+                        writer.write(chunk)
+            finally:
+                os.close(fd)
+
+    methods = (("8 KB chunks", chunked), ("DownloadWriter", pooled))
+    best = {name: float("inf") for name, _ in methods}
+    with tempfile.TemporaryDirectory() as tmp, httpx.Client() as client:
+        # Alternate the methods and keep each one's best run, as timings are noisy
+        for _ in range(3):
+            for name, method in methods:
+                path = Path(tmp) / name
+                path.unlink(missing_ok=True)
+                started = time.perf_counter()
+                method(client, path)
+                best[name] = min(best[name], time.perf_counter() - started)
+                assert path.stat().st_size == len(PAYLOAD)
+    for name, elapsed in best.items():
+        print(f"{name}: {len(PAYLOAD) / elapsed / 1024 / 1024:.0f} MiB/s")
+
+    server.shutdown()
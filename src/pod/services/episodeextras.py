@@ -0,0 +1,276 @@
+# --------------- Chapters and Transcripts ---------------
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+from src.pod.config.config import (
+    EXTRAS_DIR, EXTRAS_MAX_BYTES, EXTRAS_MEMORY_ITEMS, TRANSCRIPT_INDEX_FILE,
+    TRANSCRIPT_SEARCH_LIMIT
+)
+from src.pod.models.episode import Episode
+from src.pod.services.catalog import fts_query
+from src.pod.services.httpclient import HttpClient
+from src.pod.services.taskrunner import IO, Cancelled, TaskRunner, current_token
+
+
+@dataclass(frozen=True)
+class Chapter:
+    start: float  # seconds
+    title: str
+    url: Optional[str] = None
+    image: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Cue:
+    """One timed line of a transcript."""
+    start: float  # seconds
+    end: float
+    text: str
+    speaker: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class TranscriptHit:
+    """A transcript search match: the episode and the moment it was said."""
+    feed_id: str
+    guid: str
+    start: float
+    text: str
+
+
+def parse_chapters(data: bytes) -> List[Chapter]:
+    """Chapters from a podcast namespace JSON chapters file, in order."""
+    chapters = []
+    for item in json.loads(data).get("chapters", []):
+        # Chapters left out of the table of contents only carry artwork
+        if "startTime" not in item or item.get("toc") is False:
+            continue
+        chapters.append(Chapter(float(item["startTime"]), item.get("title") or "",
+                                item.get("url"), item.get("img")))
+    return sorted(chapters, key=lambda chapter: chapter.start)
+
+
+def _timestamp(value: str) -> float:
+    """Seconds from an SRT or WebVTT timestamp (HH:MM:SS,mmm, HH:MM:SS.mmm or MM:SS.mmm)."""
+    seconds = 0.0
+    for part in value.strip().replace(",", ".").split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+_VOICE = re.compile(r"<v(?:\.[^ >]*)?\s+([^>]+)>")
+_TAG = re.compile(r"<[^>]+>")
+
+
+def parse_timed_text(text: str) -> List[Cue]:
+    """Cues from SRT or WebVTT. Blocks without a timing line are skipped."""
+    cues = []
+    for block in re.split(r"\n\s*\n", text.replace("\r\n", "\n").replace("\r", "\n")):
+        lines = block.strip().split("\n")
+        for i, line in enumerate(lines):
+            if "-->" not in line:
+                continue
+            start, end = line.split("-->", 1)
+            body = " ".join(lines[i + 1:]).strip()
+            voice = _VOICE.search(body)
+            body = " ".join(_TAG.sub("", body).split())
+            if body:
+                # WebVTT cue settings may follow the end time
+                cues.append(Cue(_timestamp(start), _timestamp(end.split()[0]), body,
+                                voice.group(1).strip() if voice else None))
+            break
+    return cues
+
+
+def parse_transcript(data: bytes, mime_type: Optional[str] = None) -> List[Cue]:
+    """Cues from a JSON, SRT or WebVTT transcript. Untimed formats give none."""
+    text = data.decode("utf-8-sig", errors="replace")
+    if mime_type == "application/json" or text.lstrip().startswith("{"):
+        segments = json.loads(text).get("segments", [])
+        return [Cue(float(segment["startTime"]), float(segment.get("endTime", segment["startTime"])),
+                    segment.get("body", "").strip(), segment.get("speaker"))
+                for segment in segments if "startTime" in segment and segment.get("body", "").strip()]
+    if mime_type in ("text/html", "text/plain") and "-->" not in text:
+        return []
+    return parse_timed_text(text)
+
+
+def chapter_at(chapters: List[Chapter], seconds: float) -> Optional[Chapter]:
+    """The chapter playing at a position, if any."""
+    current = None
+    for chapter in chapters:
+        if chapter.start > seconds:
+            break
+        current = chapter
+    return current
+
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    url TEXT PRIMARY KEY,
+    feed_id TEXT NOT NULL,
+    guid TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS cues USING fts5(
+    text, url UNINDEXED, start UNINDEXED,
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+
+class EpisodeExtras:
+    """Chapters and transcripts referenced by episodes, fetched on first use.
+
+    Files are parsed once and kept on disk as JSON under the SHA-256 of their
+    URL, with the most recently used also kept in memory. Every transcript
+    loaded is added to a full-text index, so search() finds moments across
+    all episodes whose transcripts have been fetched, which includes queued
+    episodes once prefetch() has run.
+    """
+
+    def __init__(self, http: HttpClient, tasks: TaskRunner | None = None,
+                 cache_dir: Path = EXTRAS_DIR, index_path: Path = TRANSCRIPT_INDEX_FILE,
+                 memory_items: int = EXTRAS_MEMORY_ITEMS):
+        self.http = http
+        self.tasks = tasks
+        self.cache_dir = Path(cache_dir)
+        self.index_path = Path(index_path)
+        self.memory_items = memory_items
+        self.lock = threading.Lock()
+        self.memory: "OrderedDict[str, list]" = OrderedDict()  # url -> parsed items
+        self.indexed: Optional[set] = None  # transcript URLs in the index
+        self.local = threading.local()  # one index connection per thread
+        self.index_lock = threading.Lock()  # one index writer at a time
+
+    def chapters(self, episode: Episode) -> List[Chapter]:
+        """An episode's chapters, fetching them if needed. Empty if it has none."""
+        ref = episode.chapters
+        if not ref or not ref.get("url"):
+            return []
+        return self._load(ref["url"], parse_chapters, Chapter)
+
+    def transcript(self, episode: Episode) -> List[Cue]:
+        """An episode's transcript cues, fetching and indexing them if needed."""
+        ref = episode.transcript
+        if not ref or not ref.get("url"):
+            return []
+        cues = self._load(ref["url"], lambda data: parse_transcript(data, ref.get("type")), Cue)
+        self._index(episode, ref["url"], cues)
+        return cues
+
+    def request_chapters(self, episode: Episode, on_ready: Callable[[List[Chapter]], None]):
+        """Load chapters in the background and pass them to on_ready, on a worker thread."""
+        self._request(self.chapters, episode, episode.chapters, on_ready)
+
+    def request_transcript(self, episode: Episode, on_ready: Callable[[List[Cue]], None]):
+        """Load a transcript in the background and pass it to on_ready, on a worker thread."""
+        self._request(self.transcript, episode, episode.transcript, on_ready)
+
+    def prefetch(self, episodes: Iterable[Episode]):
+        """Fetch chapters and transcripts ahead of use, e.g. for queued episodes."""
+        for episode in episodes:
+            if episode.chapters:
+                self.request_chapters(episode, lambda chapters: None)
+            if episode.transcript:
+                self.request_transcript(episode, lambda cues: None)
+
+    def _request(self, load, episode: Episode, ref, on_ready):
+        if not ref or not ref.get("url"):
+            on_ready([])
+        elif not self.tasks:
+            on_ready(load(episode))
+        else:
+            self.tasks.submit(IO, load, episode, key=f"extras:{ref['url']}",
+                              name=f"{load.__name__.capitalize()} of {episode.title}",
+                              on_done=on_ready)
+
+    def search(self, query: str, limit: int = TRANSCRIPT_SEARCH_LIMIT) -> List[TranscriptHit]:
+        """Moments in indexed transcripts containing every word of query, best first."""
+        match = fts_query(query)
+        if not match or not self.index_path.exists():
+            return []
+        rows = self._connect().execute("""
+            SELECT t.feed_id, t.guid, cues.start, cues.text
+            FROM cues JOIN transcripts t ON t.url = cues.url
+            WHERE cues MATCH ?
+            ORDER BY rank
+            LIMIT ?""", (match, limit)).fetchall()
+        return [TranscriptHit(feed_id, guid, start, text) for feed_id, guid, start, text in rows]
+
+    def _load(self, url: str, parse, item_type) -> list:
+        """Parsed items for a URL from memory, disk or the network. Empty on failure."""
+        with self.lock:
+            items = self.memory.get(url)
+            if items is not None:
+                self.memory.move_to_end(url)
+                return items
+        key = hashlib.sha256(url.encode()).hexdigest()
+        path = self.cache_dir / f"{key}.json"
+        try:
+            try:
+                with open(path) as f:
+                    items = [item_type(**item) for item in json.load(f)]
+            except (OSError, ValueError, TypeError):
+                items = parse(self._fetch(url))
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp = self.cache_dir / f"{key}.{threading.get_ident()}.tmp"
+                with open(tmp, "w") as f:
+                    json.dump([asdict(item) for item in items], f, separators=(",", ":"))
+                tmp.replace(path)
+        except Cancelled:
+            raise
+        except Exception as e:
+            print(f"Error loading {url}: {e}")
+            return []
+
+        with self.lock:
+            self.memory[url] = items
+            while len(self.memory) > self.memory_items:
+                self.memory.popitem(last=False)
+        return items
+
+    def _fetch(self, url: str) -> bytes:
+        token = current_token()
+        with self.http.client.stream("GET", url) as response:
+            response.raise_for_status()
+            chunks, received = [], 0
+            for chunk in response.iter_bytes():
+                token.check()
+                received += len(chunk)
+                if received > EXTRAS_MAX_BYTES:
+                    raise IOError(f"file larger than {EXTRAS_MAX_BYTES} bytes")
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.index_path, timeout=30)
+            connection.executescript(INDEX_SCHEMA)
+            self.local.connection = connection
+        return connection
+
+    def _index(self, episode: Episode, url: str, cues: List[Cue]):
+        """Add a transcript to the search index unless it is there already."""
+        if not cues:
+            return
+        with self.index_lock:
+            connection = self._connect()
+            if self.indexed is None:
+                self.indexed = {row[0] for row in connection.execute("SELECT url FROM transcripts")}
+            if url in self.indexed:
+                return
+            with connection:
+                connection.execute("INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?)",
+                                   (url, episode.feed_id, episode.guid))
+                connection.executemany("INSERT INTO cues (text, url, start) VALUES (?, ?, ?)",
+                                       [(cue.text, url, cue.start) for cue in cues])
+            self.indexed.add(url)
@@ -1,24 +1,69 @@
 # --------------- Feed Updater ---------------
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Optional
 
+from src.pod.config.config import PREVIEW_CACHE_SIZE, PREVIEW_CACHE_TTL
 from src.pod.models.episode import Episode
 from src.pod.models.feed import Feed
+from src.pod.services.bandwidth import BandwidthLimiter, INTERACTIVE
 from src.pod.services.databasemanager import PodcastDatabase
+from src.pod.services.httpclient import HttpClient
 from src.pod.services.rss import PodcastRSSParser
+from src.pod.services.taskrunner import IO, TaskRunner, current_token
 
 class FeedUpdater:
-    """Updates podcast feeds from RSS."""
+    """Updates podcast feeds from RSS.
 
-    def __init__(self, database: PodcastDatabase):
+    Previews of feeds not subscribed to are kept for PREVIEW_CACHE_TTL
+    seconds, so subscribing right after a preview starts from it instead of
+    waiting for the whole feed.
+    """
+
+    def __init__(self, database: PodcastDatabase, limiter: BandwidthLimiter | None = None,
+                 http: HttpClient | None = None, tasks: TaskRunner | None = None):
         self.database = database
-        self.parser = PodcastRSSParser()
+        self.tasks = tasks
+        self.parser = PodcastRSSParser(limiter, http)
+        self.previews: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()  # url -> (time, data)
+        self.previews_lock = threading.Lock()
+
+    def preview_feed(self, url: str) -> Optional[dict]:
+        """Podcast metadata and latest episodes of a feed, from a partial fetch."""
+        feed_data = self._cached_preview(url)
+        if feed_data:
+            return feed_data
+        feed_data = self.parser.parse_preview(url)
+        if feed_data:
+            with self.previews_lock:
+                self.previews[url] = (time.time(), feed_data)
+                while len(self.previews) > PREVIEW_CACHE_SIZE:
+                    self.previews.popitem(last=False)
+        return feed_data
+
+    def _cached_preview(self, url: str) -> Optional[dict]:
+        with self.previews_lock:
+            entry = self.previews.get(url)
+            if not entry:
+                return None
+            if time.time() - entry[0] >= PREVIEW_CACHE_TTL:
+                del self.previews[url]
+                return None
+            self.previews.move_to_end(url)
+            return entry[1]
 
     def add_feed_from_url(self, url: str) -> Optional[Feed]:
-        """Add a new feed from URL."""
+        """Add a new feed from URL.
+
+        A fresh preview of the feed is used if there is one. When it held only
+        the latest episodes, the rest are fetched after the feed is added.
+        """
         try:
-            # Parse feed
-            feed_data = self.parser.parse_feed(url)
+            # Parse feed, unless a preview has it already
+            preview = self._cached_preview(url)
+            feed_data = preview or self.parser.parse_feed(url, priority=INTERACTIVE)
             if not feed_data:
                 return None
 
@@ -32,6 +77,7 @@ class FeedUpdater:
             )
 
             # Add episodes
+            episodes = []
             for ep_data in feed_data.get("episodes", []):
                 pub_date = ep_data.get("pub_date")
                 duration_seconds = ep_data.get("duration_seconds", 0)
@@ -44,12 +90,27 @@ class FeedUpdater:
                     duration=duration_seconds,
                     feed_id=feed.id,
                     guid=ep_data.get("guid", ""),
-                    image_url=ep_data.get("image_url")
+                    image_url=ep_data.get("image_url"),
+                    audio_size=ep_data.get("audio_size"),
+                    audio_type=ep_data.get("audio_type"),
+                    chapters=ep_data.get("chapters"),
+                    transcript=ep_data.get("transcript")
                 )
-                feed.episodes.append(episode)
+                episodes.append(episode)
+            feed.add_episodes(episodes)
 
             # Add to database
-            return self.database.add_feed(feed)
+            feed = self._write(self.database.add_feed, feed)
+
+            if preview:
+                with self.previews_lock:
+                    self.previews.pop(url, None)
+                if not preview["complete"]:
+                    if self.tasks:
+                        self.tasks.submit(IO, self.update_feed, feed, key=f"update:{url}")
+                    else:
+                        self.update_feed(feed)
+            return feed
 
         except Exception as e:
             print(f"Error adding feed: {e}")
@@ -58,68 +119,100 @@ class FeedUpdater:
     def update_feed(self, feed: Feed | None) -> bool:
         """Update an existing feed."""
         if feed:
-            try:
-                # Parse feed
-                feed_data = self.parser.parse_feed(feed.url)
-                if not feed_data:
-                    return False
-
-                # Update feed metadata
-                feed.title = feed_data["title"]
-                feed.author = feed_data.get("author", "Unknown")
-                feed.description = feed_data.get("description", "")
-                feed.image_url = feed_data.get("image_url")
-                feed.last_updated = datetime.now()
-
-                # Track existing episodes by GUID
-                existing_episodes = {ep.guid: ep for ep in feed.episodes}
-
-                # Update episodes
-                new_episodes = []
-                for ep_data in feed_data.get("episodes", []):
-                    guid = ep_data.get("guid", "")
-
-                    if guid in existing_episodes:
-                        # Episode exists, keep existing data
-                        continue
-                    else:
-                        # New episode
-                        pub_date = ep_data.get("pub_date")
-                        duration_seconds = ep_data.get("duration_seconds", 0)
-
-                        episode = Episode(
-                            title=ep_data.get("title", "Untitled"),
-                            audio_url=ep_data.get("audio_url", ""),
-                            pub_date=pub_date,
-                            description=ep_data.get("description", ""),
-                            duration=duration_seconds,
-                            feed_id=feed.id,
-                            guid=guid,
-                            image_url=ep_data.get("image_url")
-                        )
-                        new_episodes.append(episode)
-
-                # Add new episodes
-                feed.episodes.extend(new_episodes)
-
-                # Sort episodes by date (newest first)
-                feed.episodes.sort(key=lambda e: e.pub_date if e.pub_date else datetime.min, reverse=True)
-
-                # Save database
-                self.database.save()
-
-                return True
-
-            except Exception as e:
-                print(f"Error updating feed: {e}")
+            # Parse feed
+            feed_data = self.parser.parse_feed(feed.url)
+            if not feed_data:
                 return False
+            return self._write(self.merge_feed, feed, feed_data)
 
         return False
 
+    def merge_feed(self, feed: Feed, feed_data: dict) -> bool:
+        """Apply freshly parsed feed data to a stored feed. Runs on the database writer."""
+        try:
+            # Update feed metadata
+            feed.title = feed_data["title"]
+            feed.author = feed_data.get("author", "Unknown")
+            feed.description = feed_data.get("description", "")
+            feed.image_url = feed_data.get("image_url")
+            feed.last_updated = datetime.now()
+
+            # Track existing episodes by GUID
+            existing_episodes = {ep.guid: ep for ep in feed.episodes}
+
+            # Update episodes
+            new_episodes = []
+            for ep_data in feed_data.get("episodes", []):
+                guid = ep_data.get("guid", "")
+
+                if guid in existing_episodes:
+                    # Episode exists, keep existing data but pick up
+                    # chapters and transcripts added to it since
+                    existing = existing_episodes[guid]
+                    existing.chapters = ep_data.get("chapters") or existing.chapters
+                    existing.transcript = ep_data.get("transcript") or existing.transcript
+                    continue
+                else:
+                    # New episode
+                    pub_date = ep_data.get("pub_date")
+                    duration_seconds = ep_data.get("duration_seconds", 0)
+
+                    episode = Episode(
+                        title=ep_data.get("title", "Untitled"),
+                        audio_url=ep_data.get("audio_url", ""),
+                        pub_date=pub_date,
+                        description=ep_data.get("description", ""),
+                        duration=duration_seconds,
+                        feed_id=feed.id,
+                        guid=guid,
+                        image_url=ep_data.get("image_url"),
+                        audio_size=ep_data.get("audio_size"),
+                        audio_type=ep_data.get("audio_type"),
+                        chapters=ep_data.get("chapters"),
+                        transcript=ep_data.get("transcript")
+                    )
+                    new_episodes.append(episode)
+
+            # Add new episodes
+            feed.add_episodes(new_episodes)
+
+            # Sort episodes by date (newest first)
+            feed.episodes = tuple(sorted(feed.episodes, key=lambda e: e.pub_date if e.pub_date else datetime.min,
+                                         reverse=True))
+
+            return True
+
+        except Exception as e:
+            print(f"Error updating feed: {e}")
+            return False
+
     def update_all_feeds(self):
-        """Update all feeds in the database."""
+        """Update all feeds in the database.
+
+        With a task runner the feeds are fetched in parallel on the IO pool.
+        Either way they are merged one at a time on the database writer. Stops
+        early if the task running this is cancelled.
+        """
+        feeds = list(self.database.feeds)
+        if not self.tasks:
+            return [(feed.title, self.update_feed(feed)) for feed in feeds]
+
+        token = current_token()
+        fetches = [self.tasks.submit(IO, self.parser.parse_feed, feed.url, key=f"fetch:{feed.url}")
+                   for feed in feeds]
         results = []
-        for feed in self.database.feeds:
-            success = self.update_feed(feed)
-            results.append((feed.title, success))
+        try:
+            for feed, fetch in zip(feeds, fetches):
+                token.check()
+                feed_data = fetch.result()
+                success = bool(feed_data) and self._write(self.merge_feed, feed, feed_data)
+                results.append((feed.title, success))
+        finally:
+            for fetch in fetches:
+                if not fetch.done():
+                    fetch.cancel()
         return results
+
+    def _write(self, fn, *args):
+        """Run a database change on the database writer and save."""
+        return self.database.call(fn, *args)
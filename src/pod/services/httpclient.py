@@ -0,0 +1,181 @@
+# --------------- HTTP Client ---------------
+import asyncio
+import socket
+import threading
+import time
+
+import httpcore
+import httpx
+
+from src.pod.config.config import (
+    HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE, HTTP_KEEPALIVE_EXPIRY, DNS_CACHE_TTL
+)
+
+USER_AGENT = "pod/0.1"
+
+
+class DNSCache:
+    """Caches host name resolution for a fixed time-to-live."""
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}  # (host, port) -> (expires, address)
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, host: str, port: int) -> str | None:
+        with self._lock:
+            entry = self._entries.get((host, port))
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def _store(self, host: str, port: int, infos) -> str:
+        address = infos[0][4][0]
+        with self._lock:
+            self._entries[(host, port)] = (time.monotonic() + self.ttl, address)
+        return address
+
+    def resolve(self, host: str, port: int) -> str:
+        """Resolve host to an address, blocking on a miss."""
+        address = self._lookup(host, port)
+        if address:
+            return address
+        return self._store(host, port, socket.getaddrinfo(host, port, type=socket.SOCK_STREAM))
+
+    async def resolve_async(self, host: str, port: int) -> str:
+        """Resolve host to an address without blocking the event loop."""
+        address = self._lookup(host, port)
+        if address:
+            return address
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        return self._store(host, port, infos)
+
+
+class _CachingBackend(httpcore.NetworkBackend):
+    """Network backend that resolves through the DNS cache and counts new connections."""
+
+    def __init__(self, backend, http_client: "HttpClient"):
+        self._backend = backend
+        self._http = http_client
+
+    def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        # TLS still uses the original host name for SNI and certificate checks
+        address = self._http.dns.resolve(host, port)
+        self._http._count("connections_opened")
+        return self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+
+    def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    def sleep(self, seconds):
+        self._backend.sleep(seconds)
+
+
+class _AsyncCachingBackend(httpcore.AsyncNetworkBackend):
+    """Async counterpart of _CachingBackend."""
+
+    def __init__(self, backend, http_client: "HttpClient"):
+        self._backend = backend
+        self._http = http_client
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        address = await self._http.dns.resolve_async(host, port)
+        self._http._count("connections_opened")
+        return await self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds):
+        await self._backend.sleep(seconds)
+
+
+class HttpClient:
+    """Application-wide HTTP client with pooled keep-alive connections.
+
+    One sync client serves downloads and feed fetches from worker threads and
+    one async client serves the UI. Both share the DNS cache, negotiate HTTP/2
+    where servers support it and ask for compressed responses.
+    """
+
+    def __init__(self,
+                 max_connections: int = HTTP_MAX_CONNECTIONS,
+                 max_keepalive: int = HTTP_MAX_KEEPALIVE,
+                 keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY):
+        self.dns = DNSCache()
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "connections_opened": 0}
+
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        options = {
+            "headers": {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"},
+            "follow_redirects": True,
+            "timeout": httpx.Timeout(10.0, read=30.0),
+        }
+
+        transport = httpx.HTTPTransport(http2=True, limits=limits)
+        async_transport = httpx.AsyncHTTPTransport(http2=True, limits=limits)
+
+        # httpx does not expose the httpcore network backend, so wrap the one
+        # its pool already built
+        transport._pool._network_backend = _CachingBackend(
+            transport._pool._network_backend, self)
+        async_transport._pool._network_backend = _AsyncCachingBackend(
+            async_transport._pool._network_backend, self)
+
+        self.client = httpx.Client(
+            transport=transport,
+            event_hooks={"request": [self._on_request]},
+            **options,
+        )
+        self.async_client = httpx.AsyncClient(
+            transport=async_transport,
+            event_hooks={"request": [self._on_async_request]},
+            **options,
+        )
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _on_request(self, request):
+        self._count("requests")
+
+    async def _on_async_request(self, request):
+        self._count("requests")
+
+    def pool_hit_rate(self) -> float:
+        """Fraction of requests served on an already open connection."""
+        with self._lock:
+            requests = self.stats["requests"]
+            opened = self.stats["connections_opened"]
+        if not requests:
+            return 0.0
+        return max(0.0, 1 - opened / requests)
+
+    def get_stats(self) -> dict:
+        """Return request, connection and DNS cache counters."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["pool_hit_rate"] = self.pool_hit_rate()
+        stats["dns_hits"] = self.dns.hits
+        stats["dns_misses"] = self.dns.misses
+        return stats
+
+    def close(self):
+        """Close pooled sync connections."""
+        self.client.close()
+
+    async def aclose(self):
+        """Close pooled connections on both clients."""
+        self.client.close()
+        await self.async_client.aclose()
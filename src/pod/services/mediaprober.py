@@ -0,0 +1,324 @@
+# --------------- Media Prober ---------------
+import json
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.pod.config.config import (
+    PROBE_BATCH_SIZE, PROBE_CACHE_FILE, PROBE_TIMEOUT, PROBE_WORKERS
+)
+from src.pod.models.episode import Episode
+
+# MPEG audio frame header tables
+_MPEG_BITRATES = {  # (MPEG-1?, layer) -> kbps by index
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MPEG_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+@dataclass
+class MediaInfo:
+    """What probing a file found out about it."""
+    duration_ms: int
+    bitrate: Optional[int] = None  # kbps, averaged over the file
+    codec: Optional[str] = None
+
+
+def _probe_mpeg(f, size: int) -> Optional[MediaInfo]:
+    """Read duration from the first MPEG audio frame and its Xing/VBRI header."""
+    head = f.read(10)
+    start = 0
+    if head[:3] == b"ID3":
+        # Skip the ID3v2 tag; its size is a 28-bit syncsafe integer
+        tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+        start = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+
+    f.seek(start)
+    data = f.read(64 * 1024)
+    for i in range(len(data) - 4):
+        if data[i] != 0xFF or data[i + 1] & 0xE0 != 0xE0:
+            continue
+        b1, b2, b3 = data[i + 1], data[i + 2], data[i + 3]
+        version = (b1 >> 3) & 3
+        layer = 4 - ((b1 >> 1) & 3)
+        bitrate_index = b2 >> 4
+        rate_index = (b2 >> 2) & 3
+        if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+            continue
+
+        mpeg1 = version == 3
+        bitrate = _MPEG_BITRATES[(mpeg1, layer)][bitrate_index]
+        sample_rate = _MPEG_SAMPLE_RATES[version][rate_index]
+        samples = 384 if layer == 1 else (1152 if mpeg1 or layer == 2 else 576)
+        mono = b3 >> 6 == 3
+        audio_bytes = size - (start + i)
+
+        # Variable bitrate files carry a frame count in their first frame
+        side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+        frames = None
+        xing = data[i + 4 + side_info:i + 4 + side_info + 12]
+        if xing[:4] in (b"Xing", b"Info") and struct.unpack(">I", xing[4:8])[0] & 1:
+            frames = struct.unpack(">I", xing[8:12])[0]
+        vbri = data[i + 36:i + 36 + 18]
+        if vbri[:4] == b"VBRI":
+            frames = struct.unpack(">I", vbri[14:18])[0]
+
+        if frames:
+            duration_ms = frames * samples * 1000 // sample_rate
+        else:
+            duration_ms = audio_bytes * 8 // bitrate  # constant bitrate
+        if not duration_ms:
+            return None
+        return MediaInfo(
+            duration_ms=duration_ms,
+            bitrate=round(audio_bytes * 8 / duration_ms),
+            codec="mp3" if layer == 3 else f"mp{layer}",
+        )
+    return None
+
+
+def _boxes(data: bytes, offset: int = 0, end: Optional[int] = None):
+    """Iterate (type, payload_start, payload_end) over ISO-BMFF boxes in a buffer."""
+    end = len(data) if end is None else end
+    while offset + 8 <= end:
+        size, kind = struct.unpack(">I4s", data[offset:offset + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", data[offset + 8:offset + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            return
+        yield kind, offset + header, min(offset + size, end)
+        offset += size
+
+
+def _probe_mp4(f, size: int) -> Optional[MediaInfo]:
+    """Read duration and codec from the moov box, wherever it sits in the file."""
+    offset = 0
+    moov = None
+    while offset + 8 <= size:
+        f.seek(offset)
+        header = f.read(16)
+        box_size, kind = struct.unpack(">I4s", header[:8])
+        if box_size == 1:
+            box_size = struct.unpack(">Q", header[8:16])[0]
+        elif box_size == 0:
+            box_size = size - offset
+        if box_size < 8:
+            return None
+        if kind == b"moov":
+            f.seek(offset)
+            moov = f.read(box_size)
+            break
+        offset += box_size
+    if not moov:
+        return None
+
+    duration_ms = None
+    codec = None
+
+    def walk(start, end):
+        nonlocal duration_ms, codec
+        for kind, payload, stop in _boxes(moov, start, end):
+            if kind == b"mvhd":
+                version = moov[payload]
+                if version == 1:
+                    timescale, duration = struct.unpack(">IQ", moov[payload + 20:payload + 32])
+                else:
+                    timescale, duration = struct.unpack(">II", moov[payload + 12:payload + 20])
+                if timescale:
+                    duration_ms = duration * 1000 // timescale
+            elif kind == b"stsd" and not codec:
+                # Skip version/flags and entry count; first sample entry's type
+                entry = moov[payload + 12:payload + 16]
+                codec = {b"mp4a": "aac"}.get(entry, entry.decode("ascii", "replace").strip())
+            elif kind in (b"moov", b"trak", b"mdia", b"minf", b"stbl"):
+                walk(payload, stop)
+
+    walk(8, len(moov))
+    if not duration_ms:
+        return None
+    return MediaInfo(duration_ms=duration_ms, bitrate=round(size * 8 / duration_ms), codec=codec)
+
+
+def probe_header(path: Path) -> Optional[MediaInfo]:
+    """Work out duration, bitrate and codec from the file's headers, if the format is known."""
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        head = f.read(12)
+        f.seek(0)
+        if head[4:8] == b"ftyp":
+            return _probe_mp4(f, size)
+        if head[:3] == b"ID3" or (head[:1] == b"\xff" and head[1] & 0xE0 == 0xE0):
+            return _probe_mpeg(f, size)
+    return None
+
+
+class MediaProber:
+    """Fills in real duration, bitrate and codec for downloaded episodes.
+
+    Files are probed in a small thread pool, from their headers for MP3 and
+    MP4 and through libvlc's parser for anything else. Results are cached by
+    file identity, failures included, so a file is only ever read once, and
+    applied to episodes in batches with one database save per batch.
+    """
+
+    def __init__(self, database, workers: int = PROBE_WORKERS,
+                 cache_file: Path = PROBE_CACHE_FILE, instance=None):
+        self.database = database
+        self.cache_file = Path(cache_file)
+        self.instance = instance  # vlc.Instance, created on first use if not given
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="probe")
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.cache: Dict[str, Optional[MediaInfo]] = {}  # None where probing failed
+        self.dirty = False  # cache has entries not saved yet
+        self.pending: List[Tuple[Episode, MediaInfo]] = []
+        self.queued = set()  # file identities submitted and not yet done
+        self.outstanding = 0
+        self._load_cache()
+
+    def _load_cache(self):
+        if not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file) as f:
+                self.cache = {key: MediaInfo(**info) if info else None
+                              for key, info in json.load(f).items()}
+        except (OSError, json.JSONDecodeError, TypeError) as e:
+            print(f"Error loading probe cache: {e}")
+
+    def _save_cache(self):
+        # One save at a time, so an older copy never replaces a newer one
+        with self.save_lock:
+            with self.lock:
+                data = {key: asdict(info) if info else None for key, info in self.cache.items()}
+            tmp = self.cache_file.with_suffix(".tmp")
+            try:
+                with open(tmp, "w") as f:
+                    json.dump(data, f)
+                tmp.replace(self.cache_file)
+            except OSError as e:
+                print(f"Error saving probe cache: {e}")
+
+    def identity(self, episode: Episode) -> Optional[str]:
+        """Cache key for an episode's file: its content hash, or path, size and mtime."""
+        if episode.content_hash:
+            return episode.content_hash
+        try:
+            stat = Path(episode.download_path).stat()
+        except (OSError, TypeError):
+            return None
+        return f"{episode.download_path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def needs_probe(self, episode: Episode) -> bool:
+        return bool(episode.downloaded and episode.download_path and not episode.codec)
+
+    def submit(self, episode: Episode):
+        """Probe a downloaded episode in the background."""
+        if not self.needs_probe(episode):
+            return
+        key = self.identity(episode)
+        if not key:
+            return
+
+        with self.lock:
+            if key in self.cache and not self.cache[key]:
+                return  # probing this file failed before
+            cached = self.cache.get(key)
+            if not cached:
+                if key in self.queued:
+                    return
+                self.queued.add(key)
+            self.outstanding += 1
+
+        if cached:
+            self._done(episode, cached)
+        else:
+            self.pool.submit(self._probe, episode, key)
+
+    def probe_downloaded(self):
+        """Queue every downloaded episode that has not been probed yet."""
+        for episode in self.database.get_downloaded_episodes():
+            self.submit(episode)
+
+    def _probe(self, episode: Episode, key: str):
+        info = None
+        settled = True  # False when the failure may not happen next time
+        path = Path(episode.download_path)
+        try:
+            info = probe_header(path) or self._probe_vlc(path)
+        except (OSError, ImportError) as e:
+            settled = False
+            print(f"Probe error for {episode.title}: {e}")
+        except Exception as e:
+            print(f"Probe error for {episode.title}: {e}")
+
+        with self.lock:
+            self.queued.discard(key)
+            if info or settled:
+                self.cache[key] = info
+                self.dirty = True
+        self._done(episode, info)
+
+    def _probe_vlc(self, path: Path) -> Optional[MediaInfo]:
+        """Let libvlc parse formats the header readers do not know."""
+        import vlc
+
+        if not self.instance:
+            self.instance = vlc.Instance("--quiet")
+        media = self.instance.media_new_path(str(path))
+        media.parse_with_options(vlc.MediaParseFlag.local, int(PROBE_TIMEOUT * 1000))
+
+        deadline = time.monotonic() + PROBE_TIMEOUT
+        while (media.get_parsed_status() == 0 and time.monotonic() < deadline):
+            time.sleep(0.05)
+        if media.get_parsed_status() != vlc.MediaParsedStatus.done:
+            return None
+
+        duration_ms = media.get_duration()
+        if duration_ms <= 0:
+            return None
+        codec = None
+        for track in media.tracks_get() or []:
+            if track.type == vlc.TrackType.audio:
+                codec = track.codec.to_bytes(4, "little").decode("ascii", "replace").strip()
+                break
+        size = path.stat().st_size
+        return MediaInfo(duration_ms=duration_ms, bitrate=round(size * 8 / duration_ms), codec=codec)
+
+    def _done(self, episode: Episode, info: Optional[MediaInfo]):
+        """Collect a result and apply the batch when it is full or the queue is empty."""
+        with self.lock:
+            self.outstanding -= 1
+            if info:
+                self.pending.append((episode, info))
+            if len(self.pending) < PROBE_BATCH_SIZE and self.outstanding:
+                return
+            batch, self.pending = self.pending, []
+            save, self.dirty = self.dirty, False
+
+        def apply():
+            for episode, info in batch:
+                episode.duration = round(info.duration_ms / 1000)
+                episode.bitrate = info.bitrate
+                episode.codec = info.codec
+
+        if batch:
+            self.database.update(apply)
+        if save:
+            self._save_cache()
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,79 @@
+# --------------- Play Queue ---------------
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from src.pod.models.episode import Episode
+from src.pod.services.databasemanager import PodcastDatabase
+
+
+class PlayQueue:
+    """Ordered list of episodes to play next, persisted in the database.
+
+    The play queue is the only writer of the database's queue. Changes are
+    made one at a time against the latest items, including any the writer has
+    not applied yet, and handed to the writer without waiting; it applies
+    them in the order they were made.
+    """
+
+    def __init__(self, database: PodcastDatabase):
+        self.database = database
+        self.extras = None  # EpisodeExtras; queued episodes get their chapters and transcripts early
+        self.lock = threading.Lock()  # one change at a time
+        self.pending = None  # (items, future) of the last change handed to the writer
+
+    def _items(self) -> Tuple[Tuple[str, str], ...]:
+        """Queued (feed_id, guid) pairs, counting a change not applied yet."""
+        pending = self.pending
+        if pending and not pending[1].done():
+            return pending[0]
+        return self.database.queue
+
+    def _change(self, change: Callable[[List[Tuple[str, str]]], List[Tuple[str, str]]]):
+        with self.lock:
+            items = self._items()
+            changed = tuple(change(list(items)))
+            if changed != items:
+                self.pending = (changed, self.database.update(self.database.set_queue, changed))
+
+    def _resolve(self, item) -> Optional[Episode]:
+        feed_id, guid = item
+        return self.database.get_episode(feed_id, guid)
+
+    def episodes(self) -> List[Episode]:
+        """Queued episodes in order, skipping any that no longer exist."""
+        return [ep for ep in map(self._resolve, self._items()) if ep]
+
+    def add(self, episode: Episode, front: bool = False):
+        """Queue an episode at the end, or next if front is True."""
+        item = (episode.feed_id, episode.guid)
+
+        def change(items):
+            items = [queued for queued in items if queued != item]
+            if front:
+                items.insert(0, item)
+            else:
+                items.append(item)
+            return items
+
+        self._change(change)
+        if self.extras:
+            self.extras.prefetch([episode])
+
+    def remove(self, episode: Episode):
+        item = (episode.feed_id, episode.guid)
+        self._change(lambda items: [queued for queued in items if queued != item])
+
+    def peek(self) -> Optional[Episode]:
+        """The next episode without removing it."""
+        for item in self._items():
+            episode = self._resolve(item)
+            if episode:
+                return episode
+        return None
+
+    def pop(self) -> Optional[Episode]:
+        """Remove and return the next episode."""
+        episode = self.peek()
+        if episode:
+            self.remove(episode)
+        return episode
@@ -0,0 +1,177 @@
+# --------------- Podcast Search ---------------
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.pod.config.config import (
+    SEARCH_CACHE_FILE, SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL, SEARCH_RESULT_LIMIT
+)
+from src.pod.services.catalog import PodcastCatalog
+from src.pod.services.httpclient import HttpClient
+from src.pod.services.taskrunner import current_token
+
+ITUNES_SEARCH_URL = "https://itunes.apple.com/search"
+
+# Fields of an iTunes result the app uses; the rest is not worth caching
+RESULT_FIELDS = ("collectionId", "collectionName", "artistName", "feedUrl",
+                 "artworkUrl100", "artworkUrl600", "primaryGenreName")
+
+
+def normalize(query: str) -> str:
+    """Cache key for a query: case-folded, with whitespace collapsed."""
+    return " ".join(query.casefold().split())
+
+
+def _matches(result: dict, words: List[str]) -> bool:
+    text = f"{result.get('collectionName', '')} {result.get('artistName', '')}".casefold()
+    return all(word in text for word in words)
+
+
+class SearchCache:
+    """LRU cache of search results with a time-to-live, saved to disk.
+
+    Entries are keyed by normalized query and hold the trimmed results and
+    whether they were complete (fewer than the result limit, so the API had
+    nothing more to give).
+    """
+
+    def __init__(self, path: Path = SEARCH_CACHE_FILE, max_entries: int = SEARCH_CACHE_SIZE,
+                 ttl: float = SEARCH_CACHE_TTL):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, Tuple[float, bool, List[dict]]]" = OrderedDict()
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error loading search cache: {e}")
+            return
+        now = time.time()
+        for key, (stored, complete, results) in data.items():
+            if now - stored < self.ttl:
+                self.entries[key] = (stored, complete, results)
+
+    def save(self):
+        with self.lock:
+            data = dict(self.entries)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        tmp.replace(self.path)
+
+    def get(self, key: str) -> Optional[Tuple[bool, List[dict]]]:
+        """(complete, results) for a normalized query, if cached and fresh."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if not entry:
+                return None
+            if time.time() - entry[0] >= self.ttl:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def put(self, key: str, results: List[dict], complete: bool):
+        with self.lock:
+            self.entries[key] = (time.time(), complete, results)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def longest_prefix(self, key: str, whole_words: bool = False) -> Optional[Tuple[str, bool, List[dict]]]:
+        """The cached entry for the longest shorter query that key starts with.
+
+        With whole_words only prefixes ending where a word of key ends count.
+        """
+        for end in range(len(key) - 1, 0, -1):
+            if whole_words and key[end] != " ":
+                continue
+            hit = self.get(key[:end])
+            if hit:
+                return (key[:end],) + hit
+        return None
+
+
+class PodcastSearch:
+    """Podcast directory search: local catalog, then result cache, then iTunes.
+
+    instant() answers without the network: from the local catalog if one is
+    imported and has matches, else from the cache (an exact hit, or the
+    results of a cached prefix filtered down to the longer query). iTunes
+    matches whole words, so a prefix ending in part of a word ("joe rog" for
+    "joe rogan") only gives results to show while the API answers. search()
+    goes to the API only when neither can answer for certain, and caches
+    what it gets.
+    """
+
+    def __init__(self, http: HttpClient, cache: Optional[SearchCache] = None,
+                 catalog: Optional[PodcastCatalog] = None,
+                 limit: int = SEARCH_RESULT_LIMIT):
+        self.http = http
+        self.cache = cache or SearchCache()
+        self.catalog = catalog if catalog and catalog.available() else None
+        self.limit = limit
+
+    def instant(self, query: str) -> Optional[Tuple[bool, List[dict]]]:
+        """(final, results) from the catalog or cache, or None if neither has anything.
+
+        Results are final when no API call could change them: catalog matches,
+        an exact cache hit, or a prefix of whole words whose results were
+        already complete.
+        """
+        key = normalize(query)
+        if not key:
+            return None
+        if self.catalog:
+            results = self.catalog.search(key, self.limit)
+            if results:
+                return True, results
+        hit = self.cache.get(key)
+        if hit:
+            return True, hit[1]
+        words = key.split()
+        prefix = self.cache.longest_prefix(key, whole_words=True)
+        if prefix and prefix[1]:
+            filtered = [result for result in prefix[2] if _matches(result, words)]
+            self.cache.put(key, filtered, True)
+            return True, filtered
+        prefix = self.cache.longest_prefix(key)
+        if not prefix:
+            return None
+        return False, [result for result in prefix[2] if _matches(result, words)]
+
+    def search(self, query: str) -> List[dict]:
+        """Results for a query, from the cache if it can answer, else from the API."""
+        instant = self.instant(query)
+        if instant and instant[0]:
+            return instant[1]
+        key = normalize(query)
+        results = self._fetch(key)
+        self.cache.put(key, results, len(results) < self.limit)
+        self.cache.save()
+        return results
+
+    def _fetch(self, term: str) -> List[dict]:
+        """Query the iTunes API. Gives up between chunks if the task is cancelled."""
+        token = current_token()
+        params = {"term": term, "entity": "podcast", "limit": self.limit}
+        with self.http.client.stream("GET", ITUNES_SEARCH_URL, params=params) as response:
+            if response.status_code != 200:
+                raise Exception(f"API error: {response.status_code}")
+            chunks = []
+            for chunk in response.iter_bytes():
+                token.check()
+                chunks.append(chunk)
+        data = json.loads(b"".join(chunks))
+        return [{field: result[field] for field in RESULT_FIELDS if field in result}
+                for result in data.get("results", [])]
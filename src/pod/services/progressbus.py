@@ -0,0 +1,174 @@
+# --------------- Progress Bus ---------------
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from src.pod.config.config import PROGRESS_UPDATE_INTERVAL
+
+
+@dataclass
+class DownloadProgress:
+    """Snapshot of one download, as delivered to subscribers."""
+    guid: str
+    received: int
+    total: int  # 0 when unknown
+    rate: float = 0.0  # bytes/s
+    eta: Optional[float] = None  # seconds
+    finished: bool = False
+    success: bool = False
+
+    @property
+    def percent(self) -> float:
+        if self.finished and self.success:
+            return 100.0
+        return (self.received / self.total) * 100 if self.total else 0.0
+
+
+class _Tracker:
+    """Mutable per-download counters. Writers only store an int per chunk."""
+
+    __slots__ = ("guid", "total", "received", "last_received", "last_time",
+                 "rate", "finished", "success")
+
+    def __init__(self, guid: str, total: int):
+        self.guid = guid
+        self.total = total
+        self.received = 0
+        self.last_received = -1
+        self.last_time = time.monotonic()
+        self.rate = 0.0
+        self.finished = False
+        self.success = False
+
+
+class ProgressBus:
+    """Collects download progress from worker threads and pushes batched updates.
+
+    Download threads call update() with their running byte count, which is a
+    single attribute store. A dispatcher thread wakes every interval, works out
+    throughput and ETA for downloads that moved, and hands subscribers one
+    batch, so each download produces at most one UI update per interval.
+    """
+
+    def __init__(self, interval: float = PROGRESS_UPDATE_INTERVAL):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.trackers: Dict[str, _Tracker] = {}
+        self.listeners: List[Callable[[List[DownloadProgress]], None]] = []
+        self.wake = threading.Event()
+
+        self.dispatcher = threading.Thread(target=self._run, daemon=True)
+        self.dispatcher.start()
+
+    def subscribe(self, listener: Callable[[List[DownloadProgress]], None]):
+        """Register a callback. It is called from the dispatcher thread."""
+        with self.lock:
+            self.listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[List[DownloadProgress]], None]):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def start(self, guid: str, total: int = 0):
+        """Begin tracking a download."""
+        with self.lock:
+            self.trackers[guid] = _Tracker(guid, total)
+        self.wake.set()
+
+    def try_start(self, guid: str, total: int = 0) -> bool:
+        """Begin tracking a download unless one is already running for guid.
+
+        Checking and starting are one step, so of two callers racing to
+        download the same episode only one gets True.
+        """
+        with self.lock:
+            tracker = self.trackers.get(guid)
+            if tracker is not None and not tracker.finished:
+                return False
+            self.trackers[guid] = _Tracker(guid, total)
+        self.wake.set()
+        return True
+
+    def set_total(self, guid: str, total: int):
+        tracker = self.trackers.get(guid)
+        if tracker:
+            tracker.total = total
+
+    def update(self, guid: str, received: int):
+        """Record bytes received so far. Cheap enough to call for every chunk."""
+        tracker = self.trackers.get(guid)
+        if tracker:
+            tracker.received = received
+
+    def finish(self, guid: str, success: bool):
+        """Mark a download done; subscribers get a final event on the next tick."""
+        tracker = self.trackers.get(guid)
+        if tracker:
+            tracker.success = success
+            tracker.finished = True
+        self.wake.set()
+
+    def is_active(self, guid: str) -> bool:
+        tracker = self.trackers.get(guid)
+        return tracker is not None and not tracker.finished
+
+    def get(self, guid: str) -> Optional[DownloadProgress]:
+        """Latest snapshot for a download, e.g. for a view that was just opened."""
+        tracker = self.trackers.get(guid)
+        return self._snapshot(tracker) if tracker else None
+
+    def _snapshot(self, tracker: _Tracker) -> DownloadProgress:
+        eta = None
+        if tracker.total and tracker.rate > 0:
+            eta = max(0.0, (tracker.total - tracker.received) / tracker.rate)
+        return DownloadProgress(
+            guid=tracker.guid,
+            received=tracker.received,
+            total=tracker.total,
+            rate=tracker.rate,
+            eta=eta,
+            finished=tracker.finished,
+            success=tracker.success,
+        )
+
+    def _run(self):
+        """Dispatcher loop. Sleeps without waking while nothing is downloading."""
+        while True:
+            if not self.trackers:
+                self.wake.wait()
+            self.wake.clear()
+            time.sleep(self.interval)
+
+            now = time.monotonic()
+            batch = []
+            with self.lock:
+                trackers = list(self.trackers.values())
+                listeners = list(self.listeners)
+
+            for tracker in trackers:
+                received = tracker.received
+                if received == tracker.last_received and not tracker.finished:
+                    continue
+
+                elapsed = now - tracker.last_time
+                if elapsed > 0 and tracker.last_received >= 0:
+                    # Exponentially smoothed throughput
+                    instant = (received - tracker.last_received) / elapsed
+                    tracker.rate = instant if not tracker.rate else 0.7 * tracker.rate + 0.3 * instant
+                tracker.last_received = received
+                tracker.last_time = now
+                batch.append(self._snapshot(tracker))
+
+                if tracker.finished:
+                    with self.lock:
+                        if self.trackers.get(tracker.guid) is tracker:
+                            del self.trackers[tracker.guid]
+
+            if batch:
+                for listener in listeners:
+                    try:
+                        listener(batch)
+                    except Exception as e:
+                        print(f"Progress listener error: {e}")
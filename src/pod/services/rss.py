@@ -2,11 +2,29 @@ import email.utils
 import xml.etree.ElementTree as ET
 from datetime import datetime
 
-import requests
+import httpx
+
+from src.pod.config.config import PREVIEW_ITEMS, PREVIEW_MAX_BYTES
+from src.pod.services.bandwidth import BandwidthLimiter, BACKGROUND, INTERACTIVE
+from src.pod.services.httpclient import HttpClient
+from src.pod.services.taskrunner import Cancelled, current_token
+
+# podcast:transcript types by preference; the first three have timings
+TRANSCRIPT_TYPE_PREFERENCE = {
+    "application/json": 0,
+    "text/vtt": 1,
+    "application/srt": 2,
+    "application/x-subrip": 2,
+    "text/html": 3,
+    "text/plain": 4,
+}
 
 
 class PodcastRSSParser:
-    def __init__(self):
+    def __init__(self, limiter: BandwidthLimiter | None = None, http: HttpClient | None = None):
+        self.limiter = limiter or BandwidthLimiter()
+        self.http = http or HttpClient()
+
         # Define XML namespaces used in podcast feeds
         self.namespaces = {
             "itunes": "http://www.itunes.com/dtds/podcast-1.0.dtd",
@@ -19,41 +37,20 @@ class PodcastRSSParser:
         for prefix, uri in self.namespaces.items():
             ET.register_namespace(prefix, uri)
 
-    def parse_feed(self, feed_url):
+    def parse_feed(self, feed_url, priority=BACKGROUND):
         """
         Parse a podcast RSS feed and return structured data
         """
         try:
             # Fetch the RSS feed content
-            response = requests.get(feed_url, timeout=10)
-            response.raise_for_status()  # Raise exception for HTTP errors
+            content = self._fetch(feed_url, priority)
 
             # Parse XML content
-            root = ET.fromstring(response.content)
+            root = ET.fromstring(content)
 
             # Extract channel (podcast) information
             channel = root.find("channel")
-
-            # Parse podcast metadata
-            podcast_info = {
-                "title": self._get_text(channel, "title"),
-                "description": self._get_text(channel, "description"),
-                "link": self._get_text(channel, "link"),
-                "language": self._get_text(channel, "language"),
-                "copyright": self._get_text(channel, "copyright"),
-                "last_build_date": self._parse_date(
-                    self._get_text(channel, "lastBuildDate")
-                ),
-                "image_url": self._get_channel_image(channel),
-                "author": self._get_text(channel, "./itunes:author", self.namespaces),
-                "owner": self._get_owner_info(channel),
-                "categories": self._get_categories(channel),
-                "explicit": self._get_text(
-                    channel, "./itunes:explicit", self.namespaces
-                )
-                == "yes",
-                "episodes": [],
-            }
+            podcast_info = self._parse_channel(channel)
 
             # Extract episodes
             items = channel.findall("item")
@@ -63,7 +60,65 @@ class PodcastRSSParser:
 
             return podcast_info
 
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
+            print(f"Error fetching feed: {e}")
+            return None
+        except ET.ParseError as e:
+            print(f"XML parsing error: {e}")
+            return None
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+            return None
+
+    def parse_preview(self, feed_url, max_items=PREVIEW_ITEMS, max_bytes=PREVIEW_MAX_BYTES,
+                      priority=INTERACTIVE):
+        """
+        Parse the podcast metadata and first episodes of a feed without reading all of it
+
+        Asks for the first max_bytes only and parses as bytes arrive, stopping
+        after max_items episodes. "complete" in the result says whether the
+        whole feed was read, in which case every episode is included.
+        """
+        token = current_token()
+        parser = ET.XMLPullParser(events=("start", "end"))
+        channel = None
+        episodes = []
+        complete = False
+        received = 0
+        try:
+            # Servers that ignore the range are cut off at max_bytes anyway
+            headers = {"Range": f"bytes=0-{max_bytes - 1}"}
+            with self.limiter.transfer(priority), \
+                    self.http.client.stream("GET", feed_url, headers=headers) as response:
+                response.raise_for_status()
+                for chunk in response.iter_bytes(chunk_size=16384):
+                    token.check()
+                    if not chunk:
+                        continue
+                    self.limiter.throttle(len(chunk), priority)
+                    received += len(chunk)
+                    parser.feed(chunk)
+                    for event, element in parser.read_events():
+                        if event == "start" and element.tag == "channel":
+                            channel = element
+                        elif event == "end" and element.tag == "item":
+                            episodes.append(self._parse_episode(element))
+                        elif event == "end" and element.tag == "channel":
+                            complete = True
+                    if complete or len(episodes) >= max_items or received >= max_bytes:
+                        break
+
+            if channel is None:
+                print(f"XML parsing error: no channel in the first {received} bytes")
+                return None
+            podcast_info = self._parse_channel(channel)
+            podcast_info["episodes"] = episodes if complete else episodes[:max_items]
+            podcast_info["complete"] = complete
+            return podcast_info
+
+        except Cancelled:
+            raise
+        except httpx.HTTPError as e:
             print(f"Error fetching feed: {e}")
             return None
         except ET.ParseError as e:
@@ -73,6 +128,40 @@ class PodcastRSSParser:
             print(f"Unexpected error: {e}")
             return None
 
+    def _parse_channel(self, channel):
+        """Parse podcast metadata, with an empty episode list"""
+        return {
+            "title": self._get_text(channel, "title"),
+            "description": self._get_text(channel, "description"),
+            "link": self._get_text(channel, "link"),
+            "language": self._get_text(channel, "language"),
+            "copyright": self._get_text(channel, "copyright"),
+            "last_build_date": self._parse_date(
+                self._get_text(channel, "lastBuildDate")
+            ),
+            "image_url": self._get_channel_image(channel),
+            "author": self._get_text(channel, "./itunes:author", self.namespaces),
+            "owner": self._get_owner_info(channel),
+            "categories": self._get_categories(channel),
+            "explicit": self._get_text(
+                channel, "./itunes:explicit", self.namespaces
+            )
+            == "yes",
+            "episodes": [],
+        }
+
+    def _fetch(self, feed_url, priority):
+        """Fetch the feed body through the shared bandwidth limiter"""
+        with self.limiter.transfer(priority), self.http.client.stream("GET", feed_url) as response:
+            response.raise_for_status()  # Raise exception for HTTP errors
+
+            chunks = []
+            for chunk in response.iter_bytes(chunk_size=16384):
+                if chunk:
+                    self.limiter.throttle(len(chunk), priority)
+                    chunks.append(chunk)
+            return b"".join(chunks)
+
     def _get_text(self, element, xpath, namespaces=None):
         """Extract text from an element with proper error handling"""
         try:
@@ -165,16 +254,21 @@ class PodcastRSSParser:
         # Extract chapters
         chapters_elem = item.find("./podcast:chapters", self.namespaces)
         chapters = None
-        if chapters_elem is not None:
+        if chapters_elem is not None and chapters_elem.attrib.get("url"):
             chapters = {
                 "url": chapters_elem.attrib.get("url"),
                 "type": chapters_elem.attrib.get("type"),
             }
 
-        # Extract transcript
-        transcript_elem = item.find("./podcast:transcript", self.namespaces)
+        # Extract transcript, preferring formats with timings
+        transcript_elems = [elem for elem in item.findall("./podcast:transcript", self.namespaces)
+                            if elem.attrib.get("url")]
         transcript = None
-        if transcript_elem is not None:
+        if transcript_elems:
+            transcript_elem = min(
+                transcript_elems,
+                key=lambda elem: TRANSCRIPT_TYPE_PREFERENCE.get(elem.attrib.get("type"), 99),
+            )
             transcript = {
                 "url": transcript_elem.attrib.get("url"),
                 "type": transcript_elem.attrib.get("type"),
@@ -0,0 +1,192 @@
+# --------------- Silence Map ---------------
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from src.pod.config.config import (
+    SILENCE_MARGIN, SILENCE_MIN_DURATION, SILENCE_SAMPLE_RATE,
+    SILENCE_THRESHOLD_DB, SILENCE_WINDOW_MS, SILENCE_WORKERS
+)
+from src.pod.models.episode import Episode
+
+Span = Tuple[int, int]  # [start, end) in ms
+
+
+def map_path(audio_path) -> Path:
+    """Silence maps are stored next to the audio file they describe."""
+    return Path(f"{audio_path}.silence.json")
+
+
+def load_silence_map(audio_path) -> List[Span]:
+    """Silent spans for a file, or an empty list if it has not been analysed."""
+    try:
+        with open(map_path(audio_path)) as f:
+            return [tuple(span) for span in json.load(f)["spans"]]
+    except (OSError, json.JSONDecodeError, KeyError):
+        return []
+
+
+def decode_pcm(audio_path: Path, wav_path: Path):
+    """Decode a file to mono 16-bit WAV at SILENCE_SAMPLE_RATE with libvlc.
+
+    Stream output to a file is not paced by the clock, so this runs as fast
+    as VLC can decode.
+    """
+    import vlc
+
+    instance = vlc.Instance("--quiet", "--no-video")
+    media = instance.media_new_path(str(audio_path))
+    media.add_option(
+        f":sout=#transcode{{acodec=s16l,channels=1,samplerate={SILENCE_SAMPLE_RATE}}}"
+        f":std{{access=file,mux=wav,dst={wav_path}}}"
+    )
+    player = instance.media_player_new()
+    player.set_media(media)
+    player.play()
+    try:
+        done = (vlc.State.Ended, vlc.State.Error, vlc.State.Stopped)
+        while player.get_state() not in done:
+            time.sleep(0.1)
+        if player.get_state() == vlc.State.Error:
+            raise IOError(f"Could not decode {audio_path}")
+    finally:
+        player.stop()
+        player.release()
+        instance.release()
+
+
+def window_levels(wav_path: Path, window_ms: int = SILENCE_WINDOW_MS):
+    """RMS level in dBFS of each window of a mono 16-bit WAV, read in blocks."""
+    import numpy as np
+
+    levels = []
+    with wave.open(str(wav_path), "rb") as wav:
+        window = wav.getframerate() * window_ms // 1000
+        while True:
+            data = wav.readframes(window * 4096)
+            samples = np.frombuffer(data, dtype=np.int16)
+            count = len(samples) // window
+            if not count:
+                break
+            frames = samples[:count * window].reshape(count, window).astype(np.float32)
+            rms = np.sqrt(np.mean(frames * frames, axis=1))
+            levels.append(20 * np.log10(rms / 32768.0 + 1e-10))
+    return np.concatenate(levels) if levels else np.empty(0, dtype=np.float32)
+
+
+def find_silences(levels, window_ms: int = SILENCE_WINDOW_MS,
+                  threshold_db: float = SILENCE_THRESHOLD_DB,
+                  min_duration: float = SILENCE_MIN_DURATION,
+                  margin: float = SILENCE_MARGIN) -> List[Span]:
+    """Runs of quiet windows at least min_duration long, trimmed by margin at each end."""
+    import numpy as np
+
+    silent = np.concatenate(([False], levels < threshold_db, [False]))
+    edges = np.flatnonzero(np.diff(silent.astype(np.int8)))
+    starts = edges[::2] * window_ms + int(margin * 1000)
+    ends = edges[1::2] * window_ms - int(margin * 1000)
+    keep = ends - starts >= int((min_duration - 2 * margin) * 1000)
+    keep &= ends > starts
+    return [(int(s), int(e)) for s, e in zip(starts[keep], ends[keep])]
+
+
+def analyse(audio_path: str) -> int:
+    """Build and store the silence map for one file. Runs in a worker process."""
+    fd, wav_path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        decode_pcm(Path(audio_path), Path(wav_path))
+        spans = find_silences(window_levels(Path(wav_path)))
+    finally:
+        os.unlink(wav_path)
+
+    target = map_path(audio_path)
+    tmp = target.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump({
+            "window_ms": SILENCE_WINDOW_MS,
+            "threshold_db": SILENCE_THRESHOLD_DB,
+            "spans": spans,
+        }, f, separators=(",", ":"))
+    tmp.replace(target)
+    return len(spans)
+
+
+def start_resource_tracker():
+    """Start multiprocessing's resource tracker while sys.stderr is the real one.
+
+    The tracker hands stderr's file descriptor to its process, and the running
+    app's sys.stderr is Textual's capture object, which has none. Call this on
+    the main thread before the app runs; the analysis pool reuses the tracker.
+    """
+    from multiprocessing import resource_tracker
+
+    resource_tracker.ensure_running()
+
+
+class SilenceAnalyzer:
+    """Builds silence maps for downloaded episodes in a separate process.
+
+    Decoding a whole episode is CPU heavy, so it runs in a process pool to
+    keep the UI and playback threads responsive. on_analysed is called with
+    the episode, from a pool thread, once its map is on disk.
+    """
+
+    def __init__(self, database, workers: int = SILENCE_WORKERS,
+                 on_analysed: Optional[Callable[[Episode], None]] = None):
+        self.database = database
+        self.workers = workers
+        self.on_analysed = on_analysed
+        self.pool = None  # started on first use
+        self.lock = threading.Lock()
+        self.queued = set()  # audio paths being analysed
+
+    def needs_analysis(self, episode: Episode) -> bool:
+        return bool(episode.downloaded and episode.download_path
+                    and not map_path(episode.download_path).exists())
+
+    def submit(self, episode: Episode):
+        """Analyse a downloaded episode in the background."""
+        if not self.needs_analysis(episode):
+            return
+        path = str(episode.download_path)
+        with self.lock:
+            if path in self.queued:
+                return
+            self.queued.add(path)
+            if not self.pool:
+                # Spawn rather than fork: the app process has VLC and UI threads running
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            future = self.pool.submit(analyse, path)
+        future.add_done_callback(lambda f: self._done(episode, path, f))
+
+    def analyse_downloaded(self):
+        """Queue every downloaded episode without a silence map."""
+        for episode in self.database.get_downloaded_episodes():
+            self.submit(episode)
+
+    def _done(self, episode: Episode, path: str, future: Future):
+        with self.lock:
+            self.queued.discard(path)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error:
+            print(f"Silence analysis error for {episode.title}: {error}")
+            return
+        if self.on_analysed:
+            self.on_analysed(episode)
+
+    def shutdown(self):
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,116 @@
+# --------------- Storage Manager ---------------
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from src.pod.config.config import DOWNLOAD_QUOTA
+from src.pod.models.episode import Episode
+from src.pod.services.blobstore import BlobStore
+from src.pod.services.databasemanager import PodcastDatabase
+
+
+class StorageManager:
+    """Keeps downloaded episodes within a disk quota.
+
+    Space for a download is reserved up front from the enclosure length. When
+    a reservation would go over the quota, played episodes are evicted first,
+    then the least recently used ones.
+    """
+
+    def __init__(self, database: PodcastDatabase, quota: int = DOWNLOAD_QUOTA, player=None,
+                 store: BlobStore | None = None):
+        self.database = database
+        self.store = store or BlobStore(database=database)
+        self.quota = quota
+        self.player = player
+        self.lock = threading.Lock()
+        self.reservations = {}  # guid -> reserved bytes
+
+    def file_size(self, episode: Episode) -> int:
+        """Size of an episode's downloaded file, 0 if missing."""
+        if not episode.download_path:
+            return 0
+        try:
+            return Path(episode.download_path).stat().st_size
+        except OSError:
+            return 0
+
+    def usage(self) -> int:
+        """Bytes used by downloaded files plus outstanding reservations."""
+        # Deduplicated files are shared between episodes, count them once
+        unique = {Path(ep.download_path): ep for ep in self.database.get_downloaded_episodes()
+                  if ep.download_path}
+        used = sum(self.file_size(ep) for ep in unique.values())
+        return used + sum(self.reservations.values())
+
+    def reserve(self, episode: Episode) -> bool:
+        """Reserve space for a download, evicting if needed. False if it cannot fit."""
+        needed = episode.audio_size or 0
+        with self.lock:
+            if needed > self.quota:
+                return False
+
+            over = self.usage() + needed - self.quota
+            if over > 0:
+                self._evict(over)
+                if self.usage() + needed > self.quota:
+                    return False
+
+            self.reservations[episode.guid] = needed
+            return True
+
+    def release(self, episode: Episode):
+        """Drop a reservation once the download has finished or failed."""
+        with self.lock:
+            self.reservations.pop(episode.guid, None)
+
+    def enforce(self, keep: Optional[Episode] = None):
+        """Evict until usage is back under the quota, e.g. after a download larger than declared.
+
+        keep, the episode whose download has just finished, is never evicted.
+        """
+        with self.lock:
+            over = self.usage() - self.quota
+            if over > 0:
+                self._evict(over, keep)
+
+    def eviction_candidates(self, keep: Optional[Episode] = None) -> List[Episode]:
+        """Downloaded episodes in eviction order: played first, then least recently used."""
+        # Keep what is playing and what is preloaded to play next
+        protected = [self.player.current_episode, self.player.next_episode] if self.player else []
+        protected.append(keep)
+        candidates = [
+            ep for ep in self.database.get_downloaded_episodes()
+            if not any(ep is p for p in protected) and ep.guid not in self.reservations
+        ]
+        candidates.sort(key=lambda e: (
+            not e.played,
+            e.last_accessed.timestamp() if e.last_accessed else 0,
+        ))
+        return candidates
+
+    def _evict(self, bytes_needed: int, keep: Optional[Episode] = None) -> int:
+        """Delete files until bytes_needed are freed, then save the database once."""
+        freed = 0
+        evicted = []
+        for episode in self.eviction_candidates(keep):
+            if freed >= bytes_needed:
+                break
+
+            size = self.file_size(episode)
+            path = Path(episode.download_path) if episode.download_path else None
+            try:
+                self.store.release(episode)
+            except OSError as e:
+                print(f"Eviction error: {e}")
+                continue
+
+            evicted.append(episode)
+            # A shared file only frees space once its last episode goes
+            if path and not path.exists():
+                freed += size
+
+        # One save for the whole pass
+        if evicted:
+            self.database.save()
+        return freed
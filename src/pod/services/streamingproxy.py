@@ -0,0 +1,381 @@
+# --------------- Streaming Proxy ---------------
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from src.pod.config.config import STREAM_READ_TIMEOUT, STREAM_RETRIES, STREAM_SEEK_FETCH_THRESHOLD
+from src.pod.models.episode import Episode
+from src.pod.services.bandwidth import INTERACTIVE
+from src.pod.services.blobstore import IntegrityError
+
+
+class ProgressiveDownload:
+    """An episode file that is being filled in while it is played.
+
+    Byte ranges are written by one or more fetchers. Each fetcher stops as soon
+    as it runs into a range another fetcher has already written. When the last
+    one stops, the file is complete or the first missing range is fetched
+    again, up to STREAM_RETRIES times in a row without new bytes, after which
+    the stream fails. A fetcher's error alone never fails the stream.
+
+    Nothing touches the network or the quota until the first fetcher runs:
+    it reserves space, opens the file and asks for the whole file as a range,
+    and the response tells whether the server takes ranges and how long the
+    file is. Until then the download is not started and readers wait.
+    """
+
+    def __init__(self, proxy: "StreamingProxy", episode: Episode, filepath):
+        self.proxy = proxy
+        self.episode = episode
+        self.filepath = filepath
+        self.total_length = 0  # 0 when unknown
+        self.supports_ranges = False
+        self.started = False  # length and range support are known
+        self.cond = threading.Condition()
+        self.covered = []  # sorted, merged [start, end) intervals already on disk
+        self.frontiers = {}  # fetcher id -> next offset it will write
+        self.next_fetcher = 0
+        self.complete = False
+        self.failed = False
+        self.finished = False  # handed to the proxy's _finish
+        self.retries = 0  # refetches in a row that brought no new bytes
+        self.fd = None  # opened by the first fetcher, closed by the proxy once idle
+        self.reserved = False  # holds space within the download quota
+        self.users = 0  # players holding the stream's URL
+        self.readers = 0  # requests being served from fd
+
+    def _open(self):
+        """Reserve space and create the file. Runs on the first fetcher's thread."""
+        manager = self.proxy.download_manager
+        if manager.storage and not manager.storage.reserve(self.episode):
+            raise IOError(f"Not enough space within quota for {self.episode.title}")
+        self.reserved = bool(manager.storage)
+        self.filepath.parent.mkdir(exist_ok=True)
+        self.fd = os.open(self.filepath, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+
+    def _start(self, response: httpx.Response):
+        """Take the length and range support from the first response."""
+        total = 0
+        if response.status_code == 206:
+            # Content-Range: bytes 0-999/1000, with * when the server does not know
+            size = response.headers.get("content-range", "").rpartition("/")[2]
+            total = int(size) if size.isdigit() else 0
+        if total:
+            os.ftruncate(self.fd, total)
+        with self.cond:
+            self.total_length = total
+            self.supports_ranges = total > 0
+            self.started = True
+            self.cond.notify_all()
+        self.proxy.download_manager.progress.set_total(self.episode.guid, total)
+
+    def wait_started(self, timeout: float = STREAM_READ_TIMEOUT) -> bool:
+        """Block until the first response has arrived. False if it failed or timed out."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.started or self.failed, timeout=timeout)
+            return self.started and not self.failed
+
+    def available_from(self, offset: int) -> int:
+        """Number of contiguous bytes on disk starting at offset."""
+        for start, end in self.covered:
+            if start <= offset < end:
+                return end - offset
+        return 0
+
+    def _mark(self, start: int, end: int):
+        """Record [start, end) as written, merging neighbouring intervals."""
+        merged = []
+        for s, e in sorted(self.covered + [(start, end)]):
+            if merged and s <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+            else:
+                merged.append((s, e))
+        self.covered = merged
+
+    def covered_bytes(self) -> int:
+        return sum(end - start for start, end in self.covered)
+
+    def _first_gap(self) -> int:
+        """Offset of the first byte not on disk."""
+        return self.covered[0][1] if self.covered and self.covered[0][0] == 0 else 0
+
+    def ensure_fetching(self, offset: int):
+        """Start a priority range fetch at offset unless a fetcher will reach it soon."""
+        with self.cond:
+            if self.complete or self.failed or self.available_from(offset):
+                return
+            for frontier in self.frontiers.values():
+                if 0 <= offset - frontier <= STREAM_SEEK_FETCH_THRESHOLD:
+                    return
+            if self.frontiers and not self.supports_ranges:
+                return
+            fetcher_id = self.next_fetcher
+            self.next_fetcher += 1
+            self.frontiers[fetcher_id] = offset
+
+        threading.Thread(target=self._fetch, args=(fetcher_id, offset), daemon=True).start()
+
+    def _fetch(self, fetcher_id: int, start: int):
+        """Fetch from start until EOF or until reaching bytes already on disk."""
+        manager = self.proxy.download_manager
+        first = not self.started
+        # The first request asks for a range to learn whether ranges work
+        headers = {"Range": f"bytes={start}-"} if first or (self.supports_ranges and start) else {}
+        offset = start
+        error = False
+        try:
+            if first:
+                self._open()
+            with manager.limiter.transfer(INTERACTIVE), \
+                    manager.http.client.stream("GET", self.episode.audio_url, headers=headers) as r:
+                r.raise_for_status()
+                if first:
+                    self._start(r)
+                for chunk in r.iter_bytes(chunk_size=65536):
+                    if not chunk:
+                        continue
+                    with self.cond:
+                        # Another fetcher has already covered what follows
+                        if offset > start and self.available_from(offset):
+                            break
+                    manager.limiter.throttle(len(chunk), INTERACTIVE)
+                    os.pwrite(self.fd, chunk, offset)
+                    with self.cond:
+                        self._mark(offset, offset + len(chunk))
+                        offset += len(chunk)
+                        self.frontiers[fetcher_id] = offset
+                        manager.progress.update(self.episode.guid, self.covered_bytes())
+                        self.cond.notify_all()
+        except (httpx.HTTPError, OSError) as e:
+            print(f"Stream error: {e}")
+            error = True
+
+        retry = None
+        with self.cond:
+            self.frontiers.pop(fetcher_id, None)
+            if self.frontiers:
+                return  # the last fetcher to stop settles the stream
+            # Without a length from the server, a clean EOF is the end
+            if not self.total_length and not error and self.started:
+                self.total_length = offset
+            gap = self._first_gap()
+            self.retries = self.retries + 1 if offset == start else 0
+            if self.total_length and gap >= self.total_length:
+                self.complete = True
+            elif self.supports_ranges and self.retries <= STREAM_RETRIES:
+                # Short read or a failed fetcher: go back for what is missing
+                retry = self.next_fetcher
+                self.next_fetcher += 1
+                self.frontiers[retry] = gap
+            else:
+                self.failed = True
+            self.cond.notify_all()
+
+        if retry is not None:
+            threading.Thread(target=self._fetch, args=(retry, gap), daemon=True).start()
+        else:
+            self.proxy._finish(self)
+
+    def wait_for(self, offset: int, timeout: float = STREAM_READ_TIMEOUT) -> int:
+        """Block until bytes at offset are on disk. Returns how many are available."""
+        with self.cond:
+            self.cond.wait_for(
+                lambda: self.available_from(offset) or self.failed
+                or (self.total_length and offset >= self.total_length)
+                or (not self.frontiers and not self.complete),
+                timeout=timeout,
+            )
+            return self.available_from(offset)
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    """Serves a growing episode file, honouring Range requests."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        proxy = self.server.proxy
+        token = self.path.rsplit("/", 1)[-1]
+        with proxy.lock:
+            download = proxy.streams.get(token)
+            if download:
+                download.readers += 1
+        if not download:
+            self.send_error(404)
+            return
+        try:
+            self._serve(download)
+        finally:
+            with proxy.lock:
+                download.readers -= 1
+                proxy._close_if_idle(download)
+
+    def _serve(self, download: ProgressiveDownload):
+        if not download.wait_started():
+            self.send_error(502)
+            return
+
+        start, end = 0, None
+        range_header = self.headers.get("Range")
+        if range_header and download.supports_ranges:
+            first, _, last = range_header.removeprefix("bytes=").partition("-")
+            start = int(first or 0)
+            end = int(last) if last else None
+
+        total = download.total_length
+        if total and start >= total:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{total}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        # A seek past what has arrived triggers its own priority fetch
+        download.ensure_fetching(start)
+
+        if total:
+            end = min(end if end is not None else total - 1, total - 1)
+            self.send_response(206 if range_header and download.supports_ranges else 200)
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Length", str(end - start + 1))
+            if range_header:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+        else:
+            self.send_response(200)
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.send_header("Content-Type", "audio/mpeg")
+        self.end_headers()
+
+        offset = start
+        try:
+            while end is None or offset <= end:
+                available = download.wait_for(offset)
+                if not available:
+                    # Less than promised: closing tells the player the body ended early
+                    self.close_connection = True
+                    break
+                length = min(available, 65536)
+                if end is not None:
+                    length = min(length, end - offset + 1)
+                data = os.pread(download.fd, length, offset)
+                self.wfile.write(data)
+                offset += len(data)
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            # VLC drops the connection when it seeks
+            pass
+
+
+class StreamingProxy:
+    """Loopback HTTP server that lets VLC play episodes while they download.
+
+    Each stream counts the players holding its URL (open() and release())
+    and the requests reading its file. A finished stream's file is closed
+    once neither is left, and a failed one's once no request is reading it.
+    """
+
+    def __init__(self, download_manager):
+        self.download_manager = download_manager
+        self.streams = {}  # token -> ProgressiveDownload
+        self.lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamHandler)
+        self.server.daemon_threads = True
+        self.server.proxy = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _token(self, episode: Episode) -> str:
+        return hashlib.md5(f"{episode.feed_id}/{episode.guid}".encode()).hexdigest()
+
+    def is_streaming(self, episode: Episode) -> bool:
+        return self._token(episode) in self.streams
+
+    def open(self, episode: Episode) -> str:
+        """Start a progressive download if needed and return its loopback URL.
+
+        Returns at once, so it is safe to call from the UI; the download is set
+        up on its first fetcher's thread.
+        """
+        token = self._token(episode)
+        with self.lock:
+            download = self.streams.get(token)
+            if not download or download.failed:
+                # A failed stream still serving a request is left to close once idle
+                users = download.users if download else 0
+                manager = self.download_manager
+                filepath = manager.download_dir / episode.feed_id / f"{episode.guid}.part"
+                download = ProgressiveDownload(self, episode, filepath)
+                download.users = users
+                self.streams[token] = download
+                manager.progress.start(episode.guid)
+                download.ensure_fetching(0)
+            download.users += 1
+
+        return f"http://127.0.0.1:{self.server.server_port}/stream/{token}"
+
+    def release(self, episode: Episode):
+        """Note that a player no longer holds an episode's URL from open()."""
+        with self.lock:
+            download = self.streams.get(self._token(episode))
+            if download and download.users:
+                download.users -= 1
+                self._close_if_idle(download)
+
+    def _close_if_idle(self, download: ProgressiveDownload):
+        """Close and forget a finished or failed stream nothing is using. Caller holds self.lock."""
+        if download.readers or not (download.failed or (download.complete and not download.users)):
+            return
+        token = self._token(download.episode)
+        if self.streams.get(token) is download:
+            del self.streams[token]
+        if download.fd is not None:
+            os.close(download.fd)
+            download.fd = None
+
+    def _finish(self, download: ProgressiveDownload):
+        """Store a stream whose fetchers have all stopped, or drop it. Runs once per stream."""
+        manager = self.download_manager
+        episode = download.episode
+        with download.cond:
+            if download.finished:
+                return
+            download.finished = True
+        if download.reserved:
+            download.reserved = False
+            manager.storage.release(episode)
+
+        if download.complete:
+            try:
+                # The open fd keeps serving the data after the move
+                manager.store.ingest(download.filepath, episode)
+            except (OSError, IntegrityError) as e:
+                print(f"Stream error: {e}")
+                with download.cond:
+                    download.failed = True
+                    download.cond.notify_all()
+            else:
+                manager.mark_downloaded(episode)
+                manager.progress.finish(episode.guid, True)
+                if manager.prober:
+                    manager.prober.submit(episode)
+                if manager.analyzer:
+                    manager.analyzer.submit(episode)
+                if manager.storage:
+                    manager.storage.enforce(keep=episode)
+                with self.lock:
+                    self._close_if_idle(download)
+                return
+
+        manager.progress.finish(episode.guid, False)
+        try:
+            download.filepath.unlink()
+        except OSError:
+            pass
+        with self.lock:
+            self._close_if_idle(download)
@@ -0,0 +1,191 @@
+# --------------- Task Runner ---------------
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.pod.config.config import CPU_WORKERS, IO_WORKERS
+
+# Pool names
+IO = "io"  # network and disk transfers
+CPU = "cpu"  # parsing and number crunching
+
+
+class Cancelled(Exception):
+    """Raised inside a task that noticed it was cancelled."""
+
+
+class CancelToken:
+    """Cooperative cancellation flag handed to a running task."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        """Raise Cancelled if the task has been cancelled."""
+        if self._event.is_set():
+            raise Cancelled()
+
+
+_NEVER_CANCELLED = CancelToken()
+_local = threading.local()
+
+
+def current_token() -> CancelToken:
+    """The cancellation token of the task running on this thread.
+
+    Outside a task this is a token that is never cancelled, so service code
+    can check it unconditionally.
+    """
+    task = getattr(_local, "task", None)
+    return task.token if task else _NEVER_CANCELLED
+
+
+class Task:
+    """Handle on submitted work: its token, future and identity."""
+
+    def __init__(self, name: str, pool: str, key: Optional[str]):
+        self.name = name
+        self.pool = pool
+        self.key = key
+        self.token = CancelToken()
+        self.future: Future = Future()
+        # (on_done, on_error) of every submitter; None once they have been called
+        self.callbacks: Optional[List[Tuple[Optional[Callable], Optional[Callable]]]] = []
+
+    def cancel(self):
+        """Stop the task if it has not started and ask it to stop if it has."""
+        self.token.cancel()
+        self.future.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: Optional[float] = None):
+        return self.future.result(timeout)
+
+
+class TaskRunner:
+    """Runs background work on named, bounded thread pools.
+
+    The IO pool takes transfers and the CPU pool parsing; changes to the
+    database go through PodcastDatabase.update instead. Work submitted with a
+    key is deduplicated: while a task with that key is pending or running,
+    submitting the same key again returns the existing task, and its on_done
+    or on_error is called along with the first submitter's. Failures of every
+    task are reported through on_error, in addition to any per-task on_error.
+    """
+
+    def __init__(self, io_workers: int = IO_WORKERS, cpu_workers: int = CPU_WORKERS,
+                 on_error: Optional[Callable[[Task, BaseException], None]] = None):
+        self.pools = {
+            IO: ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="io"),
+            CPU: ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix="cpu"),
+        }
+        self.on_error = on_error
+        self.lock = threading.Lock()
+        self.active: Dict[str, Task] = {}  # key -> pending or running task
+
+    def submit(self, pool: str, fn: Callable, *args,
+               name: Optional[str] = None,
+               key: Optional[str] = None,
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None,
+               **kwargs) -> Task:
+        """Run fn(*args, **kwargs) on a pool and return its Task.
+
+        on_done gets the result and on_error the exception; both are called on
+        the worker thread, so UI code should hand off with call_from_thread.
+        Neither is called for a cancelled task.
+        """
+        with self.lock:
+            existing = self.active.get(key) if key is not None else None
+            if existing and not existing.cancelled and existing.callbacks is not None:
+                existing.callbacks.append((on_done, on_error))
+                return existing
+            task = Task(name or key or getattr(fn, "__name__", "task"), pool, key)
+            task.callbacks.append((on_done, on_error))
+            if key is not None:
+                self.active[key] = task
+        self.pools[pool].submit(self._run, task, fn, args, kwargs)
+        return task
+
+    def call(self, pool: str, fn: Callable, *args, **kwargs):
+        """Run fn on a pool and wait for its result, re-raising its exception.
+
+        Runs inline when already on that pool, so a task can call into code
+        that itself waits on the same pool without deadlocking.
+        """
+        if getattr(_local, "pool", None) == pool:
+            return fn(*args, **kwargs)
+        return self.submit(pool, fn, *args, **kwargs).future.result()
+
+    def cancel(self, key: str):
+        """Cancel the pending or running task with this key, if any."""
+        with self.lock:
+            task = self.active.get(key)
+        if task:
+            task.cancel()
+
+    def _take_callbacks(self, task: Task):
+        """Callbacks of every submitter; later submitters start a new task."""
+        with self.lock:
+            callbacks, task.callbacks = task.callbacks or [], None
+        return callbacks
+
+    def _run(self, task: Task, fn: Callable, args, kwargs):
+        _local.task = task
+        _local.pool = task.pool
+        try:
+            if task.future.set_running_or_notify_cancel():
+                task.token.check()
+                result = fn(*args, **kwargs)
+                task.future.set_result(result)
+                for on_done, _ in self._take_callbacks(task):
+                    if on_done and not task.cancelled:
+                        on_done(result)
+        except Cancelled:
+            if not task.future.done():
+                task.future.set_exception(Cancelled())
+        except Exception as e:
+            if not task.future.done():
+                task.future.set_exception(e)
+            self._report(task, e)
+            for _, on_error in self._take_callbacks(task):
+                if on_error:
+                    on_error(e)
+        finally:
+            self._take_callbacks(task)
+            _local.task = None
+            _local.pool = None
+            if task.key is not None:
+                with self.lock:
+                    if self.active.get(task.key) is task:
+                        del self.active[task.key]
+
+    def _report(self, task: Task, error: BaseException):
+        print(f"Task {task.name} failed: {error}")
+        if self.on_error:
+            try:
+                self.on_error(task, error)
+            except Exception as e:
+                print(f"Error reporting failure of {task.name}: {e}")
+
+    def shutdown(self):
+        """Cancel everything and stop the pools without waiting."""
+        with self.lock:
+            tasks = list(self.active.values())
+        for task in tasks:
+            task.cancel()
+        for pool in self.pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
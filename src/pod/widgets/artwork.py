@@ -0,0 +1,48 @@
+from rich.color import Color
+from rich.style import Style
+from rich.text import Text
+from textual.widgets import Static
+
+from src.pod.services.artwork import ArtworkCache
+
+
+def artwork_text(image) -> Text:
+    """Draw an RGB image with upper half blocks, one cell per two rows of pixels."""
+    width, height = image.size
+    pixels = image.load()
+    text = Text(no_wrap=True, overflow="crop")
+    for y in range(0, height, 2):
+        for x in range(width):
+            top = Color.from_rgb(*pixels[x, y])
+            bottom = Color.from_rgb(*pixels[x, y + 1]) if y + 1 < height else None
+            text.append("▀", Style(color=top, bgcolor=bottom))
+        if y + 2 < height:
+            text.append("\n")
+    return text
+
+
+class Artwork(Static):
+    """Thumbnail of a podcast's artwork, shown at once when cached."""
+
+    def __init__(self, artwork: ArtworkCache | None, **kwargs):
+        super().__init__(**kwargs)
+        self.artwork = artwork
+        self.url = None  # image the widget is showing or waiting for
+
+    def show(self, url: str | None):
+        """Show the image at url, loading it in the background if needed."""
+        self.url = url
+        self.display = bool(url and self.artwork)
+        if not self.display:
+            return
+        image = self.artwork.get(url)
+        if image is not None:
+            self.update(artwork_text(image))
+            return
+        self.update("")
+        self.artwork.request(url, lambda image: self.app.call_from_thread(self._loaded, url, image))
+
+    def _loaded(self, url: str, image):
+        # Another feed may have been selected while this one loaded
+        if url == self.url and image is not None:
+            self.update(artwork_text(image))
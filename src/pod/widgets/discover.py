@@ -3,21 +3,40 @@ from textual.containers import Container
 from textual.widgets import (Button, Static, Label, Input)
 
 from textual.reactive import reactive
-import httpx
-import asyncio
+
+from src.pod.config.config import PREVIEW_ITEMS, SEARCH_DEBOUNCE, SEARCH_MIN_CHARS
+from src.pod.services.feedupdater import FeedUpdater
+from src.pod.services.podcastsearch import PodcastSearch, normalize
+from src.pod.services.taskrunner import IO, TaskRunner
 
 
 class DiscoverView(Static):
-    """Widget for discovering and searching podcasts from iTunes API."""
+    """Widget for discovering and searching podcasts from iTunes API.
+
+    Searches as you type: cached answers show at once, and the API is asked
+    once typing pauses for SEARCH_DEBOUNCE seconds. A new search cancels the
+    one in flight, and results for anything but the current query are dropped.
+    Previews read just the start of a feed to show its latest episodes.
+    """
 
     is_searching = reactive(False)
     search_results = reactive([])
 
+    def __init__(self, search: PodcastSearch, feed_updater: FeedUpdater, tasks: TaskRunner):
+        super().__init__()
+        self.search = search
+        self.feed_updater = feed_updater
+        self.tasks = tasks
+        self.search_timer = None
+        self.current_query = ""  # normalized query the results widget is for
+        self.current_preview = None  # feed URL the preview widget is for
+
     def compose(self) -> ComposeResult:
         yield Container(
             Label("Discover Podcasts", classes="view-title"),
             Input(placeholder="Search for podcasts", id="search-input"),
             Button(label="Search", id="search-button"),
+            Static(id="feed-preview"),
             Static(id="search-results"),
             id="discover-view"
         )
@@ -36,45 +55,60 @@ class DiscoverView(Static):
         if event.input.id == "search-input":
             self.search_podcasts()
 
+    def on_input_changed(self, event: Input.Changed):
+        """Search as you type, once typing pauses."""
+        if event.input.id != "search-input":
+            return
+        if self.search_timer:
+            self.search_timer.stop()
+            self.search_timer = None
+        query = normalize(event.value)
+        if len(query) < SEARCH_MIN_CHARS or query == self.current_query:
+            return
+
+        # Show what the cache knows straight away
+        instant = self.search.instant(query)
+        if instant:
+            final, results = instant
+            self.current_query = query
+            self.tasks.cancel("search")
+            self._update_search_results(results, query)
+            if final:
+                return
+        self.search_timer = self.set_timer(SEARCH_DEBOUNCE, self.search_podcasts)
+
     def search_podcasts(self):
         """Start podcast search with iTunes API."""
-        search_term = self.query_one("#search-input").value  # type: ignore
+        if self.search_timer:
+            self.search_timer.stop()
+            self.search_timer = None
+        search_term = normalize(self.query_one("#search-input", Input).value)
 
-        if not search_term or len(search_term.strip()) == 0:
+        if not search_term:
             self.notify("Please enter a search term", severity="error")
             return
 
-        # Display loading indicator
+        # Display loading indicator, unless cached results are already shown
         self.is_searching = True
-        results_widget = self.query_one("#search-results", Static)
-        results_widget.update("Searching...")
-
-        # Start search in background
-        async def do_search():
-            try:
-                results = await self.fetch_itunes_podcasts(search_term)
-                self.app.call_later(self._update_search_results, results)
-            except Exception as e:
-                self.app.call_later(self._handle_search_error, str(e))
-
-        asyncio.create_task(do_search())
-
-    async def fetch_itunes_podcasts(self, search_term):
-        """Fetch podcast data from iTunes API."""
-        # URL encode the search term
-        encoded_term = search_term.replace(" ", "+")
-        url = f"https://itunes.apple.com/search?term={encoded_term}&entity=podcast&limit=20"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("results", [])
-            else:
-                raise Exception(f"API error: {response.status_code}")
+        if search_term != self.current_query:
+            self.query_one("#search-results", Static).update("Searching...")
+        self.current_query = search_term
+
+        # Search in background, cancelling any earlier search
+        self.tasks.cancel("search")
+        self.tasks.submit(
+            IO, self.search.search, search_term,
+            key="search", name="Podcast search",
+            on_done=lambda results: self.app.call_from_thread(
+                self._update_search_results, results, search_term),
+            on_error=lambda error: self.app.call_from_thread(
+                self._handle_search_error, str(error), search_term),
+        )
 
-    def _update_search_results(self, results):
+    def _update_search_results(self, results, query):
         """Update UI with search results."""
+        if query != self.current_query:
+            return  # the user has typed something else since
         self.is_searching = False
         self.search_results = results
 
@@ -94,44 +128,86 @@ class DiscoverView(Static):
             content.append(f"### {i+1}. {title}")
             content.append(f"By: {artist}")
             if feed_url:
-                content.append(f"[Subscribe](@subscribe:{feed_url})")
+                content.append(f"[Preview](@preview:{feed_url}) [Subscribe](@subscribe:{feed_url})")
             content.append("---")
 
         results_widget.update("\n".join(content))
 
-    def _handle_search_error(self, error_message):
+    def _handle_search_error(self, error_message, query):
         """Handle search errors."""
+        if query != self.current_query:
+            return
         self.is_searching = False
         results_widget = self.query_one("#search-results", Static)
         results_widget.update(f"Error: {error_message}")
 
     def on_click(self, event):
-        """Handle clicks on results - detect subscribe links."""
+        """Handle clicks on results - detect subscribe and preview links."""
         if hasattr(event, 'link') and event.link and event.link.startswith("@subscribe:"):
             feed_url = event.link[11:]  # Remove the @subscribe: prefix
             self.add_subscription(feed_url)
+        elif hasattr(event, 'link') and event.link and event.link.startswith("@preview:"):
+            self.preview_feed(event.link[9:])
+
+    def preview_feed(self, feed_url):
+        """Show a podcast's details and latest episodes without subscribing."""
+        self.current_preview = feed_url
+        self.query_one("#feed-preview", Static).update("Loading preview...")
+
+        # Only the latest preview matters
+        self.tasks.cancel("preview")
+        self.tasks.submit(
+            IO, self.feed_updater.preview_feed, feed_url,
+            key="preview", name="Feed preview",
+            on_done=lambda feed_data: self.app.call_from_thread(
+                self._show_preview, feed_url, feed_data),
+            on_error=lambda error: self.app.call_from_thread(
+                self._show_preview, feed_url, None),
+        )
+
+    def _show_preview(self, feed_url, feed_data):
+        """Update UI with a feed preview."""
+        if feed_url != self.current_preview:
+            return
+        preview_widget = self.query_one("#feed-preview", Static)
+        if not feed_data:
+            preview_widget.update("Could not load a preview of this feed.")
+            return
+
+        content = [f"### {feed_data.get('title') or 'Untitled Podcast'}",
+                   f"By: {feed_data.get('author') or 'Unknown Artist'}"]
+        description = " ".join((feed_data.get("description") or "").split())
+        if description:
+            content.append(description[:200] + ("..." if len(description) > 200 else ""))
+        content.append("Latest episodes:")
+        for ep_data in feed_data["episodes"][:PREVIEW_ITEMS]:
+            pub_date = ep_data.get("pub_date")
+            date = pub_date.strftime("%Y-%m-%d") if pub_date else "----------"
+            content.append(f"  {date}  {ep_data.get('title') or 'Untitled'}")
+        content.append(f"[Subscribe](@subscribe:{feed_url})")
+        content.append("---")
+        preview_widget.update("\n".join(content))
 
     def add_subscription(self, feed_url):
         """Add a subscription to the database."""
         self.notify(f"Adding subscription: {feed_url}")
 
-        # Check if we have access to the feed updater through the app
-        if hasattr(self.app, "feed_updater"):
-            # Show loading indicator
-            self.notify("Adding feed...")
-
-            # Add feed in background
-            def do_add_feed():
-                try:
-                    success, feed = self.app.feed_updater.add_feed(feed_url) # type: ignore
-                    self.app.call_from_thread(self._after_add_feed, success, feed_url, feed)
-                except Exception as e:
-                    self.app.call_from_thread(self._after_add_feed, False, feed_url, str(e))
-
-            import threading
-            thread = threading.Thread(target=do_add_feed)
-            thread.daemon = True
-            thread.start()
+        # Show loading indicator
+        self.notify("Adding feed...")
+
+        # Add feed in background; clicking the same link again joins it
+        def after_add(feed):
+            if feed:
+                self.app.call_from_thread(self._after_add_feed, True, feed_url, feed)
+            else:
+                self.app.call_from_thread(self._after_add_feed, False, feed_url, "could not read the feed")
+
+        self.tasks.submit(
+            IO, self.feed_updater.add_feed_from_url, feed_url,
+            key=f"subscribe:{feed_url}", name="Subscribe",
+            on_done=after_add,
+            on_error=lambda error: self.app.call_from_thread(self._after_add_feed, False, feed_url, str(error)),
+        )
 
     def _after_add_feed(self, success, feed_url, feed_or_error):
         """Handle UI updates after adding a feed."""
@@ -1,14 +1,62 @@
+from typing import Dict, Tuple
+
 from textual.app import ComposeResult
 from textual.containers import Container, Horizontal
 from textual.widgets import (
     Button, Static, Label, ProgressBar
 )
 
+from src.pod.models.episode import Episode
 from src.pod.services.databasemanager import PodcastDatabase
 from src.pod.services.audioplayer import AudioPlayer
+from src.pod.services.taskrunner import IO
+from src.pod.widgets.keyedlist import sync_children
 from src.pod.widgets.nowplayingbar import NowPlayingBar
 
 
+class DownloadedEpisodeItem(Container):
+    """One downloaded episode; updated in place when its progress changes."""
+
+    def __init__(self, episode: Episode, feed_name: str):
+        super().__init__(classes="downloaded-item")
+        self.episode = episode
+        self.shown = self._texts(episode, feed_name)
+
+    def _texts(self, episode: Episode, feed_name: str) -> Tuple[str, str, float, str]:
+        return (episode.title, f"({feed_name})", episode.play_progress_percent(),
+                episode.format_play_progress())
+
+    def compose(self) -> ComposeResult:
+        title, feed_name, progress, progress_text = self.shown
+        yield Label(title, classes="episode-title")
+        yield Label(feed_name, classes="feed-name")
+        yield Horizontal(
+            ProgressBar(100, classes="episode-progress"),
+            Label(progress_text, classes="episode-progress-text"),
+            classes="episode-progress-container"
+        )
+        yield Horizontal(
+            Button("▶", classes="play-button"),
+            Button("🗑", classes="delete-button"),
+            classes="episode-buttons"
+        )
+
+    def on_mount(self):
+        self.query_one(ProgressBar).update(progress=self.shown[2])
+
+    def show(self, episode: Episode, feed_name: str):
+        self.episode = episode
+        texts = self._texts(episode, feed_name)
+        if texts == self.shown:
+            return
+        self.query_one(".episode-title", Label).update(texts[0])
+        self.query_one(".feed-name", Label).update(texts[1])
+        if texts[2] != self.shown[2]:
+            self.query_one(ProgressBar).update(progress=texts[2])
+        self.query_one(".episode-progress-text", Label).update(texts[3])
+        self.shown = texts
+
+
 class DownloadedEpisodesList(Static):
     """Widget showing downloaded episodes."""
 
@@ -16,6 +64,7 @@ class DownloadedEpisodesList(Static):
         super().__init__()
         self.database = database
         self.player = player
+        self.items: Dict[Tuple[str, str], DownloadedEpisodeItem] = {}  # (feed id, guid) -> item
 
     def compose(self) -> ComposeResult:
         yield Container(
@@ -29,48 +78,38 @@ class DownloadedEpisodesList(Static):
         self.load_episodes()
 
     def load_episodes(self):
-        """Load downloaded episodes."""
+        """Update the list of downloaded episodes, changing only what differs."""
         episodes_container = self.query_one("#downloaded-list", Static)
-        episodes_container.remove_children()
 
-        downloaded = self.database.get_downloaded_episodes()
-
-        for episode in downloaded:
+        entries = []
+        for episode in self.database.get_downloaded_episodes():
             feed = self.database.get_feed(episode.feed_id)
             feed_name = feed.title if feed else "Unknown"
+            entries.append(((episode.feed_id, episode.guid), (episode, feed_name)))
+
+        sync_children(episodes_container, self.items, entries,
+                      create=self._create_item, update=self._update_item)
+
+    def _create_item(self, value) -> DownloadedEpisodeItem:
+        episode, feed_name = value
+        return DownloadedEpisodeItem(episode, feed_name)
 
-            progress = episode.play_progress_percent()
-
-            episode_container = Container(
-                Label(f"{episode.title}", classes="episode-title"),
-                Label(f"({feed_name})", classes="feed-name"),
-                Horizontal(
-                    ProgressBar(progress, classes="episode-progress"),
-                    Label(episode.format_play_progress(), classes="episode-progress-text"),
-                    classes="episode-progress-container"
-                ),
-                Horizontal(
-                    Button("▶", id=f"play-{episode.guid}", classes="play-button"),
-                    Button("🗑", id=f"delete-{episode.guid}", classes="delete-button"),
-                    classes="episode-buttons"
-                ),
-                classes="downloaded-item",
-                id=f"downloaded-{episode.guid}"
-            )
-
-            episodes_container.mount(episode_container)
+    def _update_item(self, item: DownloadedEpisodeItem, value):
+        episode, feed_name = value
+        item.show(episode, feed_name)
 
     def on_button_pressed(self, event: Button.Pressed):
         """Handle button presses."""
-        button_id = event.button.id
+        item = next((node for node in event.button.ancestors
+                     if isinstance(node, DownloadedEpisodeItem)), None)
+        if not item:
+            return
 
-        if button_id and button_id.startswith("play-"):
-            guid = button_id.replace("play-", "")
-            self.play_episode(guid)
+        if event.button.has_class("play-button"):
+            self.play_episode(item.episode.guid)
 
-        elif button_id and button_id.startswith("delete-"):
-            guid = button_id.replace("delete-", "")
-            self.delete_episode(guid)
+        elif event.button.has_class("delete-button"):
+            self.delete_episode(item.episode.guid)
 
     def play_episode(self, guid: str):
         """Play an episode by GUID."""
@@ -93,9 +132,10 @@ class DownloadedEpisodesList(Static):
         for feed in self.database.feeds:
             for episode in feed.episodes:
                 if episode.guid == guid and episode.downloaded:
-                    # Get reference to download manager
-                    download_manager = self.app.download_manager
-                    if download_manager.delete_downloaded_episode(episode):
-                        # Refresh list
-                        self.load_episodes()
+                    # Deleting waits on the database writer, so it runs on the IO pool
+                    self.app.tasks.submit(
+                        IO, self.app.download_manager.delete_downloaded_episode, episode,
+                        key=f"delete:{episode.feed_id}:{episode.guid}",
+                        name=f"Delete of {episode.title}",
+                        on_done=lambda deleted: deleted and self.app.call_from_thread(self.load_episodes))
                     break
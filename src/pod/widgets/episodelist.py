@@ -0,0 +1,170 @@
+from math import ceil
+from typing import Dict, List, Optional
+
+from textual.app import ComposeResult
+from textual.containers import Container, Horizontal, VerticalScroll
+from textual.widgets import (
+    Button, Static, Label, ProgressBar
+)
+
+from src.pod.models.episode import Episode
+from src.pod.services.databasemanager import PodcastDatabase
+from src.pod.services.downloadmanager import DownloadManager
+from src.pod.services.progressbus import DownloadProgress
+
+
+class EpisodeRow(Container):
+    """One row of the episode list, rebound to another episode as the list scrolls."""
+
+    def __init__(self):
+        super().__init__(classes="episode-row")
+        self.episode: Optional[Episode] = None
+
+    def compose(self) -> ComposeResult:
+        yield Label("", classes="episode-title")
+        yield Label("", classes="episode-date")
+        yield Label("", classes="episode-duration")
+        yield Static("", classes="episode-description")
+        yield Horizontal(
+            Button("⬇", classes="play-dl"),
+            Button("▶", classes="stream", variant="primary"),
+            Button("➕", classes="queue"),
+            ProgressBar(classes="episode-progress"),
+            Label("", classes="episode-download-status"),
+            classes="episode-actions"
+        )
+
+    def on_mount(self):
+        self.title_label = self.query_one(".episode-title", Label)
+        self.date_label = self.query_one(".episode-date", Label)
+        self.duration_label = self.query_one(".episode-duration", Label)
+        self.description = self.query_one(".episode-description", Static)
+        self.play_button = self.query_one(".play-dl", Button)
+        self.stream_button = self.query_one(".stream", Button)
+        self.queue_button = self.query_one(".queue", Button)
+        self.progress_bar = self.query_one(".episode-progress", ProgressBar)
+        self.status = self.query_one(".episode-download-status", Label)
+
+    def bind(self, episode: Episode, progress: Optional[DownloadProgress]):
+        """Show an episode in this row, with its download progress if one is running."""
+        self.episode = episode
+        self.title_label.update(episode.title)
+        self.date_label.update(f"Published: {episode.pub_date.strftime('%Y-%m-%d') if episode.pub_date else 'Unknown'}")
+        self.duration_label.update(f"Duration: {episode.format_duration()}")
+        self.description.update(episode.description[:150] + "..." if len(episode.description) > 150 else episode.description)
+
+        downloading = progress is not None and not progress.finished
+        self.play_button.label = "⏳" if downloading else ("▶" if episode.downloaded else "⬇")
+        failed = progress is not None and progress.finished and not progress.success
+        self.play_button.variant = "success" if episode.downloaded else ("error" if failed else "default")
+        self.play_button.disabled = downloading or (not episode.downloaded and not episode.audio_url)
+        self.stream_button.display = not episode.downloaded
+        self.stream_button.disabled = not episode.audio_url
+        self.queue_button.disabled = not episode.downloaded and not episode.audio_url
+
+        self.progress_bar.visible = episode.downloaded or downloading
+        self.progress_bar.update(total=100, progress=100 if episode.downloaded else (progress.percent if progress else 0))
+        self.status.update("")
+        if downloading:
+            self.show_progress(progress)
+
+    def show_progress(self, event: DownloadProgress):
+        """Update the progress bar and rate/ETA from a progress event."""
+        self.progress_bar.visible = True
+        self.progress_bar.update(total=100, progress=event.percent)
+
+        if event.finished:
+            self.status.update("")
+        elif event.rate:
+            eta = f", {int(event.eta // 60)}:{int(event.eta % 60):02d} left" if event.eta is not None else ""
+            self.status.update(f"{event.rate / 1024 / 1024:.1f} MB/s{eta}")
+
+
+class EpisodeList(VerticalScroll):
+    """Scrolling list of a feed's episodes that only creates widgets for visible rows.
+
+    Rows have a fixed height. Spacers above and below the rows give the list
+    its full scroll height, and as it scrolls the same row widgets are
+    rebound to the episodes now in view, fetched a page at a time with
+    PodcastDatabase.get_episodes. Opening or scrolling a feed costs the same
+    whether it has ten episodes or ten thousand.
+    """
+
+    ROW_HEIGHT = 13  # 12 lines plus the margin below each row
+    OVERSCAN = 2  # rows kept above and below the visible ones
+
+    def __init__(self, database: PodcastDatabase, download_manager: DownloadManager, id=None):
+        super().__init__(id=id)
+        self.database = database
+        self.download_manager = download_manager
+        self.feed_id: Optional[str] = None
+        self.total = 0
+        self.first = -1  # index of the episode in the first row
+        self.rows: List[EpisodeRow] = []
+        self.rows_by_guid: Dict[str, EpisodeRow] = {}
+
+    def compose(self) -> ComposeResult:
+        yield Static(classes="episode-spacer", id="episodes-spacer-top")
+        yield Static(classes="episode-spacer", id="episodes-spacer-bottom")
+
+    def on_mount(self):
+        self.top_spacer = self.query_one("#episodes-spacer-top", Static)
+        self.bottom_spacer = self.query_one("#episodes-spacer-bottom", Static)
+
+    def show_feed(self, feed_id: str):
+        """Start showing a feed from its first episode."""
+        self.feed_id = feed_id
+        self.total = self.database.count_episodes(feed_id)
+        self.scroll_home(animate=False)
+        self.refresh_rows()
+
+    def refresh_rows(self):
+        """Rebind the rows, e.g. after the feed was updated."""
+        if self.feed_id:
+            self.total = self.database.count_episodes(self.feed_id)
+        self.first = -1
+        self._update_window()
+
+    def on_resize(self, event):
+        # Enough rows to fill the viewport plus the overscan on both sides
+        needed = ceil(self.size.height / self.ROW_HEIGHT) + 2 * self.OVERSCAN
+        while len(self.rows) < needed:
+            row = EpisodeRow()
+            self.rows.append(row)
+            self.mount(row, before=self.bottom_spacer)
+        while len(self.rows) > needed:
+            self.rows.pop().remove()
+        self.call_after_refresh(self.refresh_rows)
+
+    def watch_scroll_y(self, old_value: float, new_value: float):
+        super().watch_scroll_y(old_value, new_value)
+        self._update_window()
+
+    def _update_window(self):
+        """Bind rows to the episodes around the scroll position, if that has moved."""
+        if not self.feed_id or not self.rows or not self.rows[0].is_mounted:
+            return
+
+        first = max(0, int(self.scroll_y) // self.ROW_HEIGHT - self.OVERSCAN)
+        first = max(0, min(first, self.total - len(self.rows)))
+        if first == self.first:
+            return
+        self.first = first
+
+        episodes = self.database.get_episodes(self.feed_id, first, len(self.rows))
+        progress = self.download_manager.progress
+        self.rows_by_guid = {}
+        for row, episode in zip(self.rows, episodes):
+            row.display = True
+            row.bind(episode, progress.get(episode.guid))
+            self.rows_by_guid[episode.guid] = row
+        for row in self.rows[len(episodes):]:
+            row.display = False
+            row.episode = None
+
+        self.top_spacer.styles.height = first * self.ROW_HEIGHT
+        self.bottom_spacer.styles.height = max(0, self.total - first - len(episodes)) * self.ROW_HEIGHT
+
+    def row_for(self, guid: str) -> Optional[EpisodeRow]:
+        """The row showing an episode, if it is in view."""
+        return self.rows_by_guid.get(guid)
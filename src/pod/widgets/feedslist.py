@@ -1,18 +1,48 @@
+from typing import Dict, List, Optional, Tuple
+
+from rich.text import Text
 from textual.app import ComposeResult
 from textual.containers import Container, Horizontal
 from textual.widgets import (
     Button, Static, Tree, Label
 )
+from textual.widgets.tree import TreeNode
 
+from src.pod.config.config import FEED_SORT, FEED_STATS_REFRESH_INTERVAL
+from src.pod.models.feed import Feed
 from src.pod.services.databasemanager import PodcastDatabase
 
+# Sort orders, each a key over a feed and whether it sorts descending
+SORT_KEYS = {
+    "added": None,  # database order
+    "title": (lambda feed: feed.title.casefold(), False),
+    "latest": (lambda feed: feed.stats.latest_pub, True),
+    "unplayed": (lambda feed: feed.stats.unplayed, True),
+    "backlog": (lambda feed: feed.stats.unplayed_duration, True),
+}
+
+
+def _format_hours(seconds: int) -> str:
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}h{rest // 60:02d}" if hours else f"{rest // 60}m"
+
+
 class FeedsList(Static):
-    """Widget showing list of subscribed feeds."""
+    """Widget showing list of subscribed feeds.
+
+    Each feed is labelled with its unplayed and downloaded counts and unplayed
+    time, read from the totals the feed keeps (Feed.stats), so redrawing and
+    sorting never walk episode lists.
+    """
 
     def __init__(self, database: PodcastDatabase):
         super().__init__()
         self.database = database
-        print(f"\n\n\n{self.database=}")
+        self.sort = FEED_SORT if FEED_SORT in SORT_KEYS else "added"
+        self.nodes: Dict[str, TreeNode] = {}  # feed id -> tree node
+        self.labels: Dict[str, Tuple] = {}  # feed id -> what its label shows
+        self.empty_node: Optional[TreeNode] = None
+        self.seen: List[Tuple[str, int]] = []  # (feed id, stats version) at the last load
 
     def compose(self) -> ComposeResult:
         yield Container(
@@ -24,44 +54,105 @@ class FeedsList(Static):
 
     def on_mount(self):
         """Load feeds when mounted."""
+        tree = self.query_one("#feeds-tree", Tree)
+        tree.styles.min_height = 10
+        tree.root.expand()
+        self.load_feeds()
+        self.set_interval(FEED_STATS_REFRESH_INTERVAL, self._check_stats)
 
-        with open("feedlist.txt", "w") as f:
-            f.write("FeedsList mounted")
-            tree = self.query_one("#feeds-tree", Tree)
-            f.write(f"Tree widget found: {tree}")
-            tree.styles.min_height = 10
+    def _check_stats(self):
+        """Reload if any feed's stats changed, e.g. an episode was played or downloaded."""
+        if [(feed.id, feed.stats.version) for feed in self.database.feeds] != self.seen:
+            self.load_feeds()
 
+    def cycle_sort(self) -> str:
+        """Switch to the next sort order and return its name."""
+        names = list(SORT_KEYS)
+        self.sort = names[(names.index(self.sort) + 1) % len(names)]
         self.load_feeds()
+        return self.sort
+
+    def sorted_feeds(self) -> List[Feed]:
+        feeds = list(self.database.feeds)
+        order = SORT_KEYS[self.sort]
+        if order:
+            key, descending = order
+            feeds.sort(key=key, reverse=descending)
+        return feeds
+
+    @staticmethod
+    def _label(feed: Feed) -> Tuple:
+        stats = feed.stats
+        return (feed.title, stats.unplayed, stats.downloaded, stats.unplayed_duration)
+
+    @staticmethod
+    def _label_text(label: Tuple) -> Text:
+        title, unplayed, downloaded, unplayed_duration = label
+        text = Text(title)
+        details = []
+        if unplayed:
+            details.append(f"{unplayed} new")
+        if downloaded:
+            details.append(f"{downloaded} ⬇")
+        if unplayed_duration:
+            details.append(_format_hours(unplayed_duration))
+        if details:
+            text.append("  " + " · ".join(details), style="dim")
+        return text
 
     def load_feeds(self):
-        """Load feeds into the tree."""
+        """Bring the tree in line with the database, touching only nodes that changed.
+
+        Existing nodes are kept, so the scroll position survives a refresh,
+        and the cursor stays on the same feed even when it has to move.
+        """
         tree = self.query_one("#feeds-tree", Tree)
-        tree.clear()
         root = tree.root
-        root.expand()
-
-        # More detailed debug info
-        with open("feeds.txt", "w") as f:
-            f.write(f"Database: {self.database}")
-            f.write(f"Feeds: {self.database.feeds}")
-            for feed in self.database.feeds:
-                f.write(f"Feed: {feed.id} - {feed.title}")
-                node = root.add(feed.title, {"id": feed.id, "type": "feed"})
-                # Make the node expanded by default
-                node.expand()
-                # Maybe add a child node to see if that helps with visibility
-                node.add("(Click to view episodes)")
-
-        # Debug print
-            f.write(f"Loading feeds: {len(self.database.feeds)} found")
-
-        feeds = self.database.feeds
+        cursor = tree.cursor_node
+        cursor_id = cursor.data.get("id") if cursor and cursor.data else None
+        moved = False
+        feeds = self.sorted_feeds()
+        wanted = {feed.id for feed in feeds}
+        self.seen = [(feed.id, feed.stats.version) for feed in self.database.feeds]
+
+        # Remove feeds that are gone
+        for feed_id in [feed_id for feed_id in self.nodes if feed_id not in wanted]:
+            self.nodes.pop(feed_id).remove()
+            del self.labels[feed_id]
+
         if not feeds:
-            root.add("No podcasts yet. Click 'Add Feed' to get started.")
+            if not self.empty_node:
+                self.empty_node = root.add_leaf("No podcasts yet. Click 'Add Feed' to get started.")
             return
+        if self.empty_node:
+            self.empty_node.remove()
+            self.empty_node = None
+
+        # Relabel changed feeds and put each node at its sorted position.
+        # Tree nodes cannot be moved, so a feed whose position changed is
+        # removed and added again in its new place.
+        for index, feed in enumerate(feeds):
+            label = self._label(feed)
+            node = self.nodes.get(feed.id)
+            if node and index < len(root.children) and root.children[index] is node:
+                if self.labels[feed.id] != label:
+                    node.set_label(self._label_text(label))
+                    self.labels[feed.id] = label
+                continue
+            if node:
+                node.remove()
+            moved = True
+            data = {"id": feed.id, "type": "feed"}
+            if index < len(root.children):
+                node = root.add(self._label_text(label), data, before=index)
+            else:
+                node = root.add(self._label_text(label), data)
+            self.nodes[feed.id] = node
+            self.labels[feed.id] = label
 
-        for feed in feeds:
-            node = root.add(feed.title, {"id": feed.id, "type": "feed"})# We could add episode nodes here, but let's keep it simple for now
+        # Line numbers are only known once the tree has laid out its nodes again
+        if moved and cursor_id in self.nodes:
+            self.call_after_refresh(tree.move_cursor, self.nodes[cursor_id])
 
     def on_tree_node_selected(self, event: Tree.NodeSelected):
         """Handle feed selection."""
@@ -69,5 +160,4 @@ class FeedsList(Static):
             node_data = event.node.data
             if node_data.get("type") == "feed":
                 feed_id = node_data.get("id")
-                # COMMENTED WHILST DEBUGGING
-                # self.app.show_feed(feed_id)
+                self.app.show_feed(feed_id)
@@ -1,40 +1,101 @@
 from textual.app import  ComposeResult
-from textual.containers import Container, Horizontal
-from textual.css.query import NoMatches
+from textual.containers import Container, Horizontal, Vertical
+from textual.message import Message
 from textual.widgets import (
-    Button, Static, Label, ProgressBar
+    Button, Static, Label, Input, Switch
 )
 
+from src.pod.models.autodownloadpolicy import AutoDownloadPolicy
 from src.pod.models.feed import Feed
+from src.pod.services.artwork import ArtworkCache
 from src.pod.services.audioplayer import AudioPlayer
-from src.pod.services.downloadmanager import DownloadManager
+from src.pod.services.autodownloader import AutoDownloader
+from src.pod.services.databasemanager import PodcastDatabase
+from src.pod.services.downloadmanager import DownloadManager, download_key
+from src.pod.services.progressbus import DownloadProgress
+from src.pod.services.taskrunner import IO, TaskRunner
+from src.pod.widgets.artwork import Artwork
+from src.pod.widgets.episodelist import EpisodeList, EpisodeRow
 from src.pod.widgets.nowplayingbar import NowPlayingBar
 
 
 class FeedView(Static):
     """View showing details of a single feed."""
 
-    def __init__(self, player: AudioPlayer, download_manager: DownloadManager):
+    class DownloadProgressUpdated(Message):
+        """A batch of download progress events from the progress bus."""
+
+        def __init__(self, events: list[DownloadProgress]):
+            super().__init__()
+            self.events = events
+
+    def __init__(self, database: PodcastDatabase, player: AudioPlayer,
+                 download_manager: DownloadManager, tasks: TaskRunner,
+                 artwork: ArtworkCache | None = None,
+                 auto_downloader: AutoDownloader | None = None):
         super().__init__()
+        self.database = database
         self.player = player
         self.download_manager = download_manager
+        self.tasks = tasks
+        self.artwork = artwork
+        self.auto_downloader = auto_downloader
         self.current_feed = None
 
     def compose(self) -> ComposeResult:
         yield Container(
-            Container(
-                Label("Feed Title", id="feed-title", classes="view-title"),
-                Label("Feed Author", id="feed-author"),
+            Horizontal(
+                Artwork(self.artwork, id="feed-artwork"),
+                Vertical(
+                    Label("Feed Title", id="feed-title", classes="view-title"),
+                    Label("Feed Author", id="feed-author"),
+                    Horizontal(
+                        Label("Auto-download", classes="setting-label"),
+                        Switch(id="auto-download-enabled"),
+                        Label("Keep newest", classes="setting-label"),
+                        Input(type="integer", id="auto-download-keep", classes="setting-number"),
+                        Label("Max minutes", classes="setting-label"),
+                        Input(type="integer", placeholder="any", id="auto-download-max-minutes",
+                              classes="setting-number"),
+                        Label("Only when idle", classes="setting-label"),
+                        Switch(id="auto-download-idle"),
+                        id="auto-download-settings"
+                    ),
+                    id="feed-heading"
+                ),
                 id="feed-header"
             ),
             Container(
                 Label("Episodes", classes="section-title"),
-                Static(id="feed-episodes-list"),
+                EpisodeList(self.database, self.download_manager, id="feed-episodes-list"),
                 id="feed-episodes"
             ),
             id="feed-view"
         )
 
+    def on_mount(self):
+        """Receive pushed download progress."""
+        self.download_manager.progress.subscribe(self._on_progress_batch)
+
+    def on_unmount(self):
+        self.download_manager.progress.unsubscribe(self._on_progress_batch)
+
+    def _on_progress_batch(self, events: list[DownloadProgress]):
+        """Called on the progress bus thread; post_message is thread safe."""
+        self.post_message(self.DownloadProgressUpdated(events))
+
+    def on_feed_view_download_progress_updated(self, message: DownloadProgressUpdated):
+        """Update progress bars for downloads in this feed."""
+        episodes_list = self.query_one(EpisodeList)
+        for event in message.events:
+            # Only episodes scrolled into view have a row
+            row = episodes_list.row_for(event.guid)
+            if row and event.finished:
+                # Ended without this view asking for it, e.g. a prefetch or stream
+                row.bind(row.episode, event)
+            elif row:
+                row.show_progress(event)
+
     def load_feed(self, feed: Feed):
         """Load a feed into the view."""
         self.current_feed = feed
@@ -44,113 +105,121 @@ class FeedView(Static):
         author = self.query_one("#feed-author", Label)
         title.update(feed.title)
         author.update(feed.author)
+        self.query_one(Artwork).show(feed.image_url)
+        self._show_policy(feed.auto_download)
+
+        # Load episodes; rows are filled in a page at a time as they scroll into view
+        self.query_one(EpisodeList).show_feed(feed.id)
+
+    def _show_policy(self, policy: AutoDownloadPolicy):
+        """Fill in the auto-download settings without saving them back."""
+        with self.prevent(Switch.Changed, Input.Changed):
+            self.query_one("#auto-download-enabled", Switch).value = policy.enabled
+            self.query_one("#auto-download-keep", Input).value = str(policy.keep_newest)
+            self.query_one("#auto-download-max-minutes", Input).value = (
+                str(policy.max_duration_minutes) if policy.max_duration_minutes is not None else "")
+            self.query_one("#auto-download-idle", Switch).value = policy.only_when_idle
+
+    def on_switch_changed(self, event: Switch.Changed):
+        if event.switch.id and event.switch.id.startswith("auto-download-"):
+            self._save_policy()
+
+    def on_input_changed(self, event: Input.Changed):
+        if event.input.id and event.input.id.startswith("auto-download-"):
+            self._save_policy()
+
+    def _save_policy(self):
+        """Store the settings as the feed's policy and fetch what it now wants."""
+        if not self.current_feed:
+            return
+        feed_id = self.current_feed.id
+        old = self.current_feed.auto_download
+        # Numbers that are not valid yet, e.g. half typed, keep the last setting
+        keep_newest = old.keep_newest
+        keep = self.query_one("#auto-download-keep", Input).value
+        if keep.isdigit() and int(keep) > 0:
+            keep_newest = int(keep)
+        max_duration = old.max_duration_minutes
+        max_minutes = self.query_one("#auto-download-max-minutes", Input).value
+        if not max_minutes:
+            max_duration = None
+        elif max_minutes.isdigit():
+            max_duration = int(max_minutes)
+        policy = AutoDownloadPolicy(
+            enabled=self.query_one("#auto-download-enabled", Switch).value,
+            keep_newest=keep_newest,
+            max_duration_minutes=max_duration,
+            only_when_idle=self.query_one("#auto-download-idle", Switch).value,
+        )
+        future = self.database.set_auto_download(feed_id, policy)
+        if policy.enabled and self.auto_downloader:
+            def queue(_):
+                feed = self.database.get_feed(feed_id)
+                if feed:
+                    self.auto_downloader.queue_feed(feed)
 
-        # Load episodes
-        episodes_list = self.query_one("#feed-episodes-list", Static)
-        episodes_list.remove_children()
-
-        for episode in feed.episodes:
-            # Create episode container
-            episode_container = Container(
-                Label(episode.title, classes="episode-title"),
-                Label(f"Published: {episode.pub_date.strftime('%Y-%m-%d') if episode.pub_date else 'Unknown'}", classes="episode-date"),
-                Label(f"Duration: {episode.format_duration()}", classes="episode-duration"),
-                Static(episode.description[:150] + "..." if len(episode.description) > 150 else episode.description, classes="episode-description"),
-                Horizontal(
-                    Button("▶" if episode.downloaded else "⬇", id=f"play-dl-{episode.guid}",
-                           variant="success" if episode.downloaded else "default",
-                           disabled=not episode.downloaded and not episode.audio_url),
-                    ProgressBar(id=f"progress-{episode.guid}", classes="episode-progress", show_bar=episode.downloaded),
-                    classes="episode-actions"
-                ),
-                classes="episode-item",
-                id=f"episode-{episode.guid}"
-            )
-
-            episodes_list.mount(episode_container)
+            future.add_done_callback(queue)
 
     def on_button_pressed(self, event: Button.Pressed):
         """Handle button presses."""
-        button_id = event.button.id
-
-        if button_id and button_id.startswith("play-dl-"):
-            guid = button_id.replace("play-dl-", "")
-            episode = self._find_episode(guid)
-
-            if episode:
-                if episode.downloaded:
-                    # Play the episode
-                    self.player.stop()
-                    if self.player.load(episode):
-                        self.player.play()
-                        # Update now playing bar
-                        now_playing = self.app.query_one(NowPlayingBar)
-                        if self.current_feed:
-                            now_playing.update_episode(episode, self.current_feed)
-                else:
-                    # Download the episode
-                    self._download_episode(episode)
-
-    def _find_episode(self, guid):
-        """Find an episode by GUID in the current feed."""
-        if not self.current_feed:
-            return None
-
-        for episode in self.current_feed.episodes:
-            if episode.guid == guid:
-                return episode
-
-        return None
+        row = next((node for node in event.button.ancestors if isinstance(node, EpisodeRow)), None)
+        episode = row.episode if row else None
+        if not episode:
+            return
+
+        if event.button.has_class("play-dl"):
+            if episode.downloaded:
+                # Play the episode
+                self._play(episode)
+            else:
+                # Download the episode
+                self._download_episode(episode)
+
+        elif event.button.has_class("stream"):
+            # Play while downloading
+            self._play(episode)
+
+        elif event.button.has_class("queue"):
+            if self.player.queue:
+                self.player.queue.add(episode)
+                # Start buffering it if it is up next
+                self.player.preload_next()
+                self.notify(f"Queued: {episode.title}")
+
+    def _play(self, episode):
+        """Play an episode and show it in the now playing bar."""
+        self.player.stop()
+        if self.player.load(episode):
+            self.player.play()
+            now_playing = self.app.query_one(NowPlayingBar)
+            if self.current_feed:
+                now_playing.update_episode(episode, self.current_feed)
 
     def _download_episode(self, episode):
         """Start downloading an episode."""
-        # Start download in a worker thread
-        def do_download():
-            success = self.download_manager.download_episode(episode, self.current_feed)
-            # Update UI after download
-            self.app.call_from_thread(self._update_after_download, episode, success)
-
         # Show progress indicator
-        button = self.query_one(f"#play-dl-{episode.guid}", Button)
-        button.label = "⏳"
-        button.disabled = True
-
-        # Start download thread
-        import threading
-        thread = threading.Thread(target=do_download)
-        thread.daemon = True
-        thread.start()
-
-        # Start progress update timer
-        self._start_progress_update(episode.guid)
-
-    def _start_progress_update(self, guid):
-        """Start timer to update download progress."""
-        def update_progress():
-            progress = self.download_manager.get_download_progress(guid)
-            try:
-                progress_bar = self.query_one(f"#progress-{guid}", ProgressBar)
-                progress_bar.visible = True
-                progress_bar.progress = progress
-
-                # Continue timer if download in progress
-                if progress < 100 and progress > 0:
-                    self.set_timer(0.5, update_progress)
-            except NoMatches:
-                pass
-
-        # Start first update
-        self.set_timer(0.5, update_progress)
+        row = self.query_one(EpisodeList).row_for(episode.guid)
+        if row:
+            row.play_button.label = "⏳"
+            row.play_button.disabled = True
+
+        # Download on the IO pool; a second press joins the running download
+        self.tasks.submit(
+            IO, self.download_manager.download_episode, episode, self.current_feed,
+            key=download_key(episode),
+            name=f"Download of {episode.title}",
+            on_done=lambda success: self.app.call_from_thread(self._update_after_download, episode, success),
+            on_error=lambda error: self.app.call_from_thread(self._update_after_download, episode, False),
+        )
 
     def _update_after_download(self, episode, success):
         """Update UI after download completes."""
-        button = self.query_one(f"#play-dl-{episode.guid}", Button)
-
-        if success:
-            button.label = "▶"
-            button.variant = "success"
-            button.disabled = False
-        else:
-            button.label = "⬇"
-            button.variant = "error"
-            button.disabled = False
+        # The row may have scrolled away or been rebound to another episode
+        row = self.query_one(EpisodeList).row_for(episode.guid)
+        if not row:
+            return
+        # Joining a download that is still running shows it as running
+        row.bind(episode, self.download_manager.progress.get(episode.guid))
+
+        if not success:
+            row.play_button.variant = "error"
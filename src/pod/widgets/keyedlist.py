@@ -0,0 +1,44 @@
+from typing import Callable, Dict, Hashable, List, Tuple, TypeVar
+
+from textual.widget import Widget
+
+T = TypeVar("T")
+
+
+def sync_children(container: Widget, items: Dict[Hashable, Widget],
+                  entries: List[Tuple[Hashable, T]],
+                  create: Callable[[T], Widget],
+                  update: Callable[[Widget, T], None]):
+    """Make a container's children match entries, reusing widgets by key.
+
+    items maps each key to the widget showing it and is kept up to date.
+    Widgets whose key is gone are removed, new keys are mounted in place,
+    and existing widgets are updated and only moved if their position
+    changed, so an unchanged list costs one comparison per entry.
+    """
+    wanted = {key for key, _ in entries}
+    removed = set()
+    for key in [key for key in items if key not in wanted]:
+        widget = items.pop(key)
+        removed.add(widget)
+        widget.remove()
+
+    # Removal completes later, so track the order ourselves
+    current = [child for child in container.children if child not in removed]
+    for index, (key, value) in enumerate(entries):
+        widget = items.get(key)
+        if widget is None:
+            widget = create(value)
+            items[key] = widget
+            if index < len(current):
+                container.mount(widget, before=current[index])
+            else:
+                container.mount(widget)
+            current.insert(index, widget)
+            continue
+
+        update(widget, value)
+        if current[index] is not widget:
+            container.move_child(widget, before=current[index])
+            current.remove(widget)
+            current.insert(index, widget)
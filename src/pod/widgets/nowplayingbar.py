@@ -1,14 +1,15 @@
 from textual.app import ComposeResult
 from textual.containers import Container, Horizontal
-from textual.css.query import NoMatches
+from textual.message import Message
 from textual.widgets import (
     Button, Static, Label, ProgressBar
 )
 from textual.reactive import reactive
 
+from src.pod.config.config import PROGRESS_SAVE_INTERVAL
 from src.pod.models.episode import Episode
 from src.pod.models.feed import Feed
-from src.pod.services.audioplayer import AudioPlayer
+from src.pod.services.audioplayer import AudioPlayer, PlayerState
 from src.pod.services.databasemanager import PodcastDatabase
 
 
@@ -22,11 +23,23 @@ class NowPlayingBar(Static):
     current_feed = reactive("")
     playback_speed = reactive(1.0)
 
+    class PlayerStateChanged(Message):
+        """Player state pushed from AudioPlayer's VLC event thread."""
+
+        def __init__(self, state: PlayerState):
+            super().__init__()
+            self.state = state
+
     def __init__(self, player: AudioPlayer, database: PodcastDatabase):
         super().__init__()
         self.player = player
         self.database = database
-        self.update_timer = None
+        self.last_saved_position = 0
+        self.current_episode: Episode | None = None  # episode the bar is showing
+        self.extras = None  # EpisodeExtras, once services are up
+        self.chapters = []  # chapters of the playing episode
+        self.chapters_for = None  # episode the chapters were requested for
+        self.current_chapter = None
 
     def compose(self) -> ComposeResult:
         yield Container(
@@ -44,52 +57,83 @@ class NowPlayingBar(Static):
                 Button("-10s", id="rewind-button"),
                 Label(f"{self.playback_speed}x", id="speed-display"),
                 Button("+10s", id="forward-button"),
+                Label("", id="saved-display"),
                 id="playback-controls"
             ),
             id="now-playing"
         )
 
     def on_mount(self):
-        """Start the update timer when mounted."""
-        self.update_timer = self.set_interval(0.5, self.update_progress)
+        """Subscribe to player state and keep the widgets we update."""
+        self.progress_bar = self.query_one("#playback-progress", ProgressBar)
+        self.time_display = self.query_one("#time-display", Label)
+        self.play_button = self.query_one("#play-pause-button", Button)
+        self.saved_display = self.query_one("#saved-display", Label)
+        self.player.subscribe(self._on_player_state)
+
+    def on_unmount(self):
+        self.player.unsubscribe(self._on_player_state)
+
+    def _on_player_state(self, state: PlayerState):
+        """Called on a VLC thread; post_message is thread safe."""
+        self.post_message(self.PlayerStateChanged(state))
+
+    def on_now_playing_bar_player_state_changed(self, message: PlayerStateChanged):
+        """Update the display and persist progress from a pushed state."""
+        state = message.state
+        episode = state.episode
+        if not episode:
+            return
 
-    def update_progress(self):
-        """Update playback progress."""
-        if not self.player.current_episode:
+        # The player moved on to the next queued episode by itself
+        if episode is not self.current_episode:
+            feed = self.database.get_feed(episode.feed_id)
+            if feed:
+                self.update_episode(episode, feed)
+
+        self.current_position = state.position // 1000
+        # Prefer the real media length over the feed's duration
+        self.current_duration = state.length // 1000 or episode.duration or 0
+        self.is_playing = state.is_playing
+
+        if self.current_duration > 0:
+            self.progress_bar.update(total=100, progress=(self.current_position / self.current_duration) * 100)
+        else:
+            self.progress_bar.update(progress=0)
+
+        position_str = self.format_time(self.current_position)
+        duration_str = self.format_time(self.current_duration)
+        time_display = f"{position_str}/{duration_str}"
+        if state.buffering < 100:
+            time_display += f" (buffering {state.buffering:.0f}%)"
+        self.time_display.update(time_display)
+        self._show_chapter()
+        self.play_button.label = "⏸" if self.is_playing else "▶"
+        # Time smart speed has cut from this episode
+        saved = state.time_saved // 1000
+        self.saved_display.update(f" saved {self.format_time(saved)}" if saved else "")
+
+        if state.ended:
+            self.database.mark_episode_finished(episode.feed_id, episode.guid)
+            self.last_saved_position = 0
+            return
+        if state.error:
+            self.notify(f"Playback error: {episode.title}", severity="error")
             return
 
-        # Update position
-        self.current_position = self.player.get_current_position()
-        self.current_duration = self.player.current_episode.duration
-        self.is_playing = self.player.is_playing
-
-        # Update display
-        try:
-            progress_bar = self.query_one("#playback-progress", ProgressBar)
-            time_display = self.query_one("#time-display", Label)
-
-            if self.current_duration > 0:
-                progress = (self.current_position / self.current_duration) * 100
-                progress_bar.progress = progress
-            else:
-                progress_bar.progress = 0
-
-            # Format time
-            position_str = self.format_time(self.current_position)
-            duration_str = self.format_time(self.current_duration)
-            time_display.update(f"{position_str}/{duration_str}")
-
-            # Save progress periodically
-            if self.player.current_episode and self.is_playing:
-                episode = self.player.current_episode
-                self.database.update_episode_progress(
-                    episode.feed_id,
-                    episode.guid,
-                    self.current_position
-                )
-
-        except NoMatches:
-            pass
+        # Keep the position in memory on every update; write the database
+        # when paused or every PROGRESS_SAVE_INTERVAL seconds of playback
+        save = (not self.is_playing
+                or abs(self.current_position - self.last_saved_position) >= PROGRESS_SAVE_INTERVAL)
+        if self.current_position:
+            self.database.update_episode_progress(
+                episode.feed_id,
+                episode.guid,
+                self.current_position,
+                save=save
+            )
+            if save:
+                self.last_saved_position = self.current_position
 
     def on_button_pressed(self, event: Button.Pressed):
         """Handle button presses."""
@@ -100,6 +144,13 @@ class NowPlayingBar(Static):
             self.is_playing = self.player.is_playing
             event.button.label = "⏸" if self.is_playing else "▶"
 
+        elif button_id == "prev-button":
+            self.player.play_previous()
+
+        elif button_id == "next-button":
+            if not self.player.play_next():
+                self.notify("Queue is empty")
+
         elif button_id == "rewind-button":
             self.player.seek(-10)  # Back 10 seconds
 
@@ -108,6 +159,7 @@ class NowPlayingBar(Static):
 
     def update_episode(self, episode: Episode, feed: Feed):
         """Update displayed episode."""
+        self.current_episode = episode
         self.current_title = episode.title
         self.current_feed = feed.title
 
@@ -121,6 +173,41 @@ class NowPlayingBar(Static):
         play_button = self.query_one("#play-pause-button", Button)
         play_button.label = "⏸" if self.is_playing else "▶"
 
+        self._load_extras(episode)
+
+    def _load_extras(self, episode: Episode):
+        """Fetch chapters to show, and the transcript so it can be searched."""
+        self.chapters = []
+        self.chapters_for = episode
+        self.current_chapter = None
+        if not self.extras:
+            return
+        # Only a reference with a URL has anything to fetch in the background
+        if episode.chapters and episode.chapters.get("url"):
+            self.extras.request_chapters(
+                episode,
+                lambda chapters: self.app.call_from_thread(self._chapters_loaded, episode, chapters))
+        if episode.transcript and episode.transcript.get("url"):
+            self.extras.request_transcript(episode, lambda cues: None)
+
+    def _chapters_loaded(self, episode: Episode, chapters):
+        if episode is self.chapters_for:
+            self.chapters = chapters
+            self._show_chapter()
+
+    def _show_chapter(self):
+        """Show the title of the chapter playing next to the feed title."""
+        if not self.chapters:
+            return
+        from src.pod.services.episodeextras import chapter_at
+
+        chapter = chapter_at(self.chapters, self.current_position)
+        if chapter is self.current_chapter:
+            return
+        self.current_chapter = chapter
+        label = f"{self.current_feed} · {chapter.title}" if chapter else self.current_feed
+        self.query_one("#feed-title", Label).update(label)
+
     def format_time(self, seconds: int) -> str:
         """Format time in seconds as MM:SS or HH:MM:SS."""
         if not seconds:
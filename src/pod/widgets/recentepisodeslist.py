@@ -1,10 +1,40 @@
+from typing import Dict, Tuple
+
 from textual.app import ComposeResult
 from textual.containers import Container, Horizontal
 from textual.widgets import (
     Button, Static, Label
 )
 
+from src.pod.models.episode import Episode
 from src.pod.services.databasemanager import PodcastDatabase
+from src.pod.widgets.keyedlist import sync_children
+
+class RecentEpisodeItem(Horizontal):
+    """One recent episode; updated in place when the episode changes."""
+
+    def __init__(self, episode: Episode, feed_name: str):
+        super().__init__(classes="episode-item")
+        self.shown = self._texts(episode, feed_name)
+
+    def _texts(self, episode: Episode, feed_name: str) -> Tuple[str, str, str]:
+        return (episode.title, f"({feed_name})", episode.format_duration())
+
+    def compose(self) -> ComposeResult:
+        title, feed_name, duration = self.shown
+        yield Label(title, classes="episode-title")
+        yield Label(feed_name, classes="feed-name")
+        yield Label(duration, classes="episode-duration")
+        yield Button("▶", classes="play-button")
+
+    def show(self, episode: Episode, feed_name: str):
+        texts = self._texts(episode, feed_name)
+        if texts == self.shown:
+            return
+        self.shown = texts
+        for selector, text in zip((".episode-title", ".feed-name", ".episode-duration"), texts):
+            self.query_one(selector, Label).update(text)
+
 
 class RecentEpisodesList(Static):
     """Widget showing recently published episodes."""
@@ -12,6 +42,7 @@ class RecentEpisodesList(Static):
     def __init__(self, database: PodcastDatabase):
         super().__init__()
         self.database = database
+        self.items: Dict[Tuple[str, str], RecentEpisodeItem] = {}  # (feed id, guid) -> item
 
     def compose(self) -> ComposeResult:
         yield Container(
@@ -25,23 +56,22 @@ class RecentEpisodesList(Static):
         self.load_episodes()
 
     def load_episodes(self):
-        """Load recent episodes."""
+        """Update the list of recent episodes, changing only what differs."""
         episodes_container = self.query_one("#episodes-list", Static)
-        episodes_container.remove_children()
 
-        recent_episodes = self.database.get_recent_episodes(limit=10)
-
-        for episode in recent_episodes:
+        entries = []
+        for episode in self.database.get_recent_episodes(limit=10):
             feed = self.database.get_feed(episode.feed_id)
             feed_name = feed.title if feed else "Unknown"
+            entries.append(((episode.feed_id, episode.guid), (episode, feed_name)))
+
+        sync_children(episodes_container, self.items, entries,
+                      create=self._create_item, update=self._update_item)
 
-            episode_container = Horizontal(
-                Label(f"{episode.title}", classes="episode-title"),
-                Label(f"({feed_name})", classes="feed-name"),
-                Label(episode.format_duration(), classes="episode-duration"),
-                Button("▶", classes="play-button"),
-                classes="episode-item",
-                id=f"episode-{episode.guid.replace('/','-').replace('.','_')}"
-            )
+    def _create_item(self, value) -> RecentEpisodeItem:
+        episode, feed_name = value
+        return RecentEpisodeItem(episode, feed_name)
 
-            episodes_container.mount(episode_container)
+    def _update_item(self, item: RecentEpisodeItem, value):
+        episode, feed_name = value
+        item.show(episode, feed_name)
@@ -0,0 +1,86 @@
+from textual.app import ComposeResult
+from textual.containers import Container, Horizontal, VerticalScroll
+from textual.widgets import (
+    Button, Static, Label, Input
+)
+
+from src.pod.services.audioplayer import AudioPlayer
+from src.pod.services.databasemanager import PodcastDatabase
+from src.pod.services.episodeextras import EpisodeExtras, TranscriptHit
+from src.pod.widgets.nowplayingbar import NowPlayingBar
+
+
+class TranscriptSearch(Static):
+    """Dialog for finding a moment in episode transcripts and playing from there.
+
+    Searches the transcripts fetched so far: those of episodes that have
+    been played or queued.
+    """
+
+    def __init__(self, extras: EpisodeExtras, database: PodcastDatabase, player: AudioPlayer):
+        super().__init__()
+        self.extras = extras
+        self.database = database
+        self.player = player
+
+    def compose(self) -> ComposeResult:
+        yield Container(
+            Label("Search Transcripts", classes="dialog-title"),
+            Input(placeholder="Words said in an episode", id="transcript-query"),
+            VerticalScroll(id="transcript-results"),
+            Horizontal(
+                Button("Close", id="close-transcript-search", variant="default"),
+                id="dialog-buttons"
+            ),
+            id="transcript-search-dialog"
+        )
+
+    def on_mount(self):
+        self.query_one("#transcript-query", Input).focus()
+
+    def on_input_changed(self, event: Input.Changed):
+        """Search as you type; the index is local, so there is no need to wait."""
+        if event.input.id != "transcript-query":
+            return
+        results = self.query_one("#transcript-results", VerticalScroll)
+        results.remove_children()
+        if not event.value.strip():
+            return
+
+        buttons = []
+        for hit in self.extras.search(event.value):
+            episode = self.database.get_episode(hit.feed_id, hit.guid)
+            if not episode:
+                continue
+            button = Button(f"{episode.title} · {episode.format_time(int(hit.start))} · {hit.text}",
+                            classes="transcript-hit")
+            button.hit = hit
+            buttons.append(button)
+        if buttons:
+            results.mount(*buttons)
+        else:
+            results.mount(Label("No matches in fetched transcripts."))
+
+    def on_button_pressed(self, event: Button.Pressed):
+        """Handle button presses."""
+        if event.button.id == "close-transcript-search":
+            self.remove()
+        elif event.button.has_class("transcript-hit"):
+            self._play(event.button.hit)
+
+    def _play(self, hit: TranscriptHit):
+        """Play the episode of a match from the moment it was said."""
+        episode = self.database.get_episode(hit.feed_id, hit.guid)
+        if not episode:
+            return
+        if self.player.current_episode is not episode:
+            self.player.stop()
+            if not self.player.load(episode):
+                self.notify(f"Cannot play {episode.title}", severity="error")
+                return
+            self.player.play()
+            feed = self.database.get_feed(episode.feed_id)
+            if feed:
+                self.app.query_one(NowPlayingBar).update_episode(episode, feed)
+        self.player.seek_to(int(hit.start * 1000))
+        self.remove()